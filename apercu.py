@@ -0,0 +1,198 @@
+import hashlib
+import heapq
+import itertools
+import mmap
+import os
+import pathlib
+import stat
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import Image, PngImagePlugin
+except ImportError:
+    Image = None
+
+EXTENSIONS_IMAGES = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp', '.ppm', '.ico'}
+
+
+def est_image(nom):
+    return Image is not None and os.path.splitext(nom)[1].lower() in EXTENSIONS_IMAGES
+
+
+def est_fichier_regulier(chemin):
+    return stat.S_ISREG(os.stat(chemin).st_mode)
+
+
+def apercu_texte(chemin, nb_lignes=15, max_octets=64 * 1024):
+    if not est_fichier_regulier(chemin):
+        return None
+    with open(chemin, 'rb') as f:
+        taille = os.fstat(f.fileno()).st_size
+        if taille == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            tete = m[:min(taille, max_octets)]
+            if b'\0' in tete[:8192]:
+                return None
+            lignes = tete.split(b'\n')
+            if taille <= max_octets and len(lignes) <= 2 * nb_lignes:
+                return tete.decode('utf-8', errors='replace')
+            queue = m[max(0, taille - max_octets):].split(b'\n')[-nb_lignes:]
+    return (b'\n'.join(lignes[:nb_lignes]).decode('utf-8', errors='replace') + '\n…\n'
+            + b'\n'.join(queue).decode('utf-8', errors='replace'))
+
+
+def dossier_vignettes_defaut():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'explorateur', 'vignettes')
+
+
+class CacheVignettes:
+    def __init__(self, dossier=None, max_octets=256 * 2**20, taille=256):
+        self.dossier = dossier or dossier_vignettes_defaut()
+        self.max_octets = max_octets
+        self.taille = taille
+        self.octets = 0
+        self.verrou = threading.Lock()
+        self._entrees = OrderedDict()
+        self._disponible = None
+
+    def disponible(self):
+        with self.verrou:
+            if self._disponible is None:
+                try:
+                    self._charger()
+                    self._disponible = True
+                except OSError:
+                    self._disponible = False
+            return self._disponible
+
+    def est_indisponible(self):
+        return self._disponible is False
+
+    def _charger(self):
+        os.makedirs(self.dossier, mode=0o700, exist_ok=True)
+        fichiers = []
+        with os.scandir(self.dossier) as entries:
+            for entry in entries:
+                if entry.name.endswith('.png'):
+                    try:
+                        stat_info = entry.stat()
+                    except OSError:
+                        continue
+                    fichiers.append((stat_info.st_mtime, entry.name, stat_info.st_size))
+        for _, nom, octets in sorted(fichiers):
+            self._entrees[nom] = octets
+            self.octets += octets
+
+    def cle(self, chemin, mtime, taille):
+        uri = pathlib.Path(os.path.abspath(chemin)).as_uri()
+        return hashlib.md5(f"{uri}\n{mtime!r}\n{taille}".encode()).hexdigest() + '.png'
+
+    def obtenir(self, chemin, mtime, taille):
+        nom = self.cle(chemin, mtime, taille)
+        with self.verrou:
+            if nom not in self._entrees:
+                return None
+            self._entrees.move_to_end(nom)
+        chemin_vignette = os.path.join(self.dossier, nom)
+        try:
+            os.utime(chemin_vignette)
+        except OSError:
+            with self.verrou:
+                self.octets -= self._entrees.pop(nom, 0)
+            return None
+        return chemin_vignette
+
+    def stocker(self, chemin, mtime, taille, image):
+        nom = self.cle(chemin, mtime, taille)
+        chemin_vignette = os.path.join(self.dossier, nom)
+        infos = PngImagePlugin.PngInfo()
+        infos.add_text('Thumb::URI', pathlib.Path(os.path.abspath(chemin)).as_uri())
+        infos.add_text('Thumb::MTime', str(int(mtime)))
+        infos.add_text('Thumb::Size', str(taille))
+        temporaire = f"{chemin_vignette}.{threading.get_ident()}.tmp"
+        image.save(temporaire, 'PNG', pnginfo=infos)
+        os.replace(temporaire, chemin_vignette)
+        octets = os.path.getsize(chemin_vignette)
+        with self.verrou:
+            self.octets += octets - self._entrees.pop(nom, 0)
+            self._entrees[nom] = octets
+            while self.octets > self.max_octets and len(self._entrees) > 1:
+                ancien, octets_ancien = self._entrees.popitem(last=False)
+                self.octets -= octets_ancien
+                try:
+                    os.remove(os.path.join(self.dossier, ancien))
+                except OSError:
+                    pass
+        return chemin_vignette
+
+    def vignette(self, chemin, mtime, taille):
+        if not self.disponible() or not est_fichier_regulier(chemin):
+            return None
+        chemin_vignette = self.obtenir(chemin, mtime, taille)
+        if chemin_vignette is not None:
+            return chemin_vignette
+        with Image.open(chemin) as image:
+            image.draft('RGB', (self.taille, self.taille))
+            image.thumbnail((self.taille, self.taille))
+            if image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+                image = image.convert('RGBA')
+            return self.stocker(chemin, mtime, taille, image)
+
+
+class GenerateurApercus:
+    def __init__(self, retour, cache=None, nb_workers=4):
+        self.retour = retour
+        self.cache = cache
+        self.nb_workers = nb_workers
+        self.condition = threading.Condition()
+        self.file = []
+        self.en_attente = {}
+        self.compteur = itertools.count()
+        self.threads = []
+
+    def demander(self, demandes):
+        with self.condition:
+            voulues = {}
+            for priorite, genre, chemin, mtime, taille, rappel in demandes:
+                if genre == 'image' and (self.cache is None or Image is None or self.cache.est_indisponible()):
+                    continue
+                voulues[(genre, chemin)] = (priorite, mtime, taille, rappel)
+            for cle, tache in list(self.en_attente.items()):
+                if cle not in voulues or voulues[cle][0] != tache[0]:
+                    tache[-1] = True
+                    del self.en_attente[cle]
+            for (genre, chemin), (priorite, mtime, taille, rappel) in voulues.items():
+                if (genre, chemin) in self.en_attente:
+                    continue
+                tache = [priorite, next(self.compteur), genre, chemin, mtime, taille, rappel, False]
+                self.en_attente[(genre, chemin)] = tache
+                heapq.heappush(self.file, tache)
+            while len(self.threads) < min(self.nb_workers, len(self.en_attente)):
+                thread = threading.Thread(target=self._travailler, daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify_all()
+
+    def _travailler(self):
+        while True:
+            with self.condition:
+                while not self.file:
+                    self.condition.wait()
+                tache = heapq.heappop(self.file)
+                if tache[-1]:
+                    continue
+                del self.en_attente[(tache[2], tache[3])]
+            _, _, genre, chemin, mtime, taille, rappel, _ = tache
+            try:
+                if genre == 'image':
+                    resultat = self.cache.vignette(chemin, mtime, taille)
+                else:
+                    resultat = apercu_texte(chemin)
+                erreur = None
+            except Exception as e:
+                resultat, erreur = None, str(e)
+            if rappel is not None:
+                self.retour.poster(rappel, genre, chemin, resultat, erreur)
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_listing import signature_dossier
+from lecture import sous_dossiers
+
+
+def a_sous_dossiers(chemin, show_hidden=True):
+    try:
+        for entry in sous_dossiers(chemin, show_hidden):
+            return True
+    except OSError:
+        pass
+    return False
+
+
+class ChargeurArborescence:
+    def __init__(self, retour, nb_sondes=8, max_prechargements=256):
+        self.retour = retour
+        self.max_prechargements = max_prechargements
+        self.listeurs = ThreadPoolExecutor(max_workers=2, thread_name_prefix='arbre')
+        self.sondes = ThreadPoolExecutor(max_workers=nb_sondes, thread_name_prefix='sonde')
+        self.prechargeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prechargement')
+        self.sondes_prechargement = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sonde-prechargement')
+        self.prechargements = OrderedDict()
+        self.en_cours = {}
+
+    def charger(self, chemin, show_hidden, sur_resultat):
+        resultat = self._precharge(chemin, show_hidden)
+        if resultat is not None:
+            sur_resultat(*resultat)
+            return
+        for cle, (future, attentes) in list(self.en_cours.items()):
+            if not attentes and future.cancel():
+                del self.en_cours[cle]
+        if (chemin, show_hidden) in self.en_cours:
+            self.en_cours[(chemin, show_hidden)][1].append(sur_resultat)
+            return
+        self.listeurs.submit(self._executer, chemin, show_hidden, self.sondes, sur_resultat)
+
+    def precharger(self, chemins, show_hidden):
+        for chemin in chemins:
+            cle = (chemin, show_hidden)
+            if cle not in self.prechargements and cle not in self.en_cours:
+                future = self.prechargeur.submit(self._executer, chemin, show_hidden, self.sondes_prechargement, None)
+                self.en_cours[cle] = (future, [])
+
+    def arreter(self):
+        for executeur in (self.listeurs, self.sondes, self.prechargeur, self.sondes_prechargement):
+            executeur.shutdown(wait=False, cancel_futures=True)
+
+    def _precharge(self, chemin, show_hidden):
+        resultat = self.prechargements.pop((chemin, show_hidden), None)
+        if resultat is None:
+            return None
+        try:
+            if signature_dossier(chemin) != resultat[0]:
+                return None
+        except OSError:
+            return None
+        return resultat
+
+    def _executer(self, chemin, show_hidden, sondes, sur_resultat):
+        try:
+            signature = signature_dossier(chemin)
+            enfants = sorted(((entry.name, entry.path) for entry in sous_dossiers(chemin, show_hidden)),
+                             key=lambda enfant: enfant[0].casefold())
+        except OSError:
+            signature, enfants = None, []
+        suites = sondes.map(lambda enfant: a_sous_dossiers(enfant[1], show_hidden), enfants)
+        resultat = (signature, [(nom, chemin_enfant, suite)
+                                for (nom, chemin_enfant), suite in zip(enfants, suites)])
+        if sur_resultat is not None:
+            self.retour.poster(sur_resultat, *resultat)
+        else:
+            self.retour.poster(self._stocker, chemin, show_hidden, resultat)
+
+    def _stocker(self, chemin, show_hidden, resultat):
+        _, attentes = self.en_cours.pop((chemin, show_hidden), (None, []))
+        if attentes:
+            for sur_resultat in attentes:
+                sur_resultat(*resultat)
+            return
+        self.prechargements[(chemin, show_hidden)] = resultat
+        while len(self.prechargements) > self.max_prechargements:
+            self.prechargements.popitem(last=False)
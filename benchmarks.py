@@ -0,0 +1,469 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from formatage import Formateur
+from index_fichiers import IndexFichiers
+from lecture import sous_dossiers
+from listing import DirectoryListing
+import noyau
+from operations_lot import TacheLot, plan_renommage, renommer_element, supprimer_arbre
+from scanner import TacheScan
+from transfert import Transfert
+
+
+class _RetourDirect:
+    def poster(self, fonction, *args):
+        fonction(*args)
+
+
+class _EntreeComptee:
+    def __init__(self, entry, compteur):
+        self._entry = entry
+        self._compteur = compteur
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self, *, follow_symlinks=True):
+        # d_type suffit sauf pour les liens symboliques qu'il faut suivre
+        if follow_symlinks and self._entry.is_symlink():
+            self._compteur['stat'] += 1
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks=True):
+        if follow_symlinks and self._entry.is_symlink():
+            self._compteur['stat'] += 1
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def inode(self):
+        return self._entry.inode()
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            self._compteur['stat'] += 1
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+class _ScandirCompte:
+    def __init__(self, it, compteur):
+        self._it = it
+        self._compteur = compteur
+
+    def __iter__(self):
+        for entry in self._it:
+            yield _EntreeComptee(entry, self._compteur)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def close(self):
+        self._it.close()
+
+
+@contextlib.contextmanager
+def compter_appels():
+    compteur = {'listdir': 0, 'scandir': 0, 'stat': 0}
+    originaux = {nom: getattr(os, nom) for nom in ('stat', 'lstat', 'listdir', 'scandir')}
+
+    def stat(*args, **kwargs):
+        compteur['stat'] += 1
+        return originaux['stat'](*args, **kwargs)
+
+    def lstat(*args, **kwargs):
+        compteur['stat'] += 1
+        return originaux['lstat'](*args, **kwargs)
+
+    def listdir(*args, **kwargs):
+        compteur['listdir'] += 1
+        return originaux['listdir'](*args, **kwargs)
+
+    def scandir(*args, **kwargs):
+        compteur['scandir'] += 1
+        return _ScandirCompte(originaux['scandir'](*args, **kwargs), compteur)
+
+    os.stat, os.lstat, os.listdir, os.scandir = stat, lstat, listdir, scandir
+    try:
+        yield compteur
+    finally:
+        for nom, fonction in originaux.items():
+            setattr(os, nom, fonction)
+
+
+def creer_arbre_plat(racine, nb_fichiers, nb_dossiers=0):
+    for i in range(nb_dossiers):
+        os.mkdir(os.path.join(racine, f'dossier_{i:07d}'))
+    for i in range(nb_fichiers):
+        with open(os.path.join(racine, f'fichier_{i:07d}.txt'), 'w'):
+            pass
+
+
+def creer_arbre_profond(racine, nb_fichiers, par_dossier=1000, largeur=10):
+    extensions = _extensions_synthetiques()
+    for numero in range(0, nb_fichiers, par_dossier):
+        dossier = numero // par_dossier
+        parties = []
+        while True:
+            parties.append(f'd{dossier % largeur}')
+            dossier //= largeur
+            if not dossier:
+                break
+        chemin = os.path.join(racine, *reversed(parties), f'feuille_{numero // par_dossier}')
+        os.makedirs(chemin, exist_ok=True)
+        for i in range(numero, min(numero + par_dossier, nb_fichiers)):
+            with open(os.path.join(chemin, f'fichier_{i:07d}{extensions[i % len(extensions)]}'), 'w'):
+                pass
+
+
+def scan_ancien(chemin):
+    dirs, files = [], []
+    for entry in os.listdir(chemin):
+        full_path = os.path.join(chemin, entry)
+        try:
+            is_dir = os.path.isdir(full_path)
+            stat_info = os.stat(full_path)
+        except Exception:
+            continue
+        (dirs if is_dir else files).append((entry, full_path, stat_info))
+    for group in (dirs, files):
+        for entry, full_path, stat_info in group:
+            os.path.isdir(full_path)
+
+
+def arbre_ancien(chemin):
+    for entry in os.listdir(chemin):
+        os.path.isdir(os.path.join(chemin, entry))
+
+
+def scan_nouveau(chemin):
+    tache = TacheScan(chemin, True, _RetourDirect(), lambda *args: None, lambda erreur: None)
+    tache._executer()
+
+
+def arbre_nouveau(chemin):
+    for entry in sous_dossiers(chemin):
+        pass
+
+
+def bench_appels(args):
+    with tempfile.TemporaryDirectory() as racine:
+        creer_arbre_plat(racine, args.fichiers, args.dossiers)
+        total = args.fichiers + args.dossiers
+        for nom, fonction in [('liste (ancien)', scan_ancien), ('liste (scandir)', scan_nouveau),
+                              ('arbre (ancien)', arbre_ancien), ('arbre (scandir)', arbre_nouveau)]:
+            with compter_appels() as compteur:
+                debut = time.perf_counter()
+                fonction(racine)
+                duree = time.perf_counter() - debut
+            appels = sum(compteur.values())
+            print(f"{nom:<18} {appels:>9} appels  {appels / total:6.2f} par entrée  {duree * 1000:8.1f} ms")
+
+
+def _stat_synthetique(i):
+    return os.stat_result((0o100644, i, 0, 1, 0, 0, i * 37, 1700000000 + i, 1700000000 + i, 1700000000 + i))
+
+
+def _extensions_synthetiques():
+    return ('.txt', '.log', '.py', '.jpg', '.png', '', '.tar.gz', '.csv')
+
+
+def remplir_dicts(chemin, nb):
+    extensions = _extensions_synthetiques()
+    file_data = {}
+    for i in range(nb):
+        nom = f'fichier_{i:07d}{extensions[i % len(extensions)]}'
+        stat_info = _stat_synthetique(i)
+        file_data[f'I{i:X}'] = {
+            'path': os.path.join(chemin, nom),
+            'size': stat_info.st_size,
+            'type': f"{os.path.splitext(nom)[1]} Fichier",
+            'mtime': stat_info.st_mtime,
+            'ctime': stat_info.st_ctime
+        }
+    return file_data
+
+
+def remplir_listing(chemin, nb):
+    extensions = _extensions_synthetiques()
+    listing = DirectoryListing(chemin)
+    for i in range(nb):
+        listing.ajouter(f'fichier_{i:07d}{extensions[i % len(extensions)]}', False, _stat_synthetique(i))
+    return listing
+
+
+def bench_memoire(args):
+    chemin = '/home/utilisateur/un/chemin/assez/long'
+    for nb in args.tailles:
+        for nom, fonction in [('dict par item', remplir_dicts), ('DirectoryListing', remplir_listing)]:
+            tracemalloc.start()
+            debut = time.perf_counter()
+            donnees = fonction(chemin, nb)
+            duree = time.perf_counter() - debut
+            octets = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del donnees
+            print(f"{nb:>9} {nom:<18} {octets / 2**20:9.1f} Mo  {octets / nb:7.1f} o/entrée  {duree:6.2f} s")
+
+
+def bench_index(args):
+    with tempfile.TemporaryDirectory() as racine:
+        debut = time.perf_counter()
+        creer_arbre_profond(os.path.join(racine, 'arbre'), args.fichiers, args.par_dossier)
+        print(f"arbre synthétique : {args.fichiers} fichiers en {time.perf_counter() - debut:.1f} s")
+        index = IndexFichiers(os.path.join(racine, 'index.sqlite'))
+        debut = time.perf_counter()
+        stats = index.mettre_a_jour(os.path.join(racine, 'arbre'))
+        print(f"construction      : {time.perf_counter() - debut:8.2f} s  ({stats['entrees']} entrées)")
+        debut = time.perf_counter()
+        index.mettre_a_jour(os.path.join(racine, 'arbre'))
+        print(f"mise à jour à vide: {time.perf_counter() - debut:8.2f} s")
+        print(f"taille de l'index : {index.statistiques()['octets'] / 2**20:8.1f} Mo")
+        for texte in ('fichier_0012345', '0099', '.csv', 'feuille_7', 'ab'):
+            durees = []
+            for _ in range(args.repetitions):
+                debut = time.perf_counter()
+                resultats = index.chercher(texte, limite=100)
+                durees.append(time.perf_counter() - debut)
+            durees.sort()
+            print(f"requête {texte!r:<18} {len(resultats):>4} résultats  "
+                  f"médiane {durees[len(durees) // 2] * 1000:7.2f} ms  max {durees[-1] * 1000:7.2f} ms")
+        index.fermer()
+
+
+def formater_ancien(tailles, mtimes):
+    lignes = []
+    for size, mtime in zip(tailles, mtimes):
+        units = ['O', 'KB', 'MB', 'GB', 'TB']
+        index = 0
+        while size >= 1024 and index < len(units)-1:
+            size /= 1024
+            index += 1
+        lignes.append((f"{size:.2f} {units[index]}" if index > 0 else f"{size} B",
+                       datetime.datetime.fromtimestamp(mtime).strftime('%d/%m/%Y %H:%M:%S')))
+    return lignes
+
+
+def formater_nouveau(tailles, mtimes):
+    formateur = Formateur()
+    return list(zip(formateur.tailles(tailles), formateur.dates(mtimes)))
+
+
+def bench_formatage(args):
+    listing = remplir_listing('/tmp', args.entrees)
+    for nb_dates in args.dates_distinctes:
+        mtimes = [1700000000 + i % nb_dates + 0.5 for i in range(args.entrees)]
+        for nom, fonction in [('ancien', formater_ancien), ('Formateur', formater_nouveau)]:
+            debut = time.perf_counter()
+            fonction(listing.tailles, mtimes)
+            duree = time.perf_counter() - debut
+            print(f"{args.entrees:>9} lignes  {nb_dates:>9} dates distinctes  {nom:<10} {duree * 1000:9.1f} ms  "
+                  f"{duree / args.entrees * 1e6:6.2f} µs/ligne")
+
+
+def _creer_fichiers(dossier, nombre, taille):
+    os.makedirs(dossier)
+    bloc = os.urandom(min(taille, 2**20))
+    for i in range(nombre):
+        with open(os.path.join(dossier, f'fichier_{i:06d}.bin'), 'wb') as fichier:
+            restant = taille
+            while restant > 0:
+                fichier.write(bloc[:restant])
+                restant -= len(bloc)
+
+
+def bench_transfert(args):
+    charges = [('petits fichiers', args.petits, args.taille_petits),
+               ('gros fichiers', args.gros, args.taille_gros)]
+    with tempfile.TemporaryDirectory(dir=args.dossier) as racine:
+        for nom, nombre, taille in charges:
+            source = os.path.join(racine, nom.replace(' ', '_'))
+            _creer_fichiers(source, nombre, taille)
+            for nb_workers in args.workers:
+                cible = source + f'_copie_{nb_workers}'
+                transfert = Transfert([(source, cible)], nb_workers=nb_workers)
+                debut = time.perf_counter()
+                transfert.executer()
+                duree = time.perf_counter() - debut
+                octets = nombre * taille
+                print(f"{nom:<16} {nombre:>6} x {taille:>10} o  {nb_workers:>2} workers  {duree:7.2f} s  "
+                      f"{octets / duree / 2**20:8.1f} Mo/s  {nombre / duree:9.0f} fichiers/s")
+                shutil.rmtree(cible)
+
+
+def creer_chaine(racine, profondeur, par_niveau):
+    chemin = racine
+    for niveau in range(profondeur):
+        chemin = os.path.join(chemin, f'n{niveau}')
+        os.makedirs(chemin)
+        for i in range(par_niveau):
+            with open(os.path.join(chemin, f'fichier_{i:04d}.txt'), 'w'):
+                pass
+
+
+def creer_minuscules(racine, nb_fichiers, par_dossier=100):
+    for i in range(nb_fichiers):
+        dossier = os.path.join(racine, f'd{i // par_dossier:05d}')
+        if not i % par_dossier:
+            os.makedirs(dossier)
+        with open(os.path.join(dossier, f'f{i:07d}.dat'), 'wb') as fichier:
+            fichier.write(b'%016d' % i)
+
+
+def formater_tout(listing):
+    formateur = Formateur()
+    return formateur.tailles(listing.tailles), formateur.dates(listing.mtimes)
+
+
+def version_code():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparer(mesures, reference, seuil):
+    regressions = 0
+    for nom, duree in mesures.items():
+        ancienne = reference.get(nom)
+        if not ancienne or nom.endswith('.creation'):
+            continue
+        ratio = duree / ancienne
+        regression = ratio > seuil
+        regressions += regression
+        print(f"{nom:<28} {ancienne * 1000:10.1f} ms -> {duree * 1000:10.1f} ms  x{ratio:5.2f}"
+              + ("  RÉGRESSION" if regression else ""))
+    return 1 if regressions else 0
+
+
+def bench_suite(args):
+    mesures = {}
+
+    def mesurer(nom, fonction, repetitions=args.repetitions):
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            resultat = fonction()
+            durees.append(time.perf_counter() - debut)
+        mesures[nom] = min(durees)
+        print(f"{nom:<28} {mesures[nom] * 1000:10.1f} ms")
+        return resultat
+
+    with tempfile.TemporaryDirectory(dir=args.dossier) as racine:
+        plat = os.path.join(racine, 'plat')
+        os.mkdir(plat)
+        mesurer('plat.creation', lambda: creer_arbre_plat(plat, args.plat), 1)
+        listing = mesurer('plat.scan', lambda: noyau.scanner_dossier(plat))
+        for colonne in ('name', 'size', 'type', 'modified'):
+            def trier(colonne=colonne):
+                listing._tris.clear()
+                return listing.ordre_trie(colonne)
+            mesurer(f'plat.tri.{colonne}', trier)
+        mesurer('plat.filtre', lambda: noyau.ordre_affiche(listing, show_hidden=False))
+        mesurer('plat.formatage', lambda: formater_tout(listing))
+        mesurer('plat.recherche', lambda: noyau.chercher(plat, '12345'))
+        noms = listing.noms[:args.renommages]
+        plan, _ = mesurer('plat.plan_renommage', lambda: plan_renommage(noms, r'^fichier_', 'f_'))
+        mesurer('plat.renommage', lambda: TacheLot(
+            plan, lambda paire, tache: renommer_element(plat, *paire)).executer(), 1)
+        mesurer('plat.suppression', lambda: supprimer_arbre(plat), 1)
+
+        profond = os.path.join(racine, 'profond')
+        os.mkdir(profond)
+        mesurer('profond.creation', lambda: creer_chaine(profond, args.profondeur, args.par_niveau), 1)
+        mesurer('profond.recherche', lambda: noyau.chercher(profond, 'fichier_0001'))
+        mesurer('profond.suppression', lambda: supprimer_arbre(profond), 1)
+
+        minuscules = os.path.join(racine, 'minuscules')
+        os.mkdir(minuscules)
+        mesurer('minuscules.creation', lambda: creer_minuscules(minuscules, args.minuscules), 1)
+        mesurer('minuscules.recherche', lambda: noyau.chercher(minuscules, '*.dat'))
+        copie = os.path.join(racine, 'copie')
+        mesurer('minuscules.copie', lambda: Transfert([(minuscules, copie)]).executer(), 1)
+        mesurer('minuscules.suppression', lambda: supprimer_arbre(copie), 1)
+
+    resultat = {
+        'meta': {
+            'version': version_code(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plateforme': platform.platform(),
+        },
+        'parametres': {'plat': args.plat, 'renommages': args.renommages, 'profondeur': args.profondeur,
+                       'par_niveau': args.par_niveau, 'minuscules': args.minuscules,
+                       'repetitions': args.repetitions},
+        'mesures': mesures,
+    }
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultat, f, indent=2, ensure_ascii=False)
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+        if reference.get('parametres') != resultat['parametres']:
+            print("Attention : paramètres différents de la référence")
+        return comparer(mesures, reference['mesures'], args.seuil)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de l'explorateur de fichiers")
+    sous = parser.add_subparsers(dest='bench', required=True)
+    appels = sous.add_parser('appels', help="Appels système par entrée lors d'un scan")
+    appels.add_argument('--fichiers', type=int, default=10000)
+    appels.add_argument('--dossiers', type=int, default=1000)
+    appels.set_defaults(fonction=bench_appels)
+    memoire = sous.add_parser('memoire', help="Mémoire occupée par le modèle de la liste")
+    memoire.add_argument('--tailles', type=int, nargs='+', default=[10000, 100000, 1000000])
+    memoire.set_defaults(fonction=bench_memoire)
+    index = sous.add_parser('index', help="Construction et requêtes de l'index persistant")
+    index.add_argument('--fichiers', type=int, default=1000000)
+    index.add_argument('--par-dossier', type=int, default=1000)
+    index.add_argument('--repetitions', type=int, default=20)
+    index.set_defaults(fonction=bench_index)
+    transfert = sous.add_parser('transfert', help="Débit de copie : beaucoup de petits fichiers ou peu de gros")
+    transfert.add_argument('--petits', type=int, default=10000)
+    transfert.add_argument('--taille-petits', type=int, default=4096)
+    transfert.add_argument('--gros', type=int, default=4)
+    transfert.add_argument('--taille-gros', type=int, default=256 * 2**20)
+    transfert.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    transfert.add_argument('--dossier', default=None, help="Dossier temporaire (pour viser un disque précis)")
+    transfert.set_defaults(fonction=bench_transfert)
+    formatage = sous.add_parser('formatage', help="Formatage des colonnes taille et date")
+    formatage.add_argument('--entrees', type=int, default=100000)
+    formatage.add_argument('--dates-distinctes', type=int, nargs='+', default=[100, 10000, 100000])
+    formatage.set_defaults(fonction=bench_formatage)
+    suite = sous.add_parser('suite', help="Suite complète sur des arbres synthétiques, résultats en JSON")
+    suite.add_argument('--plat', type=int, default=1000000, help="Fichiers dans le dossier plat")
+    suite.add_argument('--renommages', type=int, default=10000)
+    suite.add_argument('--profondeur', type=int, default=200)
+    suite.add_argument('--par-niveau', type=int, default=10)
+    suite.add_argument('--minuscules', type=int, default=100000)
+    suite.add_argument('--repetitions', type=int, default=3)
+    suite.add_argument('--dossier', default=None, help="Dossier temporaire (pour viser un disque précis)")
+    suite.add_argument('--sortie', default=None, help="Fichier JSON où écrire les mesures")
+    suite.add_argument('--reference', default=None, help="JSON d'une exécution précédente à comparer")
+    suite.add_argument('--seuil', type=float, default=1.25, help="Ratio au-delà duquel une mesure régresse")
+    suite.set_defaults(fonction=bench_suite)
+    args = parser.parse_args()
+    sys.exit(args.fonction(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import os
+from collections import OrderedDict
+
+
+def signature_dossier(chemin):
+    stat_info = os.stat(chemin)
+    return (stat_info.st_ino, stat_info.st_mtime_ns)
+
+
+class CacheListings:
+    def __init__(self, max_entrees=32, max_octets=256 * 2**20):
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+        self.octets = 0
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, chemin):
+        return chemin in self._entrees
+
+    def obtenir(self, chemin):
+        entree = self._entrees.get(chemin)
+        if entree is None:
+            self.misses += 1
+            return None
+        signature, listing, taille = entree
+        try:
+            valide = signature_dossier(chemin) == signature
+        except OSError:
+            valide = False
+        if not valide:
+            self.invalider(chemin)
+            self.misses += 1
+            return None
+        self._entrees.move_to_end(chemin)
+        self.hits += 1
+        return listing
+
+    def consulter(self, chemin):
+        entree = self._entrees.get(chemin)
+        if entree is None:
+            self.misses += 1
+            return None, False
+        try:
+            perime = signature_dossier(chemin) != entree[0]
+        except OSError:
+            perime = True
+        self._entrees.move_to_end(chemin)
+        self.hits += 1
+        return entree[1], perime
+
+    def stocker(self, chemin, signature, listing):
+        self.invalider(chemin)
+        taille = listing.taille_memoire()
+        if taille > self.max_octets:
+            return
+        self._entrees[chemin] = (signature, listing, taille)
+        self.octets += taille
+        while len(self._entrees) > self.max_entrees or self.octets > self.max_octets:
+            _, (_, _, taille) = self._entrees.popitem(last=False)
+            self.octets -= taille
+
+    def signature(self, chemin):
+        entree = self._entrees.get(chemin)
+        return entree[0] if entree is not None else None
+
+    def actualiser_signature(self, chemin):
+        entree = self._entrees.get(chemin)
+        if entree is None:
+            return
+        try:
+            self._entrees[chemin] = (signature_dossier(chemin),) + entree[1:]
+        except OSError:
+            self.invalider(chemin)
+
+    def invalider(self, chemin):
+        entree = self._entrees.pop(chemin, None)
+        if entree is not None:
+            self.octets -= entree[2]
+
+    def vider(self):
+        self._entrees.clear()
+        self.octets = 0
+
+    def statistiques(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entrees': len(self._entrees),
+            'octets': self.octets,
+        }
@@ -0,0 +1,100 @@
+import datetime
+import os
+import platform
+import stat
+from urllib.parse import quote
+
+
+def corbeille_disponible():
+    return os.name == 'posix' and platform.system() != 'Darwin'
+
+
+def dossier_corbeille_utilisateur():
+    donnees = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(donnees, 'Trash')
+
+
+def point_montage(chemin):
+    chemin = os.path.abspath(chemin)
+    peripherique = os.lstat(chemin).st_dev
+    while True:
+        parent = os.path.dirname(chemin)
+        if parent == chemin or os.lstat(parent).st_dev != peripherique:
+            return chemin
+        chemin = parent
+
+
+def corbeille_pour(chemin):
+    peripherique = os.lstat(chemin).st_dev
+    maison = dossier_corbeille_utilisateur()
+    try:
+        os.makedirs(maison, mode=0o700, exist_ok=True)
+        if os.stat(maison).st_dev == peripherique:
+            return maison, chemin
+    except OSError:
+        pass
+    racine = point_montage(os.path.dirname(chemin))
+    uid = str(os.getuid())
+    partagee = os.path.join(racine, '.Trash')
+    try:
+        infos = os.lstat(partagee)
+        if stat.S_ISDIR(infos.st_mode) and infos.st_mode & stat.S_ISVTX:
+            dossier = os.path.join(partagee, uid)
+            os.makedirs(dossier, mode=0o700, exist_ok=True)
+            return dossier, os.path.relpath(chemin, racine)
+    except OSError:
+        pass
+    dossier = os.path.join(racine, f'.Trash-{uid}')
+    os.makedirs(dossier, mode=0o700, exist_ok=True)
+    if os.stat(dossier).st_dev != peripherique:
+        raise OSError(f"Aucune corbeille disponible sur le volume de {chemin}")
+    return dossier, os.path.relpath(chemin, racine)
+
+
+def reserver_nom(dossier_infos, dossier_fichiers, nom, contenu):
+    base, extension = os.path.splitext(nom)
+    numero = 1
+    candidat = nom
+    while True:
+        chemin_info = os.path.join(dossier_infos, candidat + '.trashinfo')
+        try:
+            if os.path.lexists(os.path.join(dossier_fichiers, candidat)):
+                raise FileExistsError(candidat)
+            fd = os.open(chemin_info, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            numero += 1
+            candidat = f"{base}.{numero}{extension}"
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(contenu)
+        return candidat, chemin_info
+
+
+def mettre_a_la_corbeille(chemin):
+    if not corbeille_disponible():
+        raise OSError("Corbeille freedesktop indisponible sur ce système")
+    chemin = os.path.abspath(chemin)
+    corbeille, chemin_info_path = corbeille_pour(chemin)
+    fichiers = os.path.join(corbeille, 'files')
+    infos = os.path.join(corbeille, 'info')
+    os.makedirs(fichiers, mode=0o700, exist_ok=True)
+    os.makedirs(infos, mode=0o700, exist_ok=True)
+    contenu = (f"[Trash Info]\nPath={quote(chemin_info_path)}\n"
+               f"DeletionDate={datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}\n")
+    while True:
+        nom, chemin_info = reserver_nom(infos, fichiers, os.path.basename(chemin), contenu)
+        destination = os.path.join(fichiers, nom)
+        if os.path.lexists(destination):
+            os.remove(chemin_info)
+            continue
+        try:
+            os.rename(chemin, destination)
+        except OSError:
+            os.remove(chemin_info)
+            raise
+        return destination
+
+
+def mettre_element_a_la_corbeille(chemin, tache):
+    mettre_a_la_corbeille(chemin)
+    tache.compter()
@@ -0,0 +1,226 @@
+import hashlib
+import mmap
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+TAILLE_EXTREMITE = 64 * 1024
+TAILLE_BLOC = 16 * 2**20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS empreintes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    taille INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partielle BLOB,
+    complete BLOB,
+    PRIMARY KEY (dev, ino, taille, mtime_ns)
+) WITHOUT ROWID;
+"""
+
+
+def chemin_cache_defaut():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'explorateur', 'empreintes.sqlite')
+
+
+def empreinte_partielle(chemin, taille):
+    empreinte = hashlib.blake2b(digest_size=16)
+    with open(chemin, 'rb') as f:
+        empreinte.update(f.read(TAILLE_EXTREMITE))
+        if taille > TAILLE_EXTREMITE:
+            f.seek(max(TAILLE_EXTREMITE, taille - TAILLE_EXTREMITE))
+            empreinte.update(f.read(TAILLE_EXTREMITE))
+    return empreinte.digest()
+
+
+def empreinte_complete(chemin, taille=None):
+    empreinte = hashlib.blake2b(digest_size=32)
+    with open(chemin, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if hasattr(m, 'madvise'):
+                    m.madvise(mmap.MADV_SEQUENTIAL)
+                for debut in range(0, len(m), TAILLE_BLOC):
+                    empreinte.update(m[debut:debut + TAILLE_BLOC])
+    return empreinte.digest()
+
+
+class RechercheDoublons:
+    def __init__(self, racine, show_hidden, retour, sur_progres, sur_fin, cache=None, nb_processus=None,
+                 nb_lecteurs=8, intervalle=0.1):
+        self.racine = racine
+        self.show_hidden = show_hidden
+        self.retour = retour
+        self.sur_progres = sur_progres
+        self.sur_fin = sur_fin
+        self.cache = cache or chemin_cache_defaut()
+        self.nb_processus = nb_processus or os.cpu_count() or 2
+        self.nb_lecteurs = nb_lecteurs
+        self.intervalle = intervalle
+        self.annulee = threading.Event()
+        self.erreurs = []
+        self.groupes = []
+        self.phase = "Parcours"
+        self.faits = 0
+        self.total = 0
+        self.stats = {'fichiers': 0, 'liens_ignores': 0, 'partielles': 0, 'completes': 0,
+                      'depuis_cache': 0, 'octets_doublons': 0, 'duree': 0.0}
+        self.dernier_rapport = 0.0
+        self.thread = threading.Thread(target=self.executer, daemon=True)
+
+    def lancer(self):
+        self.thread.start()
+        return self
+
+    def annuler(self):
+        self.annulee.set()
+
+    def etat(self):
+        return {'phase': self.phase, 'faits': self.faits, 'total': self.total}
+
+    def _rapporter(self, forcer=False):
+        maintenant = time.perf_counter()
+        if forcer or maintenant - self.dernier_rapport >= self.intervalle:
+            self.dernier_rapport = maintenant
+            self.retour.poster(self.sur_progres, self.etat())
+
+    def _phase(self, phase, total):
+        self.phase = phase
+        self.faits = 0
+        self.total = total
+        self._rapporter(forcer=True)
+
+    def executer(self):
+        debut = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(self.cache), exist_ok=True)
+            connexion = sqlite3.connect(self.cache)
+            connexion.execute('PRAGMA journal_mode=WAL')
+            connexion.execute('PRAGMA synchronous=NORMAL')
+            connexion.executescript(SCHEMA)
+            try:
+                self._executer(connexion)
+            finally:
+                connexion.commit()
+                connexion.close()
+        except Exception as e:
+            self.erreurs.append((self.racine, str(e) or type(e).__name__))
+        finally:
+            self.stats['duree'] = time.perf_counter() - debut
+            self.retour.poster(self.sur_fin, self)
+
+    def _executer(self, connexion):
+        par_taille = self._parcourir()
+        candidats = [fichiers for fichiers in par_taille.values() if len(fichiers) > 1]
+        groupes = self._affiner(connexion, candidats, 'partielle', "Empreintes partielles")
+        if self.annulee.is_set():
+            return
+        courts = [fichiers for fichiers in groupes if fichiers[0][1].st_size <= 2 * TAILLE_EXTREMITE]
+        longs = [fichiers for fichiers in groupes if fichiers[0][1].st_size > 2 * TAILLE_EXTREMITE]
+        groupes = courts + self._affiner(connexion, longs, 'complete', "Empreintes complètes")
+        if self.annulee.is_set():
+            return
+        groupes.sort(key=lambda fichiers: fichiers[0][1].st_size * (len(fichiers) - 1), reverse=True)
+        self.groupes = [[(chemin, stat_info) for chemin, stat_info in sorted(fichiers)] for fichiers in groupes]
+        self.stats['octets_doublons'] = sum(fichiers[0][1].st_size * (len(fichiers) - 1) for fichiers in groupes)
+
+    def _parcourir(self):
+        self._phase("Parcours", 0)
+        par_taille = defaultdict(list)
+        vus = set()
+        pile = [self.racine]
+        while pile and not self.annulee.is_set():
+            dossier = pile.pop()
+            try:
+                with os.scandir(dossier) as it:
+                    for entry in it:
+                        if not self.show_hidden and entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pile.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            stat_info = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if not stat_info.st_size:
+                            continue
+                        if stat_info.st_nlink > 1:
+                            if (stat_info.st_dev, stat_info.st_ino) in vus:
+                                self.stats['liens_ignores'] += 1
+                                continue
+                            vus.add((stat_info.st_dev, stat_info.st_ino))
+                        par_taille[stat_info.st_size].append((entry.path, stat_info))
+                        self.stats['fichiers'] += 1
+                        self.faits += 1
+            except OSError as e:
+                self.erreurs.append((dossier, str(e)))
+            self._rapporter()
+        return par_taille
+
+    def _affiner(self, connexion, groupes, colonne, phase):
+        partielle = colonne == 'partielle'
+        fichiers = [fichier for groupe in groupes for fichier in groupe]
+        self._phase(phase, len(fichiers) if partielle else sum(stat_info.st_size for _, stat_info in fichiers))
+        empreintes = {}
+        a_calculer = []
+        for chemin, stat_info in fichiers:
+            cle = (stat_info.st_dev, stat_info.st_ino, stat_info.st_size, stat_info.st_mtime_ns)
+            ligne = connexion.execute(f'SELECT {colonne} FROM empreintes WHERE dev=? AND ino=? AND taille=? '
+                                      'AND mtime_ns=?', cle).fetchone()
+            if ligne is not None and ligne[0] is not None:
+                empreintes[chemin] = ligne[0]
+                self.stats['depuis_cache'] += 1
+                self.faits += 1 if partielle else stat_info.st_size
+            else:
+                a_calculer.append((chemin, stat_info, cle))
+        self._rapporter()
+        if partielle:
+            resultats = self._calculer(ThreadPoolExecutor(max_workers=self.nb_lecteurs), empreinte_partielle,
+                                       a_calculer, lambda stat_info: 1)
+        else:
+            resultats = self._calculer(ProcessPoolExecutor(max_workers=self.nb_processus,
+                                                           mp_context=multiprocessing.get_context('spawn')),
+                                       empreinte_complete, a_calculer, lambda stat_info: stat_info.st_size)
+        for (chemin, stat_info, cle), empreinte in resultats:
+            empreintes[chemin] = empreinte
+            self.stats['partielles' if partielle else 'completes'] += 1
+            connexion.execute(f'INSERT INTO empreintes (dev, ino, taille, mtime_ns, {colonne}) VALUES (?, ?, ?, ?, ?) '
+                              f'ON CONFLICT (dev, ino, taille, mtime_ns) DO UPDATE SET {colonne} = excluded.{colonne}', cle + (empreinte,))
+        connexion.commit()
+        affines = []
+        for groupe in groupes:
+            par_empreinte = defaultdict(list)
+            for chemin, stat_info in groupe:
+                if chemin in empreintes:
+                    par_empreinte[empreintes[chemin]].append((chemin, stat_info))
+            affines.extend(fichiers for fichiers in par_empreinte.values() if len(fichiers) > 1)
+        return affines
+
+    def _calculer(self, executeur, fonction, fichiers, poids):
+        resultats = []
+        if not fichiers:
+            executeur.shutdown()
+            return resultats
+        with executeur:
+            futures = {executeur.submit(fonction, fichier[0], fichier[1].st_size): fichier for fichier in fichiers}
+            for future in as_completed(futures):
+                if self.annulee.is_set():
+                    executeur.shutdown(wait=True, cancel_futures=True)
+                    break
+                fichier = futures[future]
+                try:
+                    resultats.append((fichier, future.result()))
+                except Exception as e:
+                    self.erreurs.append((fichier[0], str(e) or type(e).__name__))
+                self.faits += poids(fichier[1])
+                self._rapporter()
+        return resultats
@@ -0,0 +1,57 @@
+import re
+import time
+from array import array
+
+
+def compiler_filtre(requete, approche=False):
+    requete = requete.casefold()
+    if approche:
+        regex = re.compile('.*?'.join(map(re.escape, requete)))
+        return lambda nom: regex.search(nom) is not None
+    return lambda nom: requete in nom
+
+
+def est_sous_sequence(courte, longue):
+    reste = iter(longue)
+    return all(caractere in reste for caractere in courte)
+
+
+def affine(ancienne, nouvelle, approche=False):
+    ancienne, nouvelle = ancienne.casefold(), nouvelle.casefold()
+    if approche:
+        return est_sous_sequence(ancienne, nouvelle)
+    return ancienne in nouvelle
+
+
+class FiltreIncremental:
+    def __init__(self, requete, approche, noms_casefold, candidats, taille_pas=20000):
+        self.requete = requete
+        self.approche = approche
+        self.noms = noms_casefold
+        self.candidats = candidats
+        self.predicat = compiler_filtre(requete, approche)
+        self.taille_pas = taille_pas
+        self.resultat = array('l')
+        self.position = 0
+
+    @property
+    def termine(self):
+        return self.position >= len(self.candidats)
+
+    def accepte(self, nom_casefold):
+        return self.predicat(nom_casefold)
+
+    def avancer(self, budget=0.008):
+        debut = time.perf_counter()
+        noms = self.noms
+        predicat = self.predicat
+        while not self.termine:
+            fin = min(self.position + self.taille_pas, len(self.candidats))
+            self.resultat.extend([index for index in self.candidats[self.position:fin] if predicat(noms[index])])
+            self.position = fin
+            if time.perf_counter() - debut >= budget:
+                break
+        return self.termine
+
+    def peut_affiner(self, requete, approche):
+        return self.termine and approche == self.approche and affine(self.requete, requete, approche)
@@ -0,0 +1,65 @@
+import datetime
+import locale
+import math
+
+UNITES = ['O', 'KB', 'MB', 'GB', 'TB']
+FORMAT_DATE = '%d/%m/%Y %H:%M:%S'
+FORMAT_DATE_LOCAL = '%x %X'
+
+
+def unite(taille):
+    if taille < 1024:
+        return 0
+    return min((int(taille).bit_length() - 1) // 10, len(UNITES) - 1)
+
+
+def initialiser_locale():
+    for categorie in (locale.LC_NUMERIC, locale.LC_TIME):
+        try:
+            locale.setlocale(categorie, '')
+        except locale.Error:
+            pass
+
+
+class Formateur:
+    def __init__(self, localise=False, max_dates=65536):
+        self.localise = localise
+        self.max_dates = max_dates
+        self.format_date = FORMAT_DATE
+        if localise:
+            self.format_date = FORMAT_DATE_LOCAL
+        self._dates = {}
+        self._diviseurs = [float(1 << (10 * rang)) for rang in range(len(UNITES))]
+
+    def taille(self, taille):
+        rang = unite(taille)
+        if rang == 0:
+            return f"{taille} B"
+        valeur = taille / self._diviseurs[rang]
+        if self.localise:
+            return f"{locale.format_string('%.2f', valeur, grouping=True)} {UNITES[rang]}"
+        return f"{valeur:.2f} {UNITES[rang]}"
+
+    def tailles(self, tailles):
+        return [self.taille(taille) for taille in tailles]
+
+    def date(self, horodatage):
+        seconde = math.floor(horodatage)
+        texte = self._dates.get(seconde)
+        if texte is None:
+            if len(self._dates) >= self.max_dates:
+                self._dates.clear()
+            try:
+                texte = datetime.datetime.fromtimestamp(seconde).strftime(self.format_date)
+            except (OverflowError, OSError, ValueError):
+                texte = ''
+            self._dates[seconde] = texte
+        return texte
+
+    def dates(self, horodatages):
+        cache = self._dates
+        resultat = []
+        for horodatage in horodatages:
+            texte = cache.get(math.floor(horodatage))
+            resultat.append(texte if texte is not None else self.date(horodatage))
+        return resultat
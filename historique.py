@@ -0,0 +1,27 @@
+from collections import deque
+
+
+class Historique:
+    def __init__(self, max_entrees=100):
+        self.precedents = deque(maxlen=max_entrees)
+        self.suivants = deque(maxlen=max_entrees)
+
+    def visiter(self, etat):
+        self.precedents.append(etat)
+        self.suivants.clear()
+
+    def peut_reculer(self):
+        return bool(self.precedents)
+
+    def peut_avancer(self):
+        return bool(self.suivants)
+
+    def reculer(self, etat_courant):
+        etat = self.precedents.pop()
+        self.suivants.append(etat_courant)
+        return etat
+
+    def avancer(self, etat_courant):
+        etat = self.suivants.pop()
+        self.precedents.append(etat_courant)
+        return etat
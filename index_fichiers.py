@@ -0,0 +1,172 @@
+import argparse
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dossiers (
+    id INTEGER PRIMARY KEY,
+    chemin TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fichiers (
+    id INTEGER PRIMARY KEY,
+    dossier INTEGER NOT NULL,
+    nom TEXT NOT NULL,
+    taille INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    est_dossier INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fichiers_dossier ON fichiers(dossier);
+CREATE VIRTUAL TABLE IF NOT EXISTS noms USING fts5(
+    nom, content='fichiers', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS fichiers_ai AFTER INSERT ON fichiers BEGIN
+    INSERT INTO noms(rowid, nom) VALUES (new.id, new.nom);
+END;
+CREATE TRIGGER IF NOT EXISTS fichiers_ad AFTER DELETE ON fichiers BEGIN
+    INSERT INTO noms(noms, rowid, nom) VALUES ('delete', old.id, old.nom);
+END;
+"""
+
+
+def chemin_index_defaut():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'explorateur', 'index.sqlite')
+
+
+class IndexFichiers:
+    def __init__(self, chemin=None, mmap_octets=1 << 30):
+        self.chemin = chemin or chemin_index_defaut()
+        os.makedirs(os.path.dirname(self.chemin), exist_ok=True)
+        self.connexion = sqlite3.connect(self.chemin)
+        self.connexion.execute('PRAGMA journal_mode=WAL')
+        self.connexion.execute('PRAGMA synchronous=NORMAL')
+        self.connexion.execute(f'PRAGMA mmap_size={int(mmap_octets)}')
+        self.connexion.executescript(SCHEMA)
+
+    def fermer(self):
+        self.connexion.close()
+
+    def mettre_a_jour(self, racine, annulee=None, sur_progres=None, lot_commit=500):
+        racine = os.path.abspath(racine)
+        connexion = self.connexion
+        pile = [racine]
+        stats = {'dossiers': 0, 'rescannes': 0, 'entrees': 0}
+        while pile:
+            if annulee is not None and annulee.is_set():
+                break
+            chemin = pile.pop()
+            stats['dossiers'] += 1
+            ligne = connexion.execute('SELECT id, mtime_ns, ino FROM dossiers WHERE chemin = ?',
+                                      (chemin,)).fetchone()
+            try:
+                stat_info = os.stat(chemin)
+            except OSError:
+                if ligne is not None:
+                    self._supprimer_arbre(chemin)
+                continue
+            if ligne is not None and ligne[1] == stat_info.st_mtime_ns and ligne[2] == stat_info.st_ino:
+                pile.extend(os.path.join(chemin, nom) for (nom,) in connexion.execute(
+                    'SELECT nom FROM fichiers WHERE dossier = ? AND est_dossier = 1', (ligne[0],)))
+                continue
+            stats['rescannes'] += 1
+            pile.extend(self._rescanner(chemin, stat_info, ligne, stats))
+            if stats['rescannes'] % lot_commit == 0:
+                connexion.commit()
+                if sur_progres is not None:
+                    sur_progres(dict(stats))
+        connexion.commit()
+        return stats
+
+    def _rescanner(self, chemin, stat_info, ligne, stats):
+        connexion = self.connexion
+        lignes = []
+        sous_dossiers = set()
+        try:
+            with os.scandir(chemin) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        entry_stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        sous_dossiers.add(entry.name)
+                    lignes.append((entry.name, 0 if is_dir else entry_stat.st_size, entry_stat.st_mtime, int(is_dir)))
+        except OSError:
+            pass
+        stats['entrees'] += len(lignes)
+        if ligne is None:
+            dossier = connexion.execute('INSERT INTO dossiers(chemin, mtime_ns, ino) VALUES (?, ?, ?)',
+                                        (chemin, stat_info.st_mtime_ns, stat_info.st_ino)).lastrowid
+        else:
+            dossier = ligne[0]
+            anciens = {nom for (nom,) in connexion.execute(
+                'SELECT nom FROM fichiers WHERE dossier = ? AND est_dossier = 1', (dossier,))}
+            for nom in anciens - sous_dossiers:
+                self._supprimer_arbre(os.path.join(chemin, nom))
+            connexion.execute('DELETE FROM fichiers WHERE dossier = ?', (dossier,))
+            connexion.execute('UPDATE dossiers SET mtime_ns = ?, ino = ? WHERE id = ?',
+                              (stat_info.st_mtime_ns, stat_info.st_ino, dossier))
+        connexion.executemany('INSERT INTO fichiers(dossier, nom, taille, mtime, est_dossier) VALUES (?, ?, ?, ?, ?)',
+                              [(dossier,) + ligne_fichier for ligne_fichier in lignes])
+        return [os.path.join(chemin, nom) for nom in sous_dossiers]
+
+    def _supprimer_arbre(self, chemin):
+        prefixe = os.path.join(chemin, '')
+        fin = prefixe[:-1] + chr(ord(prefixe[-1]) + 1)
+        ids = [identifiant for (identifiant,) in self.connexion.execute(
+            'SELECT id FROM dossiers WHERE chemin = ? OR (chemin >= ? AND chemin < ?)', (chemin, prefixe, fin))]
+        for identifiant in ids:
+            self.connexion.execute('DELETE FROM fichiers WHERE dossier = ?', (identifiant,))
+            self.connexion.execute('DELETE FROM dossiers WHERE id = ?', (identifiant,))
+
+    def chercher(self, texte, limite=500):
+        if len(texte) >= 3:
+            requete = ('SELECT d.chemin, f.nom, f.taille, f.mtime, f.est_dossier FROM noms '
+                       'JOIN fichiers f ON f.id = noms.rowid JOIN dossiers d ON d.id = f.dossier '
+                       'WHERE noms MATCH ? LIMIT ?')
+            parametre = '"' + texte.replace('"', '""') + '"'
+        else:
+            requete = ('SELECT d.chemin, f.nom, f.taille, f.mtime, f.est_dossier FROM fichiers f '
+                       'JOIN dossiers d ON d.id = f.dossier WHERE f.nom LIKE ? ESCAPE \'\\\' LIMIT ?')
+            parametre = '%' + texte.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return [(os.path.join(dossier, nom), taille, mtime, bool(est_dossier))
+                for dossier, nom, taille, mtime, est_dossier in self.connexion.execute(requete, (parametre, limite))]
+
+    def statistiques(self):
+        nb_dossiers, = self.connexion.execute('SELECT COUNT(*) FROM dossiers').fetchone()
+        nb_fichiers, = self.connexion.execute('SELECT COUNT(*) FROM fichiers').fetchone()
+        octets = sum(os.path.getsize(chemin) for chemin in (self.chemin, self.chemin + '-wal')
+                     if os.path.exists(chemin))
+        return {'dossiers': nb_dossiers, 'entrees': nb_fichiers, 'octets': octets}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index persistant des noms de fichiers")
+    parser.add_argument('--base', default=None, help="Fichier d'index (par défaut dans ~/.cache/explorateur)")
+    sous = parser.add_subparsers(dest='commande', required=True)
+    construire = sous.add_parser('construire', help="Construit ou met à jour l'index d'une racine")
+    construire.add_argument('racine')
+    chercher = sous.add_parser('chercher', help="Cherche un nom dans l'index")
+    chercher.add_argument('texte')
+    chercher.add_argument('--limite', type=int, default=50)
+    args = parser.parse_args()
+    index = IndexFichiers(args.base)
+    debut = time.perf_counter()
+    if args.commande == 'construire':
+        stats = index.mettre_a_jour(args.racine)
+        print(f"{stats['dossiers']} dossiers vus, {stats['rescannes']} rescannés, "
+              f"{stats['entrees']} entrées en {time.perf_counter() - debut:.2f} s")
+    else:
+        resultats = index.chercher(args.texte, args.limite)
+        for chemin, taille, mtime, est_dossier in resultats:
+            print(chemin + (os.sep if est_dossier else ''))
+        print(f"{len(resultats)} résultats en {(time.perf_counter() - debut) * 1000:.1f} ms")
+    index.fermer()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+METHODES_TK = ('insert', 'item', 'delete', 'move', 'selection_set', 'focus', 'bbox', 'heading', 'identify_row')
+
+compteurs = Counter()
+comptage_actif = False
+_verrou = threading.Lock()
+_installes = False
+
+
+def compter(nom, nb=1):
+    if comptage_actif:
+        with _verrou:
+            compteurs[nom] += nb
+
+
+def releve():
+    with _verrou:
+        return Counter(compteurs)
+
+
+def _compter(nom, fonction):
+    @functools.wraps(fonction)
+    def compteur(*args, **kwargs):
+        compter(nom)
+        return fonction(*args, **kwargs)
+    return compteur
+
+
+def installer_compteurs():
+    global _installes
+    if _installes:
+        return
+    _installes = True
+    from tkinter import ttk
+    for nom in METHODES_TK:
+        setattr(ttk.Treeview, nom, _compter(f'tk.{nom}', getattr(ttk.Treeview, nom)))
+
+
+class _OperationInactive:
+    def phase(self, nom):
+        return contextlib.nullcontext()
+
+    def ajouter_phase(self, nom, duree):
+        pass
+
+    def terminer(self):
+        pass
+
+
+OPERATION_INACTIVE = _OperationInactive()
+
+
+class Operation:
+    def __init__(self, instrumentation, nom, profil=None):
+        self.instrumentation = instrumentation
+        self.nom = nom
+        self.profil = profil
+        self.phases = OrderedDict()
+        self.compteurs = releve()
+        self.debut = time.perf_counter()
+        self.duree = None
+        self.appels = None
+
+    @contextlib.contextmanager
+    def phase(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            self.ajouter_phase(nom, fin - debut)
+            self.instrumentation.evenement(nom, debut, fin, categorie=self.nom)
+
+    def ajouter_phase(self, nom, duree):
+        self.phases[nom] = self.phases.get(nom, 0.0) + duree
+
+    def terminer(self):
+        if self.duree is not None:
+            return
+        fin = time.perf_counter()
+        self.duree = fin - self.debut
+        self.appels = releve()
+        self.appels.subtract(self.compteurs)
+        self.appels = {nom: nombre for nom, nombre in self.appels.items() if nombre > 0}
+        if self.profil is not None:
+            self.profil.disable()
+        self.instrumentation.evenement(self.nom, self.debut, fin, categorie='operation', args=self.appels)
+        self.instrumentation.terminer(self)
+
+    def resume(self):
+        phases = ", ".join(f"{nom} {duree * 1000:.1f} ms" for nom, duree in self.phases.items())
+        reste = self.duree - sum(self.phases.values())
+        if self.phases and reste > 0.0005:
+            phases += f", hors phases {reste * 1000:.1f} ms"
+        appels = " ".join(f"{nom}={nombre}" for nom, nombre in sorted(self.appels.items()))
+        return f"{self.nom} {self.duree * 1000:.1f} ms" + (f" — {phases}" if phases else "") + \
+            (f" | {appels}" if appels else "")
+
+
+class Instrumentation:
+    def __init__(self, taille=10000, nb_operations=100, dossier_profils=None):
+        self.actif = False
+        self.evenements = deque(maxlen=taille)
+        self.operations = deque(maxlen=nb_operations)
+        self.sur_operation = None
+        self.profiler_prochaine = None
+        cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        self.dossier_profils = dossier_profils or os.path.join(cache, 'explorateur', 'profils')
+        self.origine = time.perf_counter()
+        self.pid = os.getpid()
+
+    def activer(self, actif=True):
+        global comptage_actif
+        if actif:
+            installer_compteurs()
+        self.actif = comptage_actif = actif
+
+    def operation(self, nom):
+        if not self.actif:
+            return OPERATION_INACTIVE
+        profil = None
+        if self.profiler_prochaine == nom:
+            self.profiler_prochaine = None
+            profil = cProfile.Profile()
+            profil.enable()
+        return Operation(self, nom, profil)
+
+    @contextlib.contextmanager
+    def mesurer(self, nom):
+        operation = self.operation(nom)
+        try:
+            yield operation
+        finally:
+            operation.terminer()
+
+    def evenement(self, nom, debut, fin, categorie='', args=None):
+        if not self.actif:
+            return
+        self.evenements.append({
+            'name': nom, 'cat': categorie, 'ph': 'X', 'pid': self.pid, 'tid': threading.get_ident(),
+            'ts': (debut - self.origine) * 1e6, 'dur': (fin - debut) * 1e6, 'args': args or {},
+        })
+
+    def terminer(self, operation):
+        self.operations.append(operation)
+        if operation.profil is not None:
+            os.makedirs(self.dossier_profils, exist_ok=True)
+            operation.fichier_profil = os.path.join(self.dossier_profils,
+                                                    f"{operation.nom}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+            operation.profil.dump_stats(operation.fichier_profil)
+        if self.sur_operation is not None:
+            self.sur_operation(operation)
+
+    def exporter_trace(self, chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': list(self.evenements), 'displayTimeUnit': 'ms'}, f)
+        return len(self.evenements)
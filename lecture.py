@@ -0,0 +1,22 @@
+import os
+
+
+def lire_dossier(chemin, show_hidden=True):
+    with os.scandir(chemin) as it:
+        for entry in it:
+            if not show_hidden and entry.name.startswith('.'):
+                continue
+            yield entry
+
+
+def est_dossier(entry):
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def sous_dossiers(chemin, show_hidden=True):
+    for entry in lire_dossier(chemin, show_hidden):
+        if est_dossier(entry):
+            yield entry
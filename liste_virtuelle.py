@@ -0,0 +1,216 @@
+import tkinter as tk
+
+
+class ListeVirtuelle:
+    def __init__(self, treeview, scrollbar, rendu, sur_selection=None, sur_rafraichir=None):
+        self.tv = treeview
+        self.sb = scrollbar
+        self.rendu = rendu
+        self.sur_selection = sur_selection
+        self.sur_rafraichir = sur_rafraichir
+        self.nb = 0
+        self.debut = 0
+        self.items = []
+        self.selection_modele = set()
+        self.focus_modele = None
+        self.ancre = None
+        self.hauteur_ligne = 20
+        self.haut_lignes = 25
+        self.sb.config(command=self._sur_scrollbar)
+        self.tv.config(yscrollcommand='')
+        self.tv.bind('<Configure>', lambda event: self.rafraichir())
+        self.tv.bind('<<TreeviewSelect>>', self._sur_selection_tk)
+        self.tv.bind('<ButtonPress-1>', self._sur_clic)
+        self.tv.bind('<Control-a>', lambda event: self.tout_selectionner())
+        self.tv.bind('<MouseWheel>', self._sur_molette)
+        self.tv.bind('<Button-4>', lambda event: self.defiler(-3))
+        self.tv.bind('<Button-5>', lambda event: self.defiler(3))
+        for touche, pas in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-'), ('<Next>', 'page+'),
+                            ('<Home>', 'debut'), ('<End>', 'fin')):
+            self.tv.bind(touche, lambda event, pas=pas: self._sur_touche(pas))
+            self.tv.bind(f'<Shift-{touche[1:]}', lambda event, pas=pas: self._sur_touche(pas, etendre=True))
+
+    def capacite(self):
+        hauteur = self.tv.winfo_height()
+        if hauteur <= 1:
+            return 50
+        return max(1, (hauteur - self.haut_lignes) // self.hauteur_ligne)
+
+    def definir_taille(self, nb):
+        self.nb = nb
+        self.selection_modele = {i for i in self.selection_modele if i < nb}
+        if self.focus_modele is not None and self.focus_modele >= nb:
+            self.focus_modele = None
+        self.rafraichir()
+
+    def vider(self):
+        self.debut = 0
+        self.selection_modele = set()
+        self.focus_modele = None
+        self.ancre = None
+        self.definir_taille(0)
+
+    def inserer(self, position, selectionne=False):
+        self.nb += 1
+        self.selection_modele = {i + 1 if i >= position else i for i in self.selection_modele}
+        if selectionne:
+            self.selection_modele.add(position)
+        if self.focus_modele is not None and self.focus_modele >= position:
+            self.focus_modele += 1
+        if selectionne and self.focus_modele is None:
+            self.focus_modele = position
+        if position < self.debut:
+            self.debut += 1
+
+    def retirer(self, position):
+        self.nb -= 1
+        selectionne = position in self.selection_modele
+        self.selection_modele = {i - 1 if i > position else i for i in self.selection_modele if i != position}
+        if self.focus_modele == position:
+            self.focus_modele = None
+        elif self.focus_modele is not None and self.focus_modele > position:
+            self.focus_modele -= 1
+        if position < self.debut:
+            self.debut -= 1
+        return selectionne
+
+    def rafraichir(self):
+        capacite = self.capacite()
+        self.debut = max(0, min(self.debut, self.nb - capacite))
+        nb_visibles = max(0, min(capacite, self.nb - self.debut))
+        while len(self.items) < nb_visibles:
+            self.items.append(self.tv.insert('', 'end'))
+        if len(self.items) > nb_visibles:
+            self.tv.delete(*self.items[nb_visibles:])
+            del self.items[nb_visibles:]
+        for k, item in enumerate(self.items):
+            text, values, tags = self.rendu(self.debut + k)
+            self.tv.item(item, text=text, values=values, tags=tags)
+        self._mesurer()
+        self.tv.selection_set([item for k, item in enumerate(self.items)
+                               if self.debut + k in self.selection_modele])
+        focus = self.item_de_index(self.focus_modele)
+        if focus:
+            self.tv.focus(focus)
+        if self.nb:
+            self.sb.set(self.debut / self.nb, (self.debut + nb_visibles) / self.nb)
+        else:
+            self.sb.set(0, 1)
+        if self.sur_rafraichir:
+            self.sur_rafraichir()
+
+    def _mesurer(self):
+        if not self.items:
+            return
+        bbox = self.tv.bbox(self.items[0])
+        if bbox:
+            self.haut_lignes = bbox[1]
+            self.hauteur_ligne = max(1, bbox[3])
+
+    def index_item(self, item):
+        try:
+            return self.debut + self.items.index(item)
+        except ValueError:
+            return None
+
+    def item_de_index(self, index):
+        if index is None or not self.debut <= index < self.debut + len(self.items):
+            return None
+        return self.items[index - self.debut]
+
+    def index_sous_curseur(self, y):
+        return self.index_item(self.tv.identify_row(y))
+
+    def selection(self):
+        return sorted(self.selection_modele)
+
+    def tout_selectionner(self):
+        if str(self.tv.cget('selectmode')) == 'extended':
+            self.selectionner(range(self.nb), focus=self.focus_modele, voir=False)
+        return 'break'
+
+    def selectionner(self, indices, focus=None, voir=True, ancre=None):
+        self.selection_modele = set(indices)
+        if focus is None and self.selection_modele:
+            focus = min(self.selection_modele)
+        self.focus_modele = focus
+        self.ancre = ancre if ancre is not None else focus
+        if focus is not None and voir:
+            self.voir(focus)
+        self.rafraichir()
+        if self.sur_selection:
+            self.sur_selection()
+
+    def voir(self, index):
+        capacite = self.capacite()
+        if index < self.debut:
+            self.debut = index
+        elif index >= self.debut + capacite:
+            self.debut = index - capacite + 1
+
+    def defiler(self, delta):
+        self.debut += delta
+        self.rafraichir()
+        return 'break'
+
+    def _sur_molette(self, event):
+        return self.defiler(-3 if event.delta > 0 else 3)
+
+    def _sur_scrollbar(self, action, valeur, unite=None):
+        if action == tk.MOVETO:
+            self.debut = int(float(valeur) * self.nb)
+        elif unite == 'pages':
+            self.debut += int(valeur) * self.capacite()
+        else:
+            self.debut += int(valeur)
+        self.rafraichir()
+
+    def _sur_touche(self, pas, etendre=False):
+        if not self.nb:
+            return 'break'
+        courant = self.focus_modele if self.focus_modele is not None else -1
+        if pas == 'debut':
+            cible = 0
+        elif pas == 'fin':
+            cible = self.nb - 1
+        elif pas == 'page-':
+            cible = courant - self.capacite()
+        elif pas == 'page+':
+            cible = courant + self.capacite()
+        else:
+            cible = courant + pas
+        cible = max(0, min(cible, self.nb - 1))
+        self._choisir(cible, etendre=etendre)
+        return 'break'
+
+    def _choisir(self, index, etendre=False, basculer=False):
+        etendu = str(self.tv.cget('selectmode')) == 'extended'
+        if etendu and etendre and self.ancre is not None:
+            debut, fin = sorted((self.ancre, index))
+            self.selectionner(range(debut, fin + 1), focus=index, ancre=self.ancre)
+        elif etendu and basculer:
+            self.selectionner(self.selection_modele ^ {index}, focus=index)
+        else:
+            self.selectionner([index], focus=index)
+
+    def _sur_clic(self, event):
+        if self.tv.identify_region(event.x, event.y) not in ('tree', 'cell'):
+            return None
+        index = self.index_sous_curseur(event.y)
+        if index is None:
+            return None
+        self.tv.focus_set()
+        self._choisir(index, etendre=bool(event.state & 0x0001), basculer=bool(event.state & 0x0004))
+        return 'break'
+
+    def _sur_selection_tk(self, event):
+        visibles = set(range(self.debut, self.debut + len(self.items)))
+        choisis = {self.index_item(item) for item in self.tv.selection()}
+        nouvelle = (self.selection_modele - visibles) | choisis
+        focus = self.index_item(self.tv.focus())
+        if focus is not None:
+            self.focus_modele = focus
+        if nouvelle != self.selection_modele:
+            self.selection_modele = nouvelle
+            if self.sur_selection:
+                self.sur_selection()
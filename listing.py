@@ -0,0 +1,260 @@
+import os
+import stat
+import sys
+from array import array
+from types_contenu import LIBELLE_SPECIAL, type_extension
+
+
+class _Inverse:
+    __slots__ = ('valeur',)
+
+    def __init__(self, valeur):
+        self.valeur = valeur
+
+    def __lt__(self, autre):
+        return autre.valeur < self.valeur
+
+    def __eq__(self, autre):
+        return self.valeur == autre.valeur
+
+
+class DirectoryListing:
+    TYPE_DOSSIER = 0
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.noms = []
+        self.tailles = array('q')
+        self.disques = array('q')
+        self.mtimes = array('d')
+        self.ctimes = array('d')
+        self.types = array('I')
+        self.libelles_types = ['Dossier']
+        self._codes_types = {}
+        self._tris = {}
+        self._index_noms = None
+        self.supprimes = set()
+        self.types_affines = set()
+        self.tailles_dossiers = False
+        self._noms_casefold = []
+
+    def __len__(self):
+        return len(self.noms)
+
+    def code_type(self, nom):
+        return self.code_libelle(type_extension(nom))
+
+    def code_libelle(self, libelle):
+        code = self._codes_types.get(libelle)
+        if code is None:
+            code = len(self.libelles_types)
+            self._codes_types[libelle] = code
+            self.libelles_types.append(libelle)
+        return code
+
+    def definir_type(self, index, libelle):
+        self.types_affines.add(index)
+        code = self.code_libelle(libelle)
+        if self.types[index] == code:
+            return False
+        self.types[index] = code
+        self._tris.pop('type', None)
+        return True
+
+    def ajouter(self, nom, is_dir, stat_info):
+        index = self.ajouter_valeurs(nom, is_dir, stat_info.st_size if not is_dir else 0,
+                                     stat_info.st_mtime, stat_info.st_ctime,
+                                     (getattr(stat_info, 'st_blocks', 0) or 0) * 512 if not is_dir else 0)
+        if not is_dir and not stat.S_ISREG(stat_info.st_mode):
+            self.definir_type(index, LIBELLE_SPECIAL)
+        return index
+
+    def ajouter_valeurs(self, nom, is_dir, taille, mtime, ctime, disque=0):
+        index = len(self.noms)
+        self.noms.append(nom)
+        self.tailles.append(taille)
+        self.disques.append(disque)
+        self.mtimes.append(mtime)
+        self.ctimes.append(ctime)
+        self.types.append(self.TYPE_DOSSIER if is_dir else self.code_type(nom))
+        self._tris.clear()
+        if self._index_noms is not None:
+            self._index_noms[nom] = index
+        return index
+
+    def mettre_a_jour(self, index, is_dir, stat_info):
+        self.tailles[index] = stat_info.st_size if not is_dir else 0
+        self.disques[index] = (getattr(stat_info, 'st_blocks', 0) or 0) * 512 if not is_dir else 0
+        self.mtimes[index] = stat_info.st_mtime
+        self.ctimes[index] = stat_info.st_ctime
+        self.types[index] = self.TYPE_DOSSIER if is_dir else self.code_type(self.noms[index])
+        self.types_affines.discard(index)
+        self._tris.clear()
+        if not is_dir and not stat.S_ISREG(stat_info.st_mode):
+            self.definir_type(index, LIBELLE_SPECIAL)
+
+    def definir_taille_dossier(self, index, taille, disque):
+        self.tailles[index] = taille
+        self.disques[index] = disque
+        self.tailles_dossiers = self.tailles_dossiers or bool(taille or disque)
+        self._tris.pop('size', None)
+
+    def effacer_tailles_dossiers(self):
+        if not self.tailles_dossiers:
+            return False
+        for index, code in enumerate(self.types):
+            if code == self.TYPE_DOSSIER:
+                self.tailles[index] = 0
+                self.disques[index] = 0
+        self.tailles_dossiers = False
+        self._tris.pop('size', None)
+        return True
+
+    def noms_casefold(self):
+        if len(self._noms_casefold) < len(self.noms):
+            self._noms_casefold.extend(nom.casefold() for nom in self.noms[len(self._noms_casefold):])
+        return self._noms_casefold
+
+    def renommer(self, index, nom):
+        if index < len(self._noms_casefold):
+            self._noms_casefold[index] = nom.casefold()
+        if self._index_noms is not None:
+            self._index_noms.pop(self.noms[index], None)
+            self._index_noms[nom] = index
+        self.noms[index] = nom
+        if self.types[index] != self.TYPE_DOSSIER:
+            self.types[index] = self.code_type(nom)
+            self.types_affines.discard(index)
+        self._tris.clear()
+
+    def supprimer(self, index):
+        self.supprimes.add(index)
+        if self._index_noms is not None:
+            self._index_noms.pop(self.noms[index], None)
+        self._tris.clear()
+
+    def index_de(self, nom):
+        if self._index_noms is None:
+            self._index_noms = {nom: index for index, nom in enumerate(self.noms)
+                                if index not in self.supprimes}
+        return self._index_noms.get(nom)
+
+    def actualiser(self, nom):
+        index = self.index_de(nom)
+        try:
+            stat_info = os.stat(os.path.join(self.chemin, nom))
+        except OSError:
+            if index is not None:
+                self.supprimer(index)
+            return None
+        is_dir = stat.S_ISDIR(stat_info.st_mode)
+        if index is None:
+            return self.ajouter(nom, is_dir, stat_info)
+        self.mettre_a_jour(index, is_dir, stat_info)
+        return index
+
+    def nb_entrees(self):
+        return len(self.noms) - len(self.supprimes)
+
+    def est_dossier(self, index):
+        return self.types[index] == self.TYPE_DOSSIER
+
+    def type(self, index):
+        return self.libelles_types[self.types[index]]
+
+    def chemin_complet(self, index):
+        return os.path.join(self.chemin, self.noms[index])
+
+    def cles_tri(self, colonne):
+        if colonne == 'name':
+            return self.noms_casefold()
+        if colonne == 'size':
+            return self.tailles
+        if colonne == 'type':
+            codes = sorted(range(len(self.libelles_types)), key=lambda code: self.libelles_types[code].casefold())
+            rangs = [0] * len(codes)
+            for rang, code in enumerate(codes):
+                rangs[code] = rang
+            return [rangs[code] for code in self.types]
+        if colonne == 'modified':
+            return self.mtimes
+        raise ValueError(f"Colonne de tri inconnue : {colonne}")
+
+    def cle_tri(self, colonne='name', reverse=False):
+        if colonne == 'name':
+            cle_colonne = lambda index: ()
+        elif colonne == 'size':
+            cle_colonne = self.tailles.__getitem__
+        elif colonne == 'type':
+            cle_colonne = lambda index: self.libelles_types[self.types[index]].casefold()
+        elif colonne == 'modified':
+            cle_colonne = self.mtimes.__getitem__
+        else:
+            raise ValueError(f"Colonne de tri inconnue : {colonne}")
+
+        def cle(index):
+            valeur = (cle_colonne(index), self.noms[index].casefold())
+            return (self.types[index] != self.TYPE_DOSSIER, _Inverse(valeur) if reverse else valeur)
+        return cle
+
+    def _groupes_tries(self, colonne):
+        groupes = self._tris.get(colonne)
+        if groupes is None:
+            if colonne == 'name':
+                base = range(len(self))
+                if self.supprimes:
+                    base = [i for i in base if i not in self.supprimes]
+            else:
+                dossiers, fichiers = self._groupes_tries('name')
+                base = dossiers + fichiers
+            cles = self.cles_tri(colonne).__getitem__
+            indices = sorted(base, key=cles)
+            types = self.types
+            groupes = (array('l', [i for i in indices if types[i] == self.TYPE_DOSSIER]),
+                       array('l', [i for i in indices if types[i] != self.TYPE_DOSSIER]))
+            self._tris[colonne] = groupes
+        return groupes
+
+    def ordre_trie(self, colonne='name', reverse=False):
+        dossiers, fichiers = self._groupes_tries(colonne)
+        if reverse:
+            return dossiers[::-1] + fichiers[::-1]
+        return dossiers + fichiers
+
+    def instantane(self):
+        indices = [i for i in range(len(self.noms)) if i not in self.supprimes]
+        dossiers = [self.types[i] == self.TYPE_DOSSIER for i in indices]
+        return {
+            'chemin': self.chemin,
+            'noms': [self.noms[i] for i in indices],
+            'tailles': array('q', (0 if dossier else self.tailles[i] for i, dossier in zip(indices, dossiers))),
+            'disques': array('q', (0 if dossier else self.disques[i] for i, dossier in zip(indices, dossiers))),
+            'mtimes': array('d', (self.mtimes[i] for i in indices)),
+            'ctimes': array('d', (self.ctimes[i] for i in indices)),
+            'types': array('I', (self.types[i] for i in indices)),
+            'libelles_types': list(self.libelles_types),
+        }
+
+    @classmethod
+    def depuis_instantane(cls, donnees):
+        listing = cls(donnees['chemin'])
+        listing.noms = list(donnees['noms'])
+        for colonne, code in (('tailles', 'q'), ('disques', 'q'), ('mtimes', 'd'), ('ctimes', 'd'), ('types', 'I')):
+            valeurs = array(code, donnees[colonne])
+            if len(valeurs) != len(listing.noms):
+                raise ValueError(f"Instantané incohérent : colonne {colonne}")
+            setattr(listing, colonne, valeurs)
+        listing.libelles_types = list(donnees['libelles_types'])
+        if max(listing.types, default=0) >= len(listing.libelles_types):
+            raise ValueError("Instantané incohérent : code de type inconnu")
+        listing._codes_types = {libelle: code for code, libelle in enumerate(listing.libelles_types) if code}
+        return listing
+
+    def taille_memoire(self):
+        taille = sys.getsizeof(self.noms) + sum(map(sys.getsizeof, self.noms))
+        taille += sys.getsizeof(self._noms_casefold) + sum(map(sys.getsizeof, self._noms_casefold))
+        for colonne in (self.tailles, self.disques, self.mtimes, self.ctimes, self.types):
+            taille += sys.getsizeof(colonne)
+        for dossiers, fichiers in self._tris.values():
+            taille += sys.getsizeof(dossiers) + sys.getsizeof(fichiers)
+        return taille
@@ -1,15 +1,88 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import os
-import datetime
 import platform 
+import re
+import threading
+import time
+from array import array
+from apercu import CacheVignettes, GenerateurApercus, est_image
+from arborescence import ChargeurArborescence
+from cache_listing import CacheListings, signature_dossier
+from corbeille import corbeille_disponible, mettre_element_a_la_corbeille
+from doublons import RechercheDoublons
+from filtre import FiltreIncremental
+from formatage import Formateur, initialiser_locale
+from historique import Historique
+from liste_virtuelle import ListeVirtuelle
+from index_fichiers import IndexFichiers, chemin_index_defaut
+from instrumentation import Instrumentation, OPERATION_INACTIVE
+from listing import DirectoryListing
+import noyau
+from operations_lot import TacheLot, creer_fichier_vide, plan_renommage, renommer_element, supprimer_element
+from recherche import RechercheParallele, compiler_motif
+from scanner import TacheScan
+from session import charger_instantane, charger_session, enregistrer_instantane, enregistrer_session
+from surveillance import creer_surveillant
+from tailles_dossiers import CalculTailles
+from taches import FileRetour
+from transfert import Transfert
+from treemap import VueCarte, construire_arbre
+from types_contenu import LIBELLE_SPECIAL, ClassifieurTypes
+
+DEBUT_PROCESSUS = time.perf_counter()
+COLONNES_TRI = ('name', 'size', 'type', 'modified')
 
 class FileExplorer(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Explorateur de fichiers")
-        self.geometry("1000x600")
-        self.file_data = {} 
+        self.session = charger_session()
+        try:
+            self.geometry(self.session.get('geometrie') or "1000x600")
+        except tk.TclError:
+            self.geometry("1000x600")
+        self.listing = DirectoryListing('')
+        self.ordre = array('l')
+        self.ordre_complet = None
+        self.filtre = None
+        self.filtre_prevu = None
+        self.tri = ('name', False)
+        tri = self.session.get('tri')
+        if isinstance(tri, list) and len(tri) == 2 and tri[0] in COLONNES_TRI:
+            self.tri = (tri[0], bool(tri[1]))
+        self.scan = None
+        self.historique = Historique()
+        self.etat_a_restaurer = None
+        self.revalidation = None
+        self.demarrage = None
+        self.recherche = None
+        self.mode_recherche = False
+        self.groupes_doublons = None
+        self.index = None
+        self.indexation = None
+        self.cache = CacheListings()
+        self.formateur = Formateur()
+        self.instrumentation = Instrumentation()
+        self.instrumentation.sur_operation = self.afficher_mesures
+        self.operation_navigation = OPERATION_INACTIVE
+        self.file_retour = FileRetour(self)
+        self.surveillant = creer_surveillant(self.file_retour, self.appliquer_changements)
+        self.chemin_surveille = None
+        self.noeuds_ouverts = {}
+        self.signatures_noeuds = {}
+        self.chargements = {}
+        self.chemins_a_ouvrir = {chemin for chemin in self.session.get('noeuds') or [] if isinstance(chemin, str)}
+        self.chargeur = ChargeurArborescence(self.file_retour)
+        self.calcul_tailles = CalculTailles(self.file_retour)
+        self.rafraichissement_prevu = False
+        self.changements_differes = set()
+        self.revalidation_differee = False
+        self.apercus = GenerateurApercus(self.file_retour, CacheVignettes())
+        self.lignes_visibles_prevues = False
+        self.classifieur = ClassifieurTypes(self.file_retour)
+        self.apercu_chemin = None
+        self.apercu_photo = None
 
         self.paned = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
         self.paned.pack(fill=tk.BOTH, expand=True)
@@ -17,13 +90,19 @@ class FileExplorer(tk.Tk):
         self.tree_frame = ttk.Frame(self.paned, width=300)
         self.tree = ttk.Treeview(self.tree_frame, show='tree')
         self.tree.pack(fill=tk.BOTH, expand=True)
-        self.remplir_arborescence()
         
         self.right_frame = ttk.Frame(self.paned)
 
         self.toolbar = ttk.Frame(self.right_frame)
         self.toolbar.pack(fill=tk.X, padx=5, pady=5)
         
+        self.previous_button = ttk.Button(self.toolbar, text="◀", width=3, command=self.reculer, state='disabled')
+        self.previous_button.pack(side=tk.LEFT, padx=(0, 2))
+        self.next_button = ttk.Button(self.toolbar, text="▶", width=3, command=self.avancer, state='disabled')
+        self.next_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.bind('<Alt-Left>', lambda event: self.reculer())
+        self.bind('<Alt-Right>', lambda event: self.avancer())
+        
         self.back_button = ttk.Button(self.toolbar, text="Retour", command=self.retour)
         self.back_button.pack(side=tk.LEFT, padx=(0, 5))
         
@@ -35,30 +114,95 @@ class FileExplorer(tk.Tk):
         self.hidden_checkbox = ttk.Checkbutton(self.toolbar, 
                                                text="Afficher fichiers cachés", 
                                                variable=self.show_hidden, 
-                                               command=self.update_liste_fichier)
+                                               command=self.basculer_fichiers_caches)
         self.hidden_checkbox.pack(side=tk.LEFT, padx=(5,0))
         
-        self.file_list = ttk.Treeview(self.right_frame, 
+        self.folder_sizes = tk.BooleanVar(value=False)
+        self.folder_sizes_checkbox = ttk.Checkbutton(self.toolbar,
+                                                     text="Tailles des dossiers",
+                                                     variable=self.folder_sizes,
+                                                     command=self.basculer_tailles_dossiers)
+        self.folder_sizes_checkbox.pack(side=tk.LEFT, padx=(5,0))
+        
+        self.treemap_mode = tk.BooleanVar(value=False)
+        self.treemap_checkbox = ttk.Checkbutton(self.toolbar,
+                                                text="Carte",
+                                                variable=self.treemap_mode,
+                                                command=self.basculer_carte)
+        self.treemap_checkbox.pack(side=tk.LEFT, padx=(5,0))
+        
+        self.local_format = tk.BooleanVar(value=False)
+        self.local_format_checkbox = ttk.Checkbutton(self.toolbar,
+                                                     text="Format local",
+                                                     variable=self.local_format,
+                                                     command=self.basculer_format_local)
+        self.local_format_checkbox.pack(side=tk.LEFT, padx=(5,0))
+        
+        self.duplicates_button = ttk.Button(self.toolbar, text="Doublons", command=self.chercher_doublons)
+        self.duplicates_button.pack(side=tk.LEFT, padx=(5,0))
+        
+        ttk.Label(self.toolbar, text="Rechercher :").pack(side=tk.LEFT, padx=(10, 2))
+        self.search_entry = ttk.Entry(self.toolbar, width=20)
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_entry.bind('<Return>', self.lancer_recherche)
+        self.search_entry.bind('<Escape>', self.annuler_recherche)
+        self.search_depth = tk.IntVar(value=0)
+        ttk.Label(self.toolbar, text="Prof. :").pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Spinbox(self.toolbar, from_=0, to=99, width=3, textvariable=self.search_depth).pack(side=tk.LEFT)
+        
+        self.filter_frame = ttk.Frame(self.right_frame)
+        self.filter_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(self.filter_frame, text="Filtrer :").pack(side=tk.LEFT, padx=(0, 2))
+        self.filter_text = tk.StringVar()
+        self.filter_entry = ttk.Entry(self.filter_frame, textvariable=self.filter_text)
+        self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.fuzzy_filter = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.filter_frame, text="Approché", variable=self.fuzzy_filter,
+                        command=self.planifier_filtre).pack(side=tk.LEFT, padx=(5, 0))
+        self.filter_text.trace_add('write', lambda *args: self.planifier_filtre())
+        self.filter_entry.bind('<Escape>', lambda event: self.filter_text.set(''))
+        self.filter_entry.bind('<Down>', lambda event: self.file_list.focus_set())
+        self.bind('<Control-f>', lambda event: self.filter_entry.focus_set())
+        
+        self.list_frame = ttk.Frame(self.right_frame)
+        self.list_frame.pack(fill=tk.BOTH, expand=True)
+        self.file_list = ttk.Treeview(self.list_frame, 
                                       columns=('size', 'type', 'modified'), 
-                                      selectmode='browse')
-        self.file_list.heading('#0', text='Nom', command=lambda: self.trier_colonne('name', False))
+                                      selectmode='extended')
+        self.list_scrollbar = ttk.Scrollbar(self.list_frame, orient=tk.VERTICAL)
+        self.list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.file_list.heading('#0', text='Nom', command=lambda: self.trier_colonne('name', True))
         self.file_list.heading('size', text='Taille', command=lambda: self.trier_colonne('size', False))
         self.file_list.heading('type', text='Type', command=lambda: self.trier_colonne('type', False))
         self.file_list.heading('modified', text='Modifié', command=lambda: self.trier_colonne('modified', False))
+        self.definir_tri(*self.tri)
         self.file_list.column('#0', width=250)
         self.file_list.column('size', width=100)
         self.file_list.column('type', width=150)
         self.file_list.column('modified', width=150)
-        self.file_list.pack(fill=tk.BOTH, expand=True)
+        self.file_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.vue = ListeVirtuelle(self.file_list, self.list_scrollbar, self.rendu_ligne,
+                                  sur_selection=self.selection_fichier, sur_rafraichir=self.planifier_lignes_visibles)
         self.file_list.bind('<Double-1>', self.double_clic_sur_fichier)
-        self.file_list.bind('<<TreeviewSelect>>', self.selection_fichier)
         self.file_list.bind('<Button-3>', self.afficher_menu_clic_droit)
+        self.file_list.bind('<Delete>', lambda event: self.supprimer_fichier())
+        self.file_list.bind('<Shift-Delete>', lambda event: self.supprimer_fichier(definitif=True))
+        self.file_list.bind('<Key>', self.saisie_filtre)
+        
+        self.treemap_canvas = tk.Canvas(self.right_frame, background='white', highlightthickness=0)
+        self.carte = VueCarte(self.treemap_canvas, self.file_retour, self.ouvrir_depuis_carte)
         
         self.context_menu = tk.Menu(self, tearoff=0)
         self.context_menu.add_command(label="Renommer", command=self.renommer_fichier)
         self.context_menu.add_command(label="Déplacer", command=self.deplacer_fichier)
+        self.context_menu.add_command(label="Copier vers...", command=self.copier_fichier)
         self.context_menu.add_command(label="Créer un nouveau fichier", command=self.creer_fichier)
-        self.context_menu.add_command(label="Supprimer", command=self.supprimer_fichier)
+        if corbeille_disponible():
+            self.context_menu.add_command(label="Mettre à la corbeille", command=self.supprimer_fichier)
+        self.context_menu.add_command(label="Supprimer définitivement", command=lambda: self.supprimer_fichier(definitif=True))
+        self.context_menu.add_command(label="Sélectionner les doublons", command=self.selectionner_doublons)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Indexer ce dossier", command=self.indexer_dossier)
         
         self.details_frame = ttk.Frame(self.right_frame)
         self.details_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -76,58 +220,234 @@ class FileExplorer(tk.Tk):
             value_label = ttk.Label(self.details_frame, text='')
             value_label.grid(row=i, column=1, sticky='w', padx=2, pady=2)
             self.details_labels[key] = value_label
+        self.details_frame.columnconfigure(2, weight=1)
+        self.preview_image = ttk.Label(self.details_frame)
+        self.preview_text = tk.Text(self.details_frame, height=8, width=60, wrap='none', state='disabled')
+        
+        self.status_frame = ttk.Frame(self.right_frame)
+        self.status_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        self.status_label = ttk.Label(self.status_frame, text='')
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.progress = ttk.Progressbar(self.status_frame, length=150, mode='determinate')
+        self.progress.pack(side=tk.RIGHT)
+        self.perf_overlay = tk.BooleanVar(value=False)
+        self.perf_button = ttk.Menubutton(self.status_frame, text="Perf")
+        self.perf_menu = tk.Menu(self.perf_button, tearoff=0)
+        self.perf_menu.add_checkbutton(label="Afficher les mesures", variable=self.perf_overlay,
+                                       command=self.basculer_mesures)
+        self.perf_menu.add_command(label="Exporter la trace Chrome...", command=self.exporter_trace)
+        self.perf_menu.add_command(label="Profiler la prochaine navigation", command=self.profiler_navigation)
+        self.perf_button.config(menu=self.perf_menu)
+        self.perf_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.perf_label = ttk.Label(self.right_frame, text='', justify=tk.LEFT, font=('TkFixedFont', 8))
+        self.task_frame = ttk.Frame(self.status_frame)
+        self.task_label = ttk.Label(self.task_frame, text='')
+        self.task_label.pack(side=tk.LEFT, padx=(0, 5))
+        self.task_progress = ttk.Progressbar(self.task_frame, length=150, mode='determinate')
+        self.task_progress.pack(side=tk.LEFT)
+        self.cancel_button = ttk.Button(self.task_frame, text="Annuler", command=self.annuler_tache)
+        self.cancel_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.tache = None
         
         self.paned.add(self.tree_frame, weight=1)
         self.paned.add(self.right_frame, weight=3)
         
-        self.current_path = os.path.expanduser('~')
+        self.current_path = self.session.get('chemin') or os.path.expanduser('~')
         self.update_champ_chemin_courant()
-        self.update_liste_fichier()
+        self.remplir_arborescence()
+        self.bind('<Map>', self.premier_affichage)
+        self.protocol('WM_DELETE_WINDOW', self.fermer)
         
         self.tree.bind('<<TreeviewOpen>>', self.ouverture_noeud)
+        self.tree.bind('<<TreeviewClose>>', self.fermeture_noeud)
         self.tree.bind('<<TreeviewSelect>>', self.selection_noeud)
 
+    def premier_affichage(self, event):
+        if event.widget is not self:
+            return
+        self.unbind('<Map>')
+        self.update_idletasks()
+        self.demarrage = {'fenêtre': time.perf_counter() - DEBUT_PROCESSUS}
+        if not isinstance(self.current_path, str) or not os.path.isdir(self.current_path):
+            self.current_path = os.path.expanduser('~')
+            self.update_champ_chemin_courant()
+        listing, signature = charger_instantane(self.current_path)
+        if listing is None:
+            self.update_liste_fichier()
+            return
+        self.surveillant.surveiller(self.current_path)
+        self.chemin_surveille = self.current_path
+        if signature is not None and signature == self.signature_ou_none(self.current_path):
+            self.cache.stocker(self.current_path, signature, listing)
+        self.listing = listing
+        self.appliquer_tri()
+        self.noter_demarrage("instantané")
+        self.revalider_listing(listing)
+
+    def noter_demarrage(self, source):
+        if self.demarrage is None or 'liste' in self.demarrage:
+            return
+        self.update_idletasks()
+        self.demarrage['liste'] = time.perf_counter() - DEBUT_PROCESSUS
+        self.status_label.config(text=f"{len(self.ordre)} éléments ({source}) — {self.resume_demarrage()}")
+
+    def resume_demarrage(self):
+        texte = f"fenêtre affichée en {self.demarrage['fenêtre'] * 1000:.0f} ms"
+        if 'liste' in self.demarrage:
+            texte += f", liste en {self.demarrage['liste'] * 1000:.0f} ms"
+        return texte
+
+    def fermer(self):
+        if self.tache is not None:
+            if not messagebox.askyesno("Quitter", "Une opération est en cours. Voulez-vous l'annuler et quitter ?"):
+                return
+            self.tache.annuler()
+            self.tache.thread.join(timeout=5)
+        self.session = {
+            'chemin': self.current_path,
+            'noeuds': [path for node, path in self.noeuds_ouverts.items()
+                       if self.tree.exists(node) and self.tree.item(node, 'open')],
+            'tri': list(self.tri),
+            'geometrie': self.geometry(),
+        }
+        try:
+            enregistrer_session(self.session)
+            signature = self.cache.signature(self.listing.chemin)
+            if not self.mode_recherche and signature is not None and self.listing.chemin == self.current_path:
+                enregistrer_instantane(self.listing, signature)
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Impossible d'enregistrer la session : {e}")
+        for tache in (self.scan, self.revalidation):
+            if tache is not None:
+                tache.annuler()
+        self.arreter_recherche()
+        if self.indexation is not None:
+            self.indexation.set()
+        self.calcul_tailles.arreter()
+        self.chargeur.arreter()
+        self.surveillant.arreter()
+        self.destroy()
+
     def remplir_arborescence(self):
         if platform.system() == 'Windows':
-            for drive in self.recup_disques():
-                node = self.tree.insert('', 'end', text=drive, values=[drive], tags=('directory',))
-                self.tree.insert(node, 'end', text='dummy')
+            threading.Thread(target=lambda: self.file_retour.poster(self.ajouter_disques, self.recup_disques()),
+                             daemon=True).start()
         else:
-            root = '/'
-            node = self.tree.insert('', 'end', text=root, values=[root], tags=('directory',))
-            self.tree.insert(node, 'end', text='dummy')
-
-    def recup_disques(self):
-        drives = []
-        for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-            drive = f'{letter}:\\'
+            self.ajouter_noeud_dossier('', '/', '/')
+
+    def recup_disques(self, delai=2.0):
+        trouves = set()
+
+        def sonder(drive):
             if os.path.exists(drive):
-                drives.append(drive)
-        return drives
+                trouves.add(drive)
+
+        drives = [f'{letter}:\\' for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ']
+        sondes = [threading.Thread(target=sonder, args=(drive,), daemon=True) for drive in drives]
+        for sonde in sondes:
+            sonde.start()
+        fin = time.monotonic() + delai
+        for sonde in sondes:
+            sonde.join(max(0.0, fin - time.monotonic()))
+        return [drive for drive in drives if drive in trouves]
+
+    def ajouter_disques(self, drives):
+        for drive in drives:
+            self.ajouter_noeud_dossier('', drive, drive)
 
     def ouverture_noeud(self, event):
-        node = self.tree.focus()
+        self.ouvrir_noeud(self.tree.focus())
+
+    def ouvrir_noeud(self, node):
+        values = self.tree.item(node, 'values')
+        if not values:
+            return
+        path = values[0]
+        if node not in self.noeuds_ouverts:
+            self.noeuds_ouverts[node] = path
+            self.surveillant.surveiller(path)
         children = self.tree.get_children(node)
+        if node in self.chargements:
+            return
         if children and self.tree.item(children[0], 'text') == 'dummy':
-            self.tree.delete(children[0])
-            path = self.tree.item(node, 'values')[0]
+            self.remplir_noeud_arborescence(node, path)
+        elif self.signatures_noeuds.get(node) != self.signature_ou_none(path):
             self.remplir_noeud_arborescence(node, path)
 
-    def remplir_noeud_arborescence(self, node, path):
+    def fermeture_noeud(self, event):
+        path = self.noeuds_ouverts.pop(self.tree.focus(), None)
+        if path is not None:
+            self.surveillant.oublier(path)
+
+    def signature_ou_none(self, path):
         try:
-            for entry in os.listdir(path):
-                if not self.show_hidden.get() and entry.startswith('.'):
+            return signature_dossier(path)
+        except OSError:
+            return None
+
+    def remplir_noeud_arborescence(self, node, path):
+        self.tree.delete(*self.tree.get_children(node))
+        placeholder = self.tree.insert(node, 'end', text='chargement…', tags=('chargement',))
+        self.chargements[node] = placeholder
+        show_hidden = self.show_hidden.get()
+        operation = self.instrumentation.operation('arborescence')
+        self.chargeur.charger(path, show_hidden,
+                              lambda signature, enfants: self.fin_chargement_noeud(node, placeholder, show_hidden,
+                                                                                   signature, enfants, operation))
+
+    def fin_chargement_noeud(self, node, placeholder, show_hidden, signature, enfants, operation=OPERATION_INACTIVE):
+        if self.chargements.get(node) != placeholder:
+            return
+        del self.chargements[node]
+        if not self.tree.exists(node):
+            return
+        with operation.phase('insertion'):
+            self.tree.delete(placeholder)
+            self.signatures_noeuds[node] = signature
+            for name, path, has_children in enfants:
+                self.ajouter_noeud_dossier(node, name, path, has_children)
+        operation.terminer()
+        candidats = [path for name, path, has_children in enfants if has_children]
+        candidats.sort(key=lambda path: not os.path.join(self.current_path, '').startswith(os.path.join(path, '')))
+        self.chargeur.precharger(candidats[:8], show_hidden)
+
+    def ajouter_noeud_dossier(self, node, name, path, has_children=True):
+        child = self.tree.insert(node, 'end', text=name, values=[path], tags=('directory',))
+        if has_children:
+            self.tree.insert(child, 'end', text='dummy')
+            if path in self.chemins_a_ouvrir:
+                self.chemins_a_ouvrir.discard(path)
+                self.tree.item(child, open=True)
+                self.ouvrir_noeud(child)
+        return child
+
+    def actualiser_arborescence(self, path, names):
+        for node, node_path in list(self.noeuds_ouverts.items()):
+            if node_path != path or not self.tree.exists(node):
+                continue
+            if names is None:
+                self.remplir_noeud_arborescence(node, path)
+                continue
+            if node in self.chargements:
+                continue
+            children = self.tree.get_children(node)
+            existing = {self.tree.item(child, 'text'): child for child in children}
+            for name in names:
+                if os.sep in name:
                     continue
-                full_path = os.path.join(path, entry)
-                if os.path.isdir(full_path):
-                    child = self.tree.insert(node, 'end', text=entry, values=[full_path], tags=('directory',))
-                    self.tree.insert(child, 'end', text='dummy')
-        except PermissionError:
-            pass
+                full_path = os.path.join(path, name)
+                visible = os.path.isdir(full_path) and (self.show_hidden.get() or not name.startswith('.'))
+                if visible and name not in existing:
+                    self.ajouter_noeud_dossier(node, name, full_path)
+                elif not visible and name in existing:
+                    self.tree.delete(existing[name])
+            self.signatures_noeuds[node] = self.signature_ou_none(path)
 
     def selection_noeud(self, event):
-        node = self.tree.focus()
-        path = self.tree.item(node, 'values')[0]
+        values = self.tree.item(self.tree.focus(), 'values')
+        if not values:
+            return
+        path = values[0]
         self.current_path = path
         self.update_champ_chemin_courant()
         self.update_liste_fichier()
@@ -136,102 +456,759 @@ class FileExplorer(tk.Tk):
         self.path_entry.delete(0, tk.END)
         self.path_entry.insert(0, self.current_path)
 
-    def update_liste_fichier(self):
-        for item in self.file_list.get_children():
-            self.file_list.delete(item)
-        self.file_data = {}
+    def update_liste_fichier(self, forcer=False, etat=None):
+        if etat is None and self.chemin_surveille is not None and self.chemin_surveille != self.current_path:
+            self.historique.visiter(self.etat_vue())
+            self.maj_historique()
+        if self.scan is not None:
+            self.scan.annuler()
+            self.scan = None
+        if self.revalidation is not None:
+            self.revalidation.annuler()
+            self.revalidation = None
+        self.arreter_recherche()
+        self.calcul_tailles.annuler()
+        if self.chemin_surveille != self.current_path:
+            if self.chemin_surveille is not None:
+                self.surveillant.oublier(self.chemin_surveille)
+            self.surveillant.surveiller(self.current_path)
+            self.chemin_surveille = self.current_path
+        self.changements_differes = set()
+        self.revalidation_differee = False
+        self.effacer_filtre()
+        if forcer:
+            self.cache.invalider(self.current_path)
+        self.vue.vider()
+        self.operation_navigation.terminer()
+        operation = self.operation_navigation = self.instrumentation.operation('navigation')
+        with operation.phase('cache'):
+            if etat is None:
+                listing, perime = self.cache.obtenir(self.current_path), False
+            else:
+                listing, perime = self.cache.consulter(self.current_path)
+        if etat is not None:
+            self.definir_tri(*etat['tri'])
+        self.etat_a_restaurer = None
+        if listing is not None:
+            self.listing = listing
+            if not self.folder_sizes.get():
+                listing.effacer_tailles_dossiers()
+            with operation.phase('tri et affichage'):
+                self.appliquer_tri()
+                if etat is not None:
+                    self.restaurer_vue(etat)
+            self.status_label.config(text=f"{len(self.ordre)} éléments ({'revalidation…' if perime else 'cache'})")
+            self.noter_demarrage("cache")
+            if perime:
+                self.revalider_listing(listing)
+            self.calculer_tailles_dossiers()
+            operation.terminer()
+            return
+        self.etat_a_restaurer = etat
+        self.listing = DirectoryListing(self.current_path)
+        self.ordre = array('l')
+        self.progress.config(value=0, maximum=1)
+        self.status_label.config(text="Chargement...")
+        self.scan = TacheScan(self.current_path, True, self.file_retour,
+                              self.recevoir_lot, self.fin_scan).lancer()
+
+    def recevoir_lot(self, lot, faits, total):
+        show_hidden = self.show_hidden.get()
+        with self.operation_navigation.phase('réception des lots'):
+            noyau.ajouter_entrees(self.listing, self.ordre, noyau.entrees_scan(lot), show_hidden)
+            self.vue.definir_taille(len(self.ordre))
+        self.progress.config(maximum=max(total, 1), value=faits)
+        self.status_label.config(text=f"Chargement... {faits}/{total}")
+
+    def fin_scan(self, erreur):
+        signature = self.scan.signature
+        self.scan = None
+        self.progress.config(value=0)
+        operation = self.operation_navigation
+        if erreur is not None:
+            self.status_label.config(text=f"Impossible de lire le dossier : {erreur}")
+            operation.terminer()
+            return
+        self.cache.stocker(self.listing.chemin, signature, self.listing)
+        with operation.phase('tri et affichage'):
+            self.appliquer_tri()
+            if self.etat_a_restaurer is not None:
+                self.restaurer_vue(self.etat_a_restaurer)
+                self.etat_a_restaurer = None
+        if self.changements_differes:
+            self.actualiser_entrees(self.changements_differes)
+            self.changements_differes = set()
+        self.status_label.config(text=f"{len(self.ordre)} éléments")
+        self.noter_demarrage("lecture")
+        if self.revalidation_differee:
+            self.revalider_dossier_courant()
+        self.calculer_tailles_dossiers()
+        operation.terminer()
+
+    def revalider_dossier_courant(self):
+        if self.scan is not None:
+            self.revalidation_differee = True
+            return
+        self.revalidation_differee = False
+        if self.revalidation is not None:
+            self.revalidation.annuler()
+        self.revalider_listing(self.listing)
+
+    def revalider_listing(self, listing):
+        entrees = {}
+
+        def recevoir(lot, faits, total):
+            for name, full_path, is_dir, stat_info in lot:
+                entrees[name] = (is_dir, stat_info)
+
+        tache = TacheScan(listing.chemin, True, self.file_retour, recevoir,
+                          lambda erreur: self.fin_revalidation(tache, listing, entrees, erreur))
+        self.revalidation = tache.lancer()
+
+    def fin_revalidation(self, tache, listing, entrees, erreur):
+        if self.revalidation is not tache:
+            return
+        self.revalidation = None
+        if listing is not self.listing or self.mode_recherche:
+            return
+        if erreur is not None:
+            self.status_label.config(text=f"Impossible de lire le dossier : {erreur}")
+            return
+        names = noyau.differences(listing, entrees)
+        if len(names) > max(1000, listing.nb_entrees() // 4):
+            selection = [listing.noms[index] for index in self.indices_selection()]
+            self.listing = DirectoryListing(listing.chemin)
+            noyau.ajouter_entrees(self.listing, None, ((name, *entree) for name, entree in entrees.items()))
+            self.appliquer_tri()
+            indices = [index for index in map(self.listing.index_de, selection) if index is not None]
+            self.vue.selectionner(self.positions_de(indices), voir=False)
+            self.status_label.config(text=f"{len(self.ordre)} éléments")
+            names = set()
+        names |= self.changements_differes
+        self.changements_differes = set()
+        if names:
+            self.actualiser_entrees(names)
+        self.cache.stocker(self.listing.chemin, tache.signature, self.listing)
+        self.calculer_tailles_dossiers()
+
+    def basculer_tailles_dossiers(self):
+        if self.folder_sizes.get():
+            self.calculer_tailles_dossiers()
+            return
+        self.calcul_tailles.annuler()
+        if self.mode_recherche:
+            return
+        if self.listing.effacer_tailles_dossiers():
+            self.planifier_rafraichissement()
+
+    def calculer_tailles_dossiers(self, indices=None):
+        if not self.folder_sizes.get() or self.mode_recherche or self.chargement_en_cours():
+            return
+        if indices is None:
+            indices = range(len(self.listing))
+        paths = [self.listing.chemin_complet(index) for index in indices
+                 if self.listing.est_dossier(index) and index not in self.listing.supprimes]
+        self.calcul_tailles.calculer(paths, self.recevoir_taille_dossier)
+        self.planifier_carte()
+
+    def basculer_carte(self):
+        if self.treemap_mode.get():
+            self.list_frame.pack_forget()
+            self.treemap_canvas.pack(fill=tk.BOTH, expand=True, before=self.details_frame)
+            if not self.folder_sizes.get():
+                self.folder_sizes.set(True)
+                self.calculer_tailles_dossiers()
+            self.planifier_carte()
+        else:
+            self.treemap_canvas.pack_forget()
+            self.list_frame.pack(fill=tk.BOTH, expand=True, before=self.details_frame)
+
+    def planifier_carte(self):
+        if not self.treemap_mode.get() or self.mode_recherche:
+            return
+        listing = self.listing
+        supprimes = listing.supprimes
+        entrees = [(name, os.path.join(listing.chemin, name), code == listing.TYPE_DOSSIER, size)
+                   for index, (name, code, size) in enumerate(zip(listing.noms, listing.types, listing.tailles))
+                   if index not in supprimes]
+        caches = self.calcul_tailles.caches
+        sous_caches = {path: caches[path] for _, path, is_dir, _ in entrees if is_dir and path in caches}
+        self.carte.afficher(lambda: construire_arbre(listing.chemin, entrees, sous_caches))
+
+    def ouvrir_depuis_carte(self, path):
+        if path != self.current_path and os.path.isdir(path):
+            self.current_path = path
+            self.update_champ_chemin_courant()
+            self.update_liste_fichier()
+
+    def recevoir_taille_dossier(self, path, size, disk_usage):
+        if os.path.dirname(path) != self.listing.chemin or self.mode_recherche:
+            return
+        index = self.listing.index_de(os.path.basename(path))
+        if index is None:
+            return
+        self.listing.definir_taille_dossier(index, size, disk_usage)
+        self.planifier_rafraichissement()
+
+    def planifier_rafraichissement(self):
+        if not self.rafraichissement_prevu:
+            self.rafraichissement_prevu = True
+            self.after(150, self.rafraichir_vue)
+
+    def rafraichir_vue(self):
+        self.rafraichissement_prevu = False
+        if self.tri[0] == 'size' and not self.chargement_en_cours():
+            selection = self.indices_selection()
+            self.appliquer_tri()
+            self.vue.selectionner(self.positions_de(selection), voir=False)
+        else:
+            self.vue.rafraichir()
+            self.selection_fichier()
+        self.planifier_carte()
+
+    def chargement_en_cours(self):
+        return self.scan is not None or self.recherche is not None
+
+    def arreter_recherche(self):
+        if self.recherche is not None:
+            self.recherche.annuler()
+            self.recherche = None
+        self.mode_recherche = False
+        self.groupes_doublons = None
+
+    def lancer_recherche(self, event=None):
+        motif = self.search_entry.get().strip()
+        if not motif:
+            self.annuler_recherche()
+            return
         try:
-            entries = os.listdir(self.current_path)
-        except Exception:
+            predicat = compiler_motif(motif)
+        except re.error as e:
+            messagebox.showerror("Erreur", f"Motif invalide : {e}")
             return
-        
-        dirs = []
-        files = []
-        for entry in entries:
-            if not self.show_hidden.get() and entry.startswith('.'):
-                continue
-            full_path = os.path.join(self.current_path, entry)
-            try:
-                is_dir = os.path.isdir(full_path)
-                stat_info = os.stat(full_path)
-                if is_dir:
-                    dirs.append((entry, full_path, stat_info))
-                else:
-                    files.append((entry, full_path, stat_info))
-            except Exception:
+        if self.scan is not None:
+            self.scan.annuler()
+            self.scan = None
+        self.arreter_recherche()
+        try:
+            profondeur = max(0, self.search_depth.get())
+        except tk.TclError:
+            profondeur = 0
+        self.mode_recherche = True
+        self.effacer_filtre()
+        self.listing = DirectoryListing(self.current_path)
+        self.ordre = array('l')
+        self.vue.vider()
+        self.progress.config(mode='indeterminate')
+        self.progress.start(20)
+        self.status_label.config(text=f"Recherche de « {motif} »...")
+        self.recherche = RechercheParallele(self.current_path, predicat, self.show_hidden.get(),
+                                            self.file_retour, self.recevoir_resultats, self.fin_recherche,
+                                            profondeur_max=profondeur).lancer()
+
+    def recevoir_resultats(self, lot):
+        noyau.ajouter_entrees(self.listing, self.ordre, lot, self.show_hidden.get())
+        self.vue.definir_taille(len(self.ordre))
+        stats = self.recherche.statistiques()
+        self.status_label.config(text=f"Recherche... {stats['resultats']} résultats, "
+                                      f"{stats['entrees']} entrées parcourues")
+
+    def fin_recherche(self, stats):
+        self.recherche = None
+        self.progress.stop()
+        self.progress.config(mode='determinate', value=0)
+        self.appliquer_tri()
+        premier = stats['premier_resultat']
+        premier = f"{premier * 1000:.0f} ms" if premier is not None else "aucun"
+        self.status_label.config(text=f"{stats['resultats']} résultats — premier résultat : {premier} — "
+                                      f"{stats['entrees']} entrées en {stats['duree']:.2f} s "
+                                      f"({stats['entrees_par_seconde']:.0f} entrées/s)")
+
+    def annuler_recherche(self, event=None):
+        if self.recherche is not None:
+            self.recherche.annuler()
+            self.recherche = None
+            self.progress.stop()
+            self.progress.config(mode='determinate', value=0)
+            self.status_label.config(text=f"Recherche annulée — {len(self.ordre)} résultats")
+            return
+        if self.mode_recherche:
+            self.update_liste_fichier()
+
+    def chercher_doublons(self):
+        if not self.demarrer_tache("Recherche de doublons"):
+            return
+        self.tache = RechercheDoublons(self.current_path, self.show_hidden.get(), self.file_retour,
+                                       self.progres_doublons, self.fin_doublons).lancer()
+
+    def progres_doublons(self, etat):
+        if etat['phase'] == "Empreintes complètes":
+            avancement = f"{self.formater_taille(etat['faits'])} / {self.formater_taille(etat['total'])}"
+        elif etat['total']:
+            avancement = f"{etat['faits']}/{etat['total']}"
+        else:
+            avancement = f"{etat['faits']} fichiers"
+        self.task_progress.config(maximum=max(etat['total'], 1), value=etat['faits'])
+        self.task_label.config(text=f"{etat['phase']} : {avancement}")
+
+    def fin_doublons(self, recherche):
+        self.terminer_tache()
+        stats = recherche.stats
+        if recherche.annulee.is_set():
+            self.status_label.config(text="Recherche de doublons annulée")
+            return
+        if recherche.racine == self.current_path:
+            if self.scan is not None:
+                self.scan.annuler()
+                self.scan = None
+            self.arreter_recherche()
+            self.mode_recherche = True
+            self.effacer_filtre()
+            self.listing = DirectoryListing(self.current_path)
+            self.groupes_doublons = []
+            largeur = len(str(len(recherche.groupes)))
+            for numero, groupe in enumerate(recherche.groupes, 1):
+                indices = []
+                for path, stat_info in groupe:
+                    index = self.listing.ajouter(os.path.relpath(path, self.current_path), False, stat_info)
+                    self.listing.definir_type(index, f"Doublons {numero:0{largeur}d}")
+                    indices.append(index)
+                self.groupes_doublons.append(indices)
+            self.ordre = array('l', range(len(self.listing)))
+            self.vue.vider()
+            self.vue.definir_taille(len(self.ordre))
+        self.status_label.config(text=f"{len(recherche.groupes)} groupes de doublons, "
+                                      f"{self.formater_taille(stats['octets_doublons'])} récupérables — "
+                                      f"{stats['fichiers']} fichiers, {stats['completes']} empreintes complètes, "
+                                      f"{stats['depuis_cache']} depuis le cache, en {stats['duree']:.1f} s")
+        if recherche.erreurs:
+            self.afficher_erreurs("Certains éléments n'ont pas pu être lus", recherche.erreurs)
+
+    def selectionner_doublons(self):
+        if not self.groupes_doublons:
+            return
+        indices = [index for groupe in self.groupes_doublons for index in groupe[1:]
+                   if index not in self.listing.supprimes]
+        self.vue.selectionner(self.positions_de(indices))
+
+    def purger_resultats(self):
+        disparus = {index for index in self.ordre if not os.path.lexists(self.listing.chemin_complet(index))}
+        if not disparus:
+            return
+        for index in disparus:
+            self.listing.supprimer(index)
+        self.terminer_filtre()
+        if self.ordre_complet is not None:
+            self.ordre_complet = array('l', [index for index in self.ordre_complet if index not in disparus])
+        self.ordre = array('l', [index for index in self.ordre if index not in disparus])
+        self.vue.selectionner([])
+        self.vue.definir_taille(len(self.ordre))
+
+    def appliquer_changements(self, changements):
+        for path, names in changements.items():
+            self.actualiser_arborescence(path, names)
+            if self.mode_recherche:
                 continue
-        
-        for group in [dirs, files]:
-            group.sort(key=lambda x: x[0].lower())
-            for entry, full_path, stat_info in group:
-                is_dir = os.path.isdir(full_path)
-                size = stat_info.st_size if not is_dir else 0
-                mtime = stat_info.st_mtime
-                size_str = self.formater_taille(size)
-                mtime_str = datetime.datetime.fromtimestamp(mtime).strftime('%d/%m/%Y %H:%M:%S')
-                type_str = 'Dossier' if is_dir else f"{os.path.splitext(entry)[1]} Fichier"
-                item_id = self.file_list.insert('', 'end', text=entry, 
-                                              values=(size_str, type_str, mtime_str),
-                                              tags=('directory' if is_dir else 'file',))
-                self.file_data[item_id] = {
-                    'path': full_path,
-                    'size': size,
-                    'type': type_str,
-                    'mtime': mtime,
-                    'ctime': stat_info.st_ctime
-                }
+            if path != self.listing.chemin:
+                self.cache.invalider(path)
+            elif names is None:
+                self.revalider_dossier_courant()
+            elif self.scan is not None or self.revalidation is not None:
+                self.changements_differes.update(names)
+            else:
+                self.actualiser_entrees(names)
+
+    def actualiser_entrees(self, names):
+        changes = []
+        for name in names:
+            index = self.listing.index_de(name)
+            selectionne = index is not None and self.retirer_de_ordre(index)
+            index = self.listing.actualiser(name)
+            if index is not None:
+                self.inserer_dans_ordre(index, selectionne)
+                changes.append(index)
+        self.terminer_patch()
+        self.calculer_tailles_dossiers(changes)
+
+    def renommer_entree(self, old_name, new_name):
+        index = self.listing.index_de(old_name)
+        if index is None or self.chargement_en_cours():
+            self.actualiser_entrees((old_name, new_name))
+            return
+        existing = self.listing.index_de(new_name)
+        if existing is not None:
+            self.retirer_de_ordre(existing)
+            self.listing.supprimer(existing)
+        selectionne = self.retirer_de_ordre(index)
+        self.listing.renommer(index, new_name)
+        if self.listing.actualiser(new_name) is not None:
+            self.inserer_dans_ordre(index, selectionne)
+        self.terminer_patch()
+
+    def renommer_resultat(self, old_name, new_name):
+        index = self.listing.index_de(old_name)
+        if index is None:
+            return
+        self.terminer_filtre()
+        libelle = self.listing.type(index)
+        self.listing.renommer(index, os.path.join(os.path.dirname(old_name), new_name))
+        if self.groupes_doublons is not None:
+            self.listing.definir_type(index, libelle)
+        self.vue.rafraichir()
+        self.selection_fichier()
+
+    def retirer_de_ordre(self, index):
+        self.terminer_filtre()
+        if self.ordre_complet is not None and index in self.ordre_complet:
+            self.ordre_complet.remove(index)
+        try:
+            position = self.ordre.index(index)
+        except ValueError:
+            return False
+        del self.ordre[position]
+        return self.vue.retirer(position)
+
+    def inserer_dans_ordre(self, index, selectionne=False):
+        if not noyau.est_visible(self.listing.noms[index], self.show_hidden.get()):
+            return
+        self.terminer_filtre()
+        if self.ordre_complet is not None:
+            self.ordre_complet.insert(noyau.position_insertion(self.listing, self.ordre_complet, index, self.tri), index)
+            if not self.filtre.accepte(self.listing.noms_casefold()[index]):
+                return
+        position = noyau.position_insertion(self.listing, self.ordre, index, self.tri)
+        self.ordre.insert(position, index)
+        self.vue.inserer(position, selectionne)
+
+    def terminer_patch(self):
+        self.cache.actualiser_signature(self.listing.chemin)
+        self.vue.rafraichir()
+        self.selection_fichier()
+        self.status_label.config(text=f"{len(self.ordre)} éléments")
+
+    def patcher_dossier_courant(self, names, renamed=None):
+        self.actualiser_arborescence(self.current_path, names)
+        if self.scan is not None:
+            self.changements_differes.update(names)
+        elif renamed is not None:
+            self.renommer_entree(*renamed)
+        else:
+            self.actualiser_entrees(names)
+
+    def appliquer_tri(self):
+        self.ordre = noyau.ordre_affiche(self.listing, self.tri, self.show_hidden.get(),
+                                         trie=not self.chargement_en_cours())
+        if self.filtre is not None:
+            self.ordre_complet = self.ordre
+            self.filtre = FiltreIncremental(self.filtre.requete, self.filtre.approche,
+                                            self.listing.noms_casefold(), self.ordre_complet)
+            self.filtre.avancer(budget=float('inf'))
+            self.ordre = self.filtre.resultat
+        self.vue.definir_taille(len(self.ordre))
+
+    def saisie_filtre(self, event):
+        if event.char and event.char.isprintable() and not event.state & 0x000C:
+            self.filter_entry.focus_set()
+            self.filter_entry.insert(tk.END, event.char)
+            return 'break'
+        return None
+
+    def planifier_filtre(self):
+        if self.filtre_prevu is not None:
+            self.after_cancel(self.filtre_prevu)
+        self.filtre_prevu = self.after(30, self.lancer_filtre)
+
+    def effacer_filtre(self):
+        self.filtre = None
+        self.ordre_complet = None
+        if self.filter_text.get():
+            self.filter_text.set('')
+        if self.filtre_prevu is not None:
+            self.after_cancel(self.filtre_prevu)
+            self.filtre_prevu = None
+
+    def lancer_filtre(self):
+        self.filtre_prevu = None
+        requete = self.filter_text.get()
+        approche = self.fuzzy_filter.get()
+        if self.chargement_en_cours():
+            self.filtre_prevu = self.after(100, self.lancer_filtre)
+            return
+        if not requete:
+            if self.ordre_complet is not None:
+                selection = self.indices_selection()
+                self.ordre = self.ordre_complet
+                self.ordre_complet = None
+                self.filtre = None
+                self.vue.definir_taille(len(self.ordre))
+                self.vue.selectionner(self.positions_de(selection))
+                self.status_label.config(text=f"{len(self.ordre)} éléments")
+            return
+        if self.ordre_complet is None:
+            self.ordre_complet = self.ordre
+        if self.filtre is not None and self.filtre.peut_affiner(requete, approche):
+            candidats = self.filtre.resultat
+        else:
+            candidats = self.ordre_complet
+        self.filtre = FiltreIncremental(requete, approche, self.listing.noms_casefold(), candidats)
+        self.ordre = self.filtre.resultat
+        self.vue.vider()
+        self.avancer_filtre(self.filtre)
+
+    def avancer_filtre(self, filtre):
+        if filtre is not self.filtre:
+            return
+        termine = filtre.avancer()
+        self.vue.definir_taille(len(self.ordre))
+        if termine:
+            self.status_label.config(text=f"{len(self.ordre)} / {len(self.ordre_complet)} éléments (filtre)")
+        else:
+            self.status_label.config(text=f"Filtrage... {len(self.ordre)} résultats")
+            self.after(1, self.avancer_filtre, filtre)
+
+    def terminer_filtre(self):
+        if self.filtre is not None and not self.filtre.termine:
+            self.filtre.avancer(budget=float('inf'))
+            self.vue.definir_taille(len(self.ordre))
+
+    def basculer_fichiers_caches(self):
+        selection = self.indices_selection()
+        self.appliquer_tri()
+        self.vue.selectionner(self.positions_de(selection))
+
+    def rendu_ligne(self, position):
+        return noyau.ligne(self.listing, self.ordre[position], self.formateur)
+
+    def indices_selection(self):
+        return [self.ordre[position] for position in self.vue.selection()]
+
+    def positions_de(self, indices):
+        return noyau.positions_de(self.ordre, indices)
 
     def formater_taille(self, size):
-        units = ['O', 'KB', 'MB', 'GB', 'TB']
-        index = 0
-        while size >= 1024 and index < len(units)-1:
-            size /= 1024
-            index += 1
-        return f"{size:.2f} {units[index]}" if index > 0 else f"{size} B"
+        return self.formateur.taille(size)
+
+    def basculer_format_local(self):
+        self.formateur = Formateur(localise=self.local_format.get())
+        self.vue.rafraichir()
+        self.selection_fichier()
 
     def double_clic_sur_fichier(self, event):
-        item = self.file_list.selection()
-        if not item:
+        index = self.vue.index_sous_curseur(event.y)
+        if index is None:
             return
-        item = item[0]
-        entry = self.file_list.item(item, 'text')
-        full_path = os.path.join(self.current_path, entry)
-        if os.path.isdir(full_path):
-            self.current_path = full_path
+        index = self.ordre[index]
+        if self.listing.est_dossier(index):
+            self.current_path = self.listing.chemin_complet(index)
             self.update_champ_chemin_courant()
             self.update_liste_fichier()
 
     def trier_colonne(self, col, reverse):
-        items = [(self.file_list.item(item, 'text'), item) for item in self.file_list.get_children('')]
-        if col == 'name':
-            items.sort(key=lambda x: x[0].lower(), reverse=reverse)
+        with self.instrumentation.mesurer('tri') as operation:
+            selection = self.indices_selection()
+            self.definir_tri(col, reverse)
+            if not self.chargement_en_cours():
+                with operation.phase('tri'):
+                    self.appliquer_tri()
+                with operation.phase('sélection'):
+                    self.vue.selectionner(self.positions_de(selection))
+
+    def definir_tri(self, col, reverse):
+        self.tri = (col, reverse)
+        heading = '#0' if col == 'name' else col
+        self.file_list.heading(heading, command=lambda: self.trier_colonne(col, not reverse))
+
+    def selection_fichier(self, event=None):
+        with self.instrumentation.mesurer('sélection'):
+            selection = self.indices_selection()
+            if selection:
+                index = selection[0]
+                self.details_labels['path'].config(text=self.listing.chemin_complet(index))
+                self.details_labels['size'].config(text=f"{self.formater_taille(self.listing.tailles[index])} "
+                                                        f"(sur disque : {self.formater_taille(self.listing.disques[index])})")
+                self.details_labels['type'].config(text=self.listing.type(index))
+                self.details_labels['created'].config(text=self.formateur.date(self.listing.ctimes[index]))
+                self.details_labels['modified'].config(text=self.formateur.date(self.listing.mtimes[index]))
+            self.planifier_lignes_visibles()
+
+    def planifier_lignes_visibles(self):
+        if not self.lignes_visibles_prevues:
+            self.lignes_visibles_prevues = True
+            self.after(50, self.traiter_lignes_visibles)
+
+    def traiter_lignes_visibles(self):
+        self.lignes_visibles_prevues = False
+        self.demander_apercus()
+        self.affiner_types()
+
+    def affiner_types(self):
+        demandes = []
+        for position in range(self.vue.debut, min(self.vue.debut + len(self.vue.items), len(self.ordre))):
+            index = self.ordre[position]
+            if self.listing.est_dossier(index) or index in self.listing.types_affines or \
+                    self.listing.type(index) == LIBELLE_SPECIAL:
+                continue
+            demandes.append(((self.listing, index), self.listing.chemin_complet(index)))
+        if demandes:
+            self.classifieur.classer(demandes, self.recevoir_type)
+
+    def recevoir_type(self, reference, libelle):
+        listing, index = reference
+        if listing is not self.listing or index in listing.supprimes or listing.est_dossier(index):
+            return
+        if listing.definir_type(index, libelle):
+            self.planifier_rafraichissement()
+
+    def demander_apercus(self):
+        demandes = []
+        selection = self.vue.selection()
+        chemin = None
+        if selection:
+            index = self.ordre[selection[0]]
+            if not self.listing.est_dossier(index):
+                chemin = self.listing.chemin_complet(index)
+                genre = 'image' if est_image(self.listing.noms[index]) else 'texte'
+                demandes.append((0, genre, chemin, self.listing.mtimes[index], self.listing.tailles[index],
+                                 self.afficher_apercu))
+        if chemin != self.apercu_chemin:
+            self.apercu_chemin = chemin
+            self.effacer_apercu()
+        for position in range(self.vue.debut, min(self.vue.debut + len(self.vue.items), len(self.ordre))):
+            index = self.ordre[position]
+            if selection and position == selection[0]:
+                continue
+            if est_image(self.listing.noms[index]) and not self.listing.est_dossier(index):
+                demandes.append((1, 'image', self.listing.chemin_complet(index), self.listing.mtimes[index],
+                                 self.listing.tailles[index], None))
+        self.apercus.demander(demandes)
+
+    def effacer_apercu(self):
+        self.apercu_photo = None
+        self.preview_image.config(image='')
+        self.preview_image.grid_remove()
+        self.preview_text.grid_remove()
+
+    def afficher_apercu(self, genre, chemin, resultat, erreur):
+        if chemin != self.apercu_chemin or resultat is None:
+            return
+        if genre == 'image':
+            try:
+                self.apercu_photo = tk.PhotoImage(file=resultat)
+            except tk.TclError:
+                return
+            self.preview_image.config(image=self.apercu_photo)
+            self.preview_image.grid(row=0, column=2, rowspan=5, sticky='e', padx=5)
         else:
-            key_map = {'size': 'size', 'type': 'type', 'modified': 'mtime'}
-            items.sort(key=lambda x: self.file_data[x[1]][key_map[col]], reverse=reverse)
-        for index, (text, item) in enumerate(items):
-            self.file_list.move(item, '', index)
-        self.file_list.heading(col, command=lambda: self.trier_colonne(col, not reverse))
-
-    def selection_fichier(self, event):
-        item = self.file_list.selection()
-        if item:
-            item = item[0]
-            data = self.file_data.get(item)
-            if data:
-                self.details_labels['path'].config(text=data['path'])
-                self.details_labels['size'].config(text=self.formater_taille(data['size']))
-                self.details_labels['type'].config(text=data['type'])
-                self.details_labels['created'].config(text=datetime.datetime.fromtimestamp(data['ctime']).strftime('%d/%m/%Y %H:%M:%S'))
-                self.details_labels['modified'].config(text=datetime.datetime.fromtimestamp(data['mtime']).strftime('%d/%m/%Y %H:%M:%S'))
+            self.preview_text.config(state='normal')
+            self.preview_text.delete('1.0', tk.END)
+            self.preview_text.insert('1.0', resultat)
+            self.preview_text.config(state='disabled')
+            self.preview_text.grid(row=0, column=2, rowspan=5, sticky='nsew', padx=5)
 
     def naviguer_chemin(self, event):
         path = self.path_entry.get()
-        if os.path.exists(path):
+        if path.startswith('@'):
+            self.aller_vers_index(path[1:].strip())
+        elif os.path.exists(path):
             self.current_path = path
             self.update_liste_fichier()
         else:
             messagebox.showerror("Erreur", "Chemin introuvable")
 
+    def aller_vers_index(self, texte):
+        if not texte:
+            return
+        if self.index is None:
+            if not os.path.exists(chemin_index_defaut()):
+                messagebox.showerror("Erreur", "Aucun index : utilisez « Indexer ce dossier » dans le menu contextuel")
+                return
+            self.index = IndexFichiers()
+        debut = time.perf_counter()
+        resultats = self.index.chercher(texte)
+        duree = time.perf_counter() - debut
+        if len(resultats) == 1 and resultats[0][3] and os.path.isdir(resultats[0][0]):
+            self.current_path = resultats[0][0]
+            self.update_champ_chemin_courant()
+            self.update_liste_fichier()
+            return
+        if self.scan is not None:
+            self.scan.annuler()
+            self.scan = None
+        self.arreter_recherche()
+        self.mode_recherche = True
+        self.listing = DirectoryListing('')
+        for path, size, mtime, is_dir in resultats:
+            self.listing.ajouter_valeurs(path, is_dir, size, mtime, mtime)
+        self.vue.vider()
+        self.appliquer_tri()
+        self.status_label.config(text=f"{len(resultats)} résultats dans l'index en {duree * 1000:.1f} ms")
+
+    def indexer_dossier(self):
+        if self.indexation is not None:
+            self.indexation.set()
+        annulee = self.indexation = threading.Event()
+        racine = self.current_path
+        self.status_label.config(text=f"Indexation de {racine}...")
+
+        def progres(stats):
+            self.file_retour.poster(self.status_label.config,
+                                    {'text': f"Indexation... {stats['dossiers']} dossiers, {stats['entrees']} entrées"})
+
+        def executer():
+            index = IndexFichiers()
+            try:
+                debut = time.perf_counter()
+                stats = index.mettre_a_jour(racine, annulee, progres)
+                texte = (f"Index à jour : {stats['dossiers']} dossiers, {stats['rescannes']} rescannés "
+                         f"en {time.perf_counter() - debut:.1f} s")
+            except Exception as e:
+                texte = f"Échec de l'indexation : {e}"
+            finally:
+                index.fermer()
+            self.file_retour.poster(self.fin_indexation, annulee, texte)
+
+        threading.Thread(target=executer, daemon=True).start()
+
+    def fin_indexation(self, annulee, texte):
+        if self.indexation is annulee:
+            self.indexation = None
+            self.status_label.config(text=texte)
+
+    def etat_vue(self):
+        selection, focus = [], None
+        if not self.mode_recherche and self.listing.chemin == self.chemin_surveille:
+            selection = [self.listing.noms[index] for index in self.indices_selection()]
+            if self.vue.focus_modele is not None and self.vue.focus_modele < len(self.ordre):
+                focus = self.listing.noms[self.ordre[self.vue.focus_modele]]
+        return {'chemin': self.chemin_surveille, 'tri': self.tri, 'selection': selection, 'focus': focus,
+                'debut': self.vue.debut}
+
+    def restaurer_vue(self, etat):
+        indices = [index for index in map(self.listing.index_de, etat['selection']) if index is not None]
+        focus = self.listing.index_de(etat['focus']) if etat['focus'] is not None else None
+        positions_focus = self.positions_de([focus]) if focus is not None else []
+        self.vue.debut = etat['debut']
+        self.vue.selectionner(self.positions_de(indices), focus=positions_focus[0] if positions_focus else None,
+                              voir=False)
+
+    def reculer(self):
+        if self.historique.peut_reculer() and self.chemin_surveille is not None:
+            self.naviguer_historique(self.historique.reculer(self.etat_vue()))
+
+    def avancer(self):
+        if self.historique.peut_avancer() and self.chemin_surveille is not None:
+            self.naviguer_historique(self.historique.avancer(self.etat_vue()))
+
+    def naviguer_historique(self, etat):
+        self.current_path = etat['chemin']
+        self.update_champ_chemin_courant()
+        self.update_liste_fichier(etat=etat)
+        self.maj_historique()
+
+    def maj_historique(self):
+        self.previous_button.config(state='normal' if self.historique.peut_reculer() else 'disabled')
+        self.next_button.config(state='normal' if self.historique.peut_avancer() else 'disabled')
+
     def retour(self):
         parent = os.path.dirname(self.current_path)
         if parent and os.path.exists(parent) and parent != self.current_path:
@@ -240,69 +1217,262 @@ class FileExplorer(tk.Tk):
             self.update_liste_fichier()
 
     def afficher_menu_clic_droit(self, event):
-        item = self.file_list.identify_row(event.y)
-        if item:
-            self.file_list.selection_set(item)
+        index = self.vue.index_sous_curseur(event.y)
+        if index is not None:
+            if index not in self.vue.selection():
+                self.vue.selectionner([index])
             self.context_menu.post(event.x_root, event.y_root)
 
     def renommer_fichier(self):
-        item = self.file_list.selection()
+        selection = self.vue.selection()
+        if not selection:
+            return
+        if len(selection) > 1:
+            self.renommer_par_motif([self.ordre[position] for position in selection])
+            return
+        item = self.vue.item_de_index(selection[0])
         if not item:
             return
-        item = item[0]
         bbox = self.file_list.bbox(item, '#0')
         if not bbox:
             return
         x, y, width, height = bbox
         entry = ttk.Entry(self.file_list)
         entry.place(x=x, y=y, width=width, height=height)
-        current_name = self.file_list.item(item, 'text')
+        listing_name = self.listing.noms[self.ordre[selection[0]]]
+        dossier, current_name = os.path.split(self.listing.chemin_complet(self.ordre[selection[0]]))
         entry.insert(0, current_name)
         entry.focus_set()
         def on_rename(event=None):
             new_name = entry.get().strip()
             if new_name and new_name != current_name:
-                full_old_path = os.path.join(self.current_path, current_name)
-                full_new_path = os.path.join(self.current_path, new_name)
                 try:
-                    os.rename(full_old_path, full_new_path)
-                    self.update_liste_fichier()
+                    renommer_element(dossier, current_name, new_name)
+                    if self.mode_recherche:
+                        self.renommer_resultat(listing_name, new_name)
+                    else:
+                        self.patcher_dossier_courant((current_name, new_name), renamed=(current_name, new_name))
                 except Exception as e:
                     messagebox.showerror("Erreur", f"Impossible de renommer : {e}")
             entry.destroy()
         entry.bind('<Return>', on_rename)
         entry.bind('<FocusOut>', lambda event: entry.destroy())
 
-    def deplacer_fichier(self):
-        item = self.file_list.selection()
-        if not item:
+    def renommer_par_motif(self, selection):
+        motif = simpledialog.askstring("Renommer", f"Expression régulière à remplacer dans {len(selection)} noms :", parent=self)
+        if not motif:
+            return
+        remplacement = simpledialog.askstring("Renommer", "Remplacement ({n} = numéro) :", parent=self)
+        if remplacement is None:
             return
-        item = item[0]
-        data = self.file_data.get(item)
-        if not data:
+        noms = [self.listing.noms[index] for index in selection]
+        try:
+            plan, erreurs = plan_renommage(noms, motif, remplacement)
+        except re.error as e:
+            messagebox.showerror("Erreur", f"Expression invalide : {e}")
+            return
+        if erreurs:
+            self.afficher_erreurs("Renommage impossible", erreurs)
             return
+        if not plan:
+            return
+        racine = self.listing.chemin
+        def renommer(paire, tache):
+            dossier, ancien = os.path.split(os.path.join(racine, paire[0]))
+            renommer_element(dossier, ancien, paire[1])
+        self.lancer_lot("Renommage", plan, renommer, {nom for paire in plan for nom in paire}, renommage=True)
+
+    def lancer_lot(self, texte, elements, action, names, renommage=False):
+        if not self.demarrer_tache(texte):
+            return
+        operation = self.instrumentation.operation(texte)
+        listing = self.listing
+        self.tache = TacheLot(elements, action, retour=self.file_retour, sur_progres=self.progres_lot,
+                              sur_fin=lambda tache: self.fin_lot(tache, texte, names, self.current_path, operation,
+                                                                 listing if renommage else None)).lancer()
+
+    def progres_lot(self, etat):
+        self.task_progress.config(maximum=max(etat['total'], 1), value=etat['faits'])
+        unites = f", {etat['unites']} entrées" if etat['unites'] > etat['faits'] else ""
+        self.task_label.config(text=f"{etat['faits']}/{etat['total']} éléments{unites}")
+
+    def fin_lot(self, tache, texte, names, origin_path, operation=OPERATION_INACTIVE, listing_renomme=None):
+        self.terminer_tache()
+        etat = tache.etat()
+        with operation.phase('rafraîchissement'):
+            if self.mode_recherche:
+                if listing_renomme is self.listing:
+                    echecs = {element for element, _ in tache.erreurs}
+                    for paire in tache.elements[:tache.faits]:
+                        if paire not in echecs:
+                            self.renommer_resultat(*paire)
+                self.purger_resultats()
+            elif names and self.current_path == origin_path:
+                if len(names) > 2000:
+                    self.actualiser_arborescence(self.current_path, None)
+                    self.revalider_dossier_courant()
+                else:
+                    self.patcher_dossier_courant(names)
+        operation.terminer()
+        self.status_label.config(text=f"{texte} : {etat['faits'] - etat['erreurs']}/{etat['total']} éléments "
+                                      f"en {etat['duree']:.1f} s" + (" (annulé)" if tache.annulee.is_set() else ""))
+        if tache.erreurs:
+            self.afficher_erreurs("Certains éléments n'ont pas pu être traités", tache.erreurs)
+
+    def afficher_erreurs(self, message, erreurs):
+        details = "\n".join(f"{element} : {error}" for element, error in erreurs[:10])
+        if len(erreurs) > 10:
+            details += f"\n... et {len(erreurs) - 10} autres"
+        messagebox.showerror("Erreur", f"{message} :\n{details}")
+
+    def demander_chemin(self, initial, on_valid):
         label = self.details_labels['path']
         x = label.winfo_x()
         y = label.winfo_y()
         width = label.winfo_width() if label.winfo_width() > 100 else 200
         entry = ttk.Entry(self.details_frame)
         entry.place(x=x, y=y, width=width)
-        entry.insert(0, data['path'])
+        entry.insert(0, initial)
         entry.focus_set()
-        def on_move(event=None):
-            new_path = entry.get().strip()
-            if new_path and new_path != data['path']:
-                try:
-                    os.rename(data['path'], new_path)
-                    self.current_path = os.path.dirname(new_path)
-                    self.update_champ_chemin_courant()
-                    self.update_liste_fichier()
-                except Exception as e:
-                    messagebox.showerror("Erreur", f"Impossible de déplacer le fichier : {e}")
+        def on_return(event=None):
+            value = entry.get().strip()
             entry.destroy()
-        entry.bind('<Return>', on_move)
+            if value and value != initial:
+                on_valid(value)
+        entry.bind('<Return>', on_return)
         entry.bind('<FocusOut>', lambda event: entry.destroy())
 
+    def cible_transfert(self, old_path, new_path):
+        if os.path.isdir(new_path):
+            return os.path.join(new_path, os.path.basename(old_path))
+        return new_path
+
+    def transferer_selection(self, selection, deplacer):
+        paths = [self.listing.chemin_complet(index) for index in selection]
+        self.demander_chemin(self.current_path, lambda destination: self.lancer_transfert(
+            [(path, os.path.join(destination, os.path.basename(path))) for path in paths], deplacer=deplacer))
+
+    def deplacer_fichier(self):
+        selection = self.indices_selection()
+        if not selection:
+            return
+        if len(selection) > 1:
+            self.transferer_selection(selection, deplacer=True)
+            return
+        old_path = self.listing.chemin_complet(selection[0])
+        self.demander_chemin(old_path, lambda new_path: self.lancer_transfert(
+            [(old_path, self.cible_transfert(old_path, new_path))], deplacer=True))
+
+    def copier_fichier(self):
+        selection = self.indices_selection()
+        if not selection:
+            return
+        if len(selection) > 1:
+            self.transferer_selection(selection, deplacer=False)
+            return
+        old_path = self.listing.chemin_complet(selection[0])
+        self.demander_chemin(old_path, lambda new_path: self.lancer_transfert(
+            [(old_path, self.cible_transfert(old_path, new_path))], deplacer=False))
+
+    def lancer_transfert(self, paires, deplacer):
+        if not self.demarrer_tache("Déplacement" if deplacer else "Copie"):
+            return
+        operation = self.instrumentation.operation("Déplacement" if deplacer else "Copie")
+        self.tache = Transfert(paires, deplacer=deplacer, retour=self.file_retour,
+                               sur_progres=self.progres_transfert,
+                               sur_fin=lambda transfert: self.fin_transfert(transfert, self.current_path,
+                                                                            operation)).lancer()
+
+    def basculer_mesures(self):
+        actif = self.perf_overlay.get()
+        self.instrumentation.activer(actif)
+        if actif:
+            texte = "Mesures actives : naviguez ou triez pour voir le détail"
+            if self.demarrage is not None:
+                texte += f"\nDémarrage : {self.resume_demarrage()}"
+            self.perf_label.config(text=texte)
+            self.perf_label.pack(fill=tk.X, padx=5, pady=(0, 5), before=self.status_frame)
+        else:
+            self.perf_label.pack_forget()
+
+    def afficher_mesures(self, operation):
+        if self.perf_overlay.get():
+            lignes = [op.resume() for op in list(self.instrumentation.operations)[-3:]]
+            self.perf_label.config(text="\n".join(lignes))
+        if getattr(operation, 'fichier_profil', None):
+            self.status_label.config(text=f"Profil enregistré : {operation.fichier_profil}")
+
+    def exporter_trace(self):
+        if not self.instrumentation.evenements:
+            messagebox.showerror("Erreur", "Aucune mesure enregistrée : activez d'abord les mesures")
+            return
+        chemin = filedialog.asksaveasfilename(parent=self, defaultextension='.json',
+                                              initialfile='trace-explorateur.json',
+                                              filetypes=[("Trace JSON", "*.json")])
+        if not chemin:
+            return
+        try:
+            nombre = self.instrumentation.exporter_trace(chemin)
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Impossible d'exporter la trace : {e}")
+            return
+        self.status_label.config(text=f"{nombre} événements exportés vers {chemin}")
+
+    def profiler_navigation(self):
+        if not self.instrumentation.actif:
+            self.perf_overlay.set(True)
+            self.basculer_mesures()
+        self.instrumentation.profiler_prochaine = 'navigation'
+        self.status_label.config(text="La prochaine navigation sera profilée")
+
+    def demarrer_tache(self, texte):
+        if self.tache is not None:
+            messagebox.showerror("Erreur", "Une opération est déjà en cours")
+            return False
+        self.task_label.config(text=f"{texte}...")
+        self.task_progress.config(value=0, maximum=1)
+        self.task_frame.pack(side=tk.RIGHT, padx=(0, 5))
+        return True
+
+    def annuler_tache(self):
+        if self.tache is not None:
+            self.tache.annuler()
+
+    def terminer_tache(self):
+        self.tache = None
+        self.task_frame.pack_forget()
+
+    def progres_transfert(self, etat):
+        self.task_progress.config(maximum=max(etat['octets_total'], 1), value=etat['octets_faits'])
+        eta = f", reste {etat['eta']:.0f} s" if etat['eta'] is not None else ""
+        self.task_label.config(text=f"{etat['fichiers_faits']}/{etat['fichiers_total']} fichiers, "
+                                    f"{self.formater_taille(int(etat['debit']))}/s{eta}")
+
+    def fin_transfert(self, transfert, origin_path, operation=OPERATION_INACTIVE):
+        self.terminer_tache()
+        etat = transfert.etat()
+        names = set()
+        for source, cible in transfert.paires:
+            for path in (source, cible):
+                if os.path.dirname(path) == self.current_path:
+                    names.add(os.path.basename(path))
+        with operation.phase('rafraîchissement'):
+            if len(names) > 2000 and not self.mode_recherche:
+                self.actualiser_arborescence(self.current_path, None)
+                self.revalider_dossier_courant()
+            elif names and not self.mode_recherche:
+                self.patcher_dossier_courant(names)
+        operation.terminer()
+        self.status_label.config(text=f"{etat['fichiers_faits']} fichiers, "
+                                      f"{self.formater_taille(etat['octets_faits'])} en {etat['duree']:.1f} s"
+                                      + (" (annulé)" if transfert.annulee.is_set() else ""))
+        if transfert.erreurs:
+            self.afficher_erreurs("Certains éléments n'ont pas pu être transférés", transfert.erreurs)
+        elif transfert.deplacer and len(transfert.paires) == 1 and self.current_path == origin_path:
+            self.current_path = os.path.dirname(transfert.paires[0][1])
+            self.update_champ_chemin_courant()
+            self.update_liste_fichier()
+
     def creer_fichier(self):
         children = self.file_list.get_children()
         if children:
@@ -318,34 +1488,38 @@ class FileExplorer(tk.Tk):
         def on_create(event=None):
             filename = editor.get().strip()
             if filename:
-                full_path = os.path.join(self.current_path, filename)
                 try:
-                    with open(full_path, 'x'):
-                        pass
-                    self.update_liste_fichier()
+                    creer_fichier_vide(self.current_path, filename)
+                    self.patcher_dossier_courant((filename,))
                 except Exception as e:
                     messagebox.showerror("Erreur", f"Impossible de créer le fichier : {e}")
             editor.destroy()
         editor.bind('<Return>', on_create)
         editor.bind('<FocusOut>', lambda event: editor.destroy())
 
-    def supprimer_fichier(self):
-        item = self.file_list.selection()
-        if not item:
+    def supprimer_fichier(self, definitif=False):
+        selection = self.indices_selection()
+        if not selection:
             return
-        item = item[0]
-        filename = self.file_list.item(item, 'text')
-        full_path = os.path.join(self.current_path, filename)
-        if messagebox.askyesno("Supprimer", f"Voulez-vous vraiment supprimer '{filename}' ?"):
-            try:
-                if os.path.isdir(full_path):
-                    os.rmdir(full_path)
-                else:
-                    os.remove(full_path)
-                self.update_liste_fichier()
-            except Exception as e:
-                messagebox.showerror("Erreur", f"Impossible de supprimer : {e}")
+        definitif = definitif or not corbeille_disponible()
+        if len(selection) == 1:
+            cible = f"'{self.listing.noms[selection[0]]}'"
+        else:
+            cible = f"ces {len(selection)} éléments"
+        if definitif:
+            question = f"Voulez-vous vraiment supprimer définitivement {cible} et tout leur contenu ?"
+        else:
+            question = f"Voulez-vous mettre {cible} à la corbeille ?"
+        if not messagebox.askyesno("Supprimer", question):
+            return
+        paths = [self.listing.chemin_complet(index) for index in selection]
+        names = {os.path.basename(path) for path in paths if os.path.dirname(path) == self.current_path}
+        if definitif:
+            self.lancer_lot("Suppression", paths, supprimer_element, names)
+        else:
+            self.lancer_lot("Corbeille", paths, mettre_element_a_la_corbeille, names)
 
 if __name__ == "__main__":
+    initialiser_locale()
     app = FileExplorer()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import bisect
+from array import array
+
+from listing import DirectoryListing
+from recherche import RechercheParallele, compiler_motif
+from scanner import TacheScan
+from taches import RetourSynchrone
+
+
+def est_visible(nom, show_hidden):
+    return show_hidden or not nom.startswith('.')
+
+
+def ajouter_entrees(listing, ordre, entrees, show_hidden=True):
+    for nom, is_dir, stat_info in entrees:
+        if ordre is not None and est_visible(nom, show_hidden):
+            ordre.append(len(listing))
+        listing.ajouter(nom, is_dir, stat_info)
+
+
+def entrees_scan(lot):
+    return ((nom, is_dir, stat_info) for nom, chemin, is_dir, stat_info in lot)
+
+
+def scanner_dossier(chemin, show_hidden=True):
+    listing = DirectoryListing(chemin)
+    retour = RetourSynchrone()
+    fin = []
+    TacheScan(chemin, show_hidden, retour, lambda lot, faits, total: ajouter_entrees(listing, None, entrees_scan(lot)),
+              fin.append).lancer()
+    retour.traiter_jusqua(lambda: bool(fin))
+    if fin[0] is not None:
+        raise fin[0]
+    return listing
+
+
+def filtrer(listing, ordre, show_hidden):
+    if show_hidden:
+        return ordre
+    noms = listing.noms
+    return array('l', [index for index in ordre if not noms[index].startswith('.')])
+
+
+def ordre_affiche(listing, tri=('name', False), show_hidden=True, trie=True):
+    if trie:
+        return filtrer(listing, listing.ordre_trie(*tri), show_hidden)
+    return filtrer(listing, array('l', (index for index in range(len(listing)) if index not in listing.supprimes)),
+                   show_hidden)
+
+
+def position_insertion(listing, ordre, index, tri=('name', False)):
+    cle = listing.cle_tri(*tri)
+    return bisect.bisect_right(ordre, cle(index), key=cle)
+
+
+def positions_de(ordre, indices):
+    if len(indices) <= 16:
+        return [ordre.index(index) for index in indices if index in ordre]
+    indices = set(indices)
+    return [position for position, index in enumerate(ordre) if index in indices]
+
+
+def differences(listing, entrees):
+    noms = set()
+    vus = set()
+    for index, nom in enumerate(listing.noms):
+        if index in listing.supprimes:
+            continue
+        vus.add(nom)
+        entree = entrees.get(nom)
+        if entree is None:
+            noms.add(nom)
+            continue
+        is_dir, stat_info = entree
+        if is_dir != listing.est_dossier(index) or stat_info.st_mtime != listing.mtimes[index] or \
+                (not is_dir and stat_info.st_size != listing.tailles[index]):
+            noms.add(nom)
+    noms.update(nom for nom in entrees if nom not in vus)
+    return noms
+
+
+def ligne(listing, index, formateur):
+    return (listing.noms[index],
+            (formateur.taille(listing.tailles[index]), listing.type(index), formateur.date(listing.mtimes[index])),
+            ('directory' if listing.est_dossier(index) else 'file',))
+
+
+def chercher(racine, motif, show_hidden=True, profondeur_max=0, nb_workers=8):
+    listing = DirectoryListing(racine)
+    retour = RetourSynchrone()
+    fin = []
+
+    RechercheParallele(racine, compiler_motif(motif), show_hidden, retour,
+                       lambda lot: ajouter_entrees(listing, None, lot), fin.append,
+                       profondeur_max=profondeur_max, nb_workers=nb_workers).lancer()
+    retour.traiter_jusqua(lambda: bool(fin))
+    return listing, fin[0]
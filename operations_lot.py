@@ -0,0 +1,170 @@
+import os
+import re
+import shutil
+import threading
+import time
+
+
+class TacheLot:
+    def __init__(self, elements, action, retour=None, sur_progres=None, sur_fin=None, intervalle=0.1):
+        self.elements = list(elements)
+        self.action = action
+        self.retour = retour
+        self.sur_progres = sur_progres
+        self.sur_fin = sur_fin
+        self.intervalle = intervalle
+        self.annulee = threading.Event()
+        self.erreurs = []
+        self.faits = 0
+        self.unites = 0
+        self.debut = None
+        self.dernier_rapport = 0.0
+        self.thread = threading.Thread(target=self.executer, daemon=True)
+
+    def lancer(self):
+        self.thread.start()
+        return self
+
+    def annuler(self):
+        self.annulee.set()
+
+    def compter(self, nb=1):
+        self.unites += nb
+        self.rapporter()
+
+    def etat(self):
+        return {
+            'faits': self.faits,
+            'unites': self.unites,
+            'total': len(self.elements),
+            'erreurs': len(self.erreurs),
+            'duree': time.perf_counter() - self.debut if self.debut else 0.0,
+        }
+
+    def rapporter(self):
+        maintenant = time.perf_counter()
+        if self.retour is not None and self.sur_progres is not None and maintenant - self.dernier_rapport >= self.intervalle:
+            self.dernier_rapport = maintenant
+            self.retour.poster(self.sur_progres, self.etat())
+
+    def executer(self):
+        self.debut = time.perf_counter()
+        try:
+            for element in self.elements:
+                if self.annulee.is_set():
+                    break
+                try:
+                    self.action(element, self)
+                except Exception as e:
+                    self.erreurs.append((element, str(e) or type(e).__name__))
+                self.faits += 1
+                self.rapporter()
+        finally:
+            if self.retour is not None and self.sur_fin is not None:
+                self.retour.poster(self.sur_fin, self)
+
+
+OUVERTURE_DOSSIER = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+
+def supprimer_arbre(chemin, annulee=None, sur_element=None, erreurs=None):
+    if erreurs is None:
+        erreurs = []
+    if not os.path.isdir(chemin) or os.path.islink(chemin):
+        os.unlink(chemin)
+        if sur_element:
+            sur_element(1)
+        return erreurs
+    if not (os.unlink in os.supports_dir_fd and os.scandir in os.supports_fd):
+        shutil.rmtree(chemin, onerror=lambda fonction, path, info: erreurs.append((path, str(info[1]))))
+        return erreurs
+    parent_fd = os.open(os.path.dirname(os.path.abspath(chemin)), OUVERTURE_DOSSIER)
+    pile = []
+    try:
+        nom = os.path.basename(os.path.abspath(chemin))
+        fd = os.open(nom, OUVERTURE_DOSSIER, dir_fd=parent_fd)
+        pile.append((parent_fd, nom, fd, os.scandir(fd), os.path.abspath(chemin)))
+        while pile:
+            if annulee is not None and annulee.is_set():
+                break
+            parent, nom, fd, entrees, chemin_dossier = pile[-1]
+            entry = next(entrees, None)
+            if entry is None:
+                entrees.close()
+                os.close(fd)
+                pile.pop()
+                try:
+                    os.rmdir(nom, dir_fd=parent)
+                    if sur_element:
+                        sur_element(1)
+                except OSError as e:
+                    erreurs.append((chemin_dossier, str(e)))
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    sous_fd = os.open(entry.name, OUVERTURE_DOSSIER, dir_fd=fd)
+                    pile.append((fd, entry.name, sous_fd, os.scandir(sous_fd), os.path.join(chemin_dossier, entry.name)))
+                else:
+                    os.unlink(entry.name, dir_fd=fd)
+                    if sur_element:
+                        sur_element(1)
+            except OSError as e:
+                erreurs.append((os.path.join(chemin_dossier, entry.name), str(e)))
+    finally:
+        for parent, nom, fd, entrees, chemin_dossier in pile:
+            entrees.close()
+            os.close(fd)
+        os.close(parent_fd)
+    return erreurs
+
+
+def supprimer_element(chemin, tache):
+    erreurs = supprimer_arbre(chemin, tache.annulee, tache.compter)
+    if erreurs:
+        sous_chemin, erreur = erreurs[0]
+        raise OSError(f"{len(erreurs)} élément(s) non supprimé(s), dont {sous_chemin} : {erreur}")
+
+
+def nom_valide(nom):
+    return bool(nom) and nom not in ('.', '..') and os.sep not in nom and not (os.altsep and os.altsep in nom)
+
+
+def renommer_element(dossier, ancien, nouveau):
+    if not nom_valide(nouveau):
+        raise OSError(f"Nom invalide : {nouveau!r}")
+    source = os.path.join(dossier, ancien)
+    cible = os.path.join(dossier, nouveau)
+    if os.path.lexists(cible) and not os.path.samefile(source, cible):
+        raise FileExistsError(f"{nouveau} existe déjà")
+    os.rename(source, cible)
+    return cible
+
+
+def creer_fichier_vide(dossier, nom):
+    if not nom_valide(nom):
+        raise OSError(f"Nom invalide : {nom!r}")
+    chemin = os.path.join(dossier, nom)
+    with open(chemin, 'x'):
+        pass
+    return chemin
+
+
+def plan_renommage(noms, motif, remplacement):
+    regex = re.compile(motif)
+    largeur = len(str(len(noms)))
+    plan = []
+    erreurs = []
+    cibles = set(noms)
+    for numero, chemin in enumerate(noms, 1):
+        dossier, nom = os.path.split(chemin)
+        nouveau = regex.sub(remplacement.replace('{n}', str(numero).zfill(largeur)), nom)
+        if nouveau == nom:
+            continue
+        if not nom_valide(nouveau):
+            erreurs.append((chemin, f"Nom invalide : {nouveau!r}"))
+        elif os.path.join(dossier, nouveau) in cibles:
+            erreurs.append((chemin, f"Conflit de nom : {nouveau}"))
+        else:
+            cibles.add(os.path.join(dossier, nouveau))
+            plan.append((chemin, nouveau))
+    return plan, erreurs
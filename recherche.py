@@ -0,0 +1,139 @@
+import fnmatch
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from lecture import lire_dossier
+
+
+def compiler_motif(motif):
+    if motif.startswith('re:'):
+        regex = re.compile(motif[3:], re.IGNORECASE)
+        return lambda nom: regex.search(nom) is not None
+    if any(caractere in motif for caractere in '*?['):
+        regex = re.compile(fnmatch.translate(motif), re.IGNORECASE)
+        return lambda nom: regex.match(nom) is not None
+    motif = motif.casefold()
+    return lambda nom: motif in nom.casefold()
+
+
+class RechercheParallele:
+    def __init__(self, racine, predicat, show_hidden, retour, sur_lot, sur_fin,
+                 profondeur_max=0, nb_workers=8, taille_lot=200, intervalle=0.1):
+        self.racine = racine
+        self.predicat = predicat
+        self.show_hidden = show_hidden
+        self.retour = retour
+        self.sur_lot = sur_lot
+        self.sur_fin = sur_fin
+        self.profondeur_max = profondeur_max
+        self.taille_lot = taille_lot
+        self.intervalle = intervalle
+        self.annulee = threading.Event()
+        self.files = [deque() for _ in range(nb_workers)]
+        self.en_cours = 0
+        self.entrees_vues = 0
+        self.nb_resultats = 0
+        self.debut = None
+        self.premier_resultat = None
+        self._verrou = threading.Lock()
+        self._termines = 0
+        self.threads = [threading.Thread(target=self._travailler, args=(numero,), daemon=True)
+                        for numero in range(nb_workers)]
+
+    def lancer(self):
+        self.debut = time.perf_counter()
+        self.en_cours = 1
+        self.files[0].append((self.racine, 0))
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def annuler(self):
+        self.annulee.set()
+
+    def statistiques(self):
+        duree = time.perf_counter() - self.debut
+        return {
+            'resultats': self.nb_resultats,
+            'entrees': self.entrees_vues,
+            'duree': duree,
+            'premier_resultat': None if self.premier_resultat is None else self.premier_resultat - self.debut,
+            'entrees_par_seconde': self.entrees_vues / duree if duree else 0.0,
+        }
+
+    def _prendre(self, numero):
+        try:
+            return self.files[numero].pop()
+        except IndexError:
+            pass
+        for decalage in range(1, len(self.files)):
+            try:
+                return self.files[(numero + decalage) % len(self.files)].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _travailler(self, numero):
+        lot = []
+        vues = 0
+        dernier_envoi = time.perf_counter()
+        while not self.annulee.is_set():
+            tache = self._prendre(numero)
+            if tache is None:
+                if self.en_cours == 0:
+                    break
+                time.sleep(0.001)
+                continue
+            chemin, profondeur = tache
+            vues += self._explorer(numero, chemin, profondeur, lot)
+            with self._verrou:
+                self.en_cours -= 1
+            if len(lot) >= self.taille_lot or time.perf_counter() - dernier_envoi >= self.intervalle:
+                self._envoyer(lot, vues)
+                lot, vues = [], 0
+                dernier_envoi = time.perf_counter()
+        self._envoyer(lot, vues)
+        with self._verrou:
+            self._termines += 1
+            dernier = self._termines == len(self.threads)
+        if dernier and not self.annulee.is_set():
+            self.retour.poster(self._si_active, self.sur_fin, (self.statistiques(),))
+
+    def _explorer(self, numero, chemin, profondeur, lot):
+        vues = 0
+        try:
+            entries = lire_dossier(chemin, self.show_hidden)
+            for entry in entries:
+                vues += 1
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                if self.predicat(entry.name):
+                    try:
+                        lot.append((os.path.relpath(entry.path, self.racine), is_dir, entry.stat()))
+                    except (OSError, ValueError):
+                        pass
+                if is_dir and (not self.profondeur_max or profondeur + 1 < self.profondeur_max):
+                    with self._verrou:
+                        self.en_cours += 1
+                    self.files[numero].append((entry.path, profondeur + 1))
+        except OSError:
+            pass
+        return vues
+
+    def _envoyer(self, lot, vues):
+        with self._verrou:
+            self.entrees_vues += vues
+            self.nb_resultats += len(lot)
+            if lot and self.premier_resultat is None:
+                self.premier_resultat = time.perf_counter()
+        if lot:
+            self.retour.poster(self._si_active, self.sur_lot, (lot,))
+
+    def _si_active(self, fonction, args):
+        if not self.annulee.is_set():
+            fonction(*args)
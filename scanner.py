@@ -0,0 +1,63 @@
+import threading
+
+from cache_listing import signature_dossier
+from instrumentation import compter
+from lecture import lire_dossier, est_dossier
+
+
+class TacheScan:
+    def __init__(self, chemin, show_hidden, retour, sur_lot, sur_fin, taille_lot=500, avec_stat=True):
+        self.chemin = chemin
+        self.show_hidden = show_hidden
+        self.retour = retour
+        self.sur_lot = sur_lot
+        self.sur_fin = sur_fin
+        self.taille_lot = taille_lot
+        self.avec_stat = avec_stat
+        self.signature = None
+        self.annulee = threading.Event()
+        self.thread = threading.Thread(target=self._executer, daemon=True)
+
+    def lancer(self):
+        self.thread.start()
+        return self
+
+    def annuler(self):
+        self.annulee.set()
+
+    def _executer(self):
+        try:
+            self.signature = signature_dossier(self.chemin)
+            entries = list(lire_dossier(self.chemin, self.show_hidden))
+        except Exception as e:
+            self._poster(self.sur_fin, e)
+            return
+        total = len(entries)
+        compter('scan.scandir')
+        compter('scan.entrées', total)
+        lot = []
+        for faits, entry in enumerate(entries, 1):
+            if self.annulee.is_set():
+                return
+            try:
+                stat_info = entry.stat() if self.avec_stat else None
+            except OSError:
+                continue
+            lot.append((entry.name, entry.path, est_dossier(entry), stat_info))
+            if len(lot) >= self.taille_lot:
+                if self.avec_stat:
+                    compter('scan.DirEntry.stat', len(lot))
+                self._poster(self.sur_lot, lot, faits, total)
+                lot = []
+        if self.avec_stat:
+            compter('scan.DirEntry.stat', len(lot))
+        self._poster(self.sur_lot, lot, total, total)
+        self._poster(self.sur_fin, None)
+
+    def _poster(self, fonction, *args):
+        if not self.annulee.is_set():
+            self.retour.poster(self._si_active, fonction, args)
+
+    def _si_active(self, fonction, args):
+        if not self.annulee.is_set():
+            fonction(*args)
@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+import sys
+from array import array
+
+from listing import DirectoryListing
+
+VERSION_INSTANTANE = 2
+MAX_ENTREES_INSTANTANE = 500000
+
+
+def dossier_config():
+    config = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(config, 'explorateur')
+
+
+def chemin_session_defaut():
+    return os.path.join(dossier_config(), 'session.json')
+
+
+def chemin_instantane_defaut():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'explorateur', 'instantane.json')
+
+
+def ecrire_atomique(chemin, donnees):
+    os.makedirs(os.path.dirname(chemin), mode=0o700, exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    with open(temporaire, 'wb') as f:
+        f.write(donnees)
+    os.replace(temporaire, chemin)
+
+
+def encoder_colonnes(donnees):
+    return {cle: {'typecode': valeur.typecode, 'octets': base64.b64encode(valeur.tobytes()).decode('ascii')}
+            if isinstance(valeur, array) else valeur
+            for cle, valeur in donnees.items()}
+
+
+def decoder_colonne(valeur):
+    colonne = array(valeur['typecode'])
+    colonne.frombytes(base64.b64decode(valeur['octets'], validate=True))
+    return colonne
+
+
+def charger_session(chemin=None):
+    try:
+        with open(chemin or chemin_session_defaut(), encoding='utf-8') as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return session if isinstance(session, dict) else {}
+
+
+def enregistrer_session(session, chemin=None):
+    ecrire_atomique(chemin or chemin_session_defaut(),
+                    json.dumps(session, ensure_ascii=False, indent=1).encode('utf-8'))
+
+
+def enregistrer_instantane(listing, signature, chemin=None):
+    chemin = chemin or chemin_instantane_defaut()
+    if listing.nb_entrees() > MAX_ENTREES_INSTANTANE:
+        try:
+            os.remove(chemin)
+        except FileNotFoundError:
+            pass
+        return False
+    donnees = {'version': VERSION_INSTANTANE, 'ordre_octets': sys.byteorder, 'signature': signature,
+               'listing': encoder_colonnes(listing.instantane())}
+    ecrire_atomique(chemin, json.dumps(donnees, ensure_ascii=False).encode('utf-8'))
+    return True
+
+
+def charger_instantane(chemin_dossier, chemin=None):
+    try:
+        with open(chemin or chemin_instantane_defaut(), encoding='utf-8') as f:
+            donnees = json.load(f)
+        if donnees.get('version') != VERSION_INSTANTANE or donnees.get('ordre_octets') != sys.byteorder or \
+                donnees['listing']['chemin'] != chemin_dossier:
+            return None, None
+        listing = dict(donnees['listing'])
+        for colonne in ('tailles', 'disques', 'mtimes', 'ctimes', 'types'):
+            listing[colonne] = decoder_colonne(listing[colonne])
+        signature = donnees['signature']
+        return DirectoryListing.depuis_instantane(listing), tuple(signature) if signature else None
+    except (OSError, AttributeError, KeyError, TypeError, ValueError):
+        return None, None
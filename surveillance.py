@@ -0,0 +1,248 @@
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import threading
+import time
+
+from cache_listing import signature_dossier
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+MASQUE = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+          | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EN_TETE = struct.Struct('iIII')
+
+
+class Surveillant:
+    def __init__(self, retour, sur_changements, delai=0.1, latence_max=0.5, seuil_rescan=2000):
+        self.retour = retour
+        self.sur_changements = sur_changements
+        self.delai = delai
+        self.latence_max = latence_max
+        self.seuil_rescan = seuil_rescan
+        self.references = {}
+        self._verrou = threading.Lock()
+        self._en_attente = {}
+        self._premier = None
+        self._dernier = None
+        self._arret = threading.Event()
+        self.thread = threading.Thread(target=self._boucle, daemon=True)
+
+    def lancer(self):
+        self.thread.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+
+    def surveiller(self, chemin):
+        with self._verrou:
+            nb = self.references.get(chemin, 0)
+            self.references[chemin] = nb + 1
+        if nb == 0:
+            self._ajouter(chemin)
+
+    def oublier(self, chemin):
+        with self._verrou:
+            nb = self.references.get(chemin, 0) - 1
+            if nb > 0:
+                self.references[chemin] = nb
+                return
+            self.references.pop(chemin, None)
+            self._en_attente.pop(chemin, None)
+        if nb == 0:
+            self._retirer(chemin)
+
+    def signaler(self, chemin, noms=None):
+        with self._verrou:
+            maintenant = time.monotonic()
+            if self._premier is None:
+                self._premier = maintenant
+            self._dernier = maintenant
+            if noms is None:
+                self._en_attente[chemin] = None
+                return
+            en_attente = self._en_attente.setdefault(chemin, set())
+            if en_attente is None:
+                return
+            en_attente.update(noms)
+            if len(en_attente) > self.seuil_rescan:
+                self._en_attente[chemin] = None
+
+    def _vider_si_pret(self):
+        with self._verrou:
+            if self._premier is None:
+                return
+            maintenant = time.monotonic()
+            if maintenant - self._dernier < self.delai and maintenant - self._premier < self.latence_max:
+                return
+            changements, self._en_attente = self._en_attente, {}
+            self._premier = self._dernier = None
+        if changements:
+            self.retour.poster(self.sur_changements, changements)
+
+    def _ajouter(self, chemin):
+        pass
+
+    def _retirer(self, chemin):
+        pass
+
+
+class SurveillantInotify(Surveillant):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.descripteurs = {}
+        self.chemins = {}
+
+    def _ajouter(self, chemin):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(chemin), MASQUE)
+        if wd < 0:
+            return
+        with self._verrou:
+            self.descripteurs[chemin] = wd
+            self.chemins[wd] = chemin
+
+    def _retirer(self, chemin):
+        with self._verrou:
+            wd = self.descripteurs.pop(chemin, None)
+            if wd is None:
+                return
+            self.chemins.pop(wd, None)
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            lisibles, _, _ = select.select([self.fd], [], [], self.delai / 2)
+            if lisibles:
+                try:
+                    donnees = os.read(self.fd, 256 * 1024)
+                except BlockingIOError:
+                    donnees = b''
+                self._decoder(donnees)
+            self._vider_si_pret()
+        os.close(self.fd)
+
+    def _decoder(self, donnees):
+        position = 0
+        while position + EN_TETE.size <= len(donnees):
+            wd, masque, cookie, longueur = EN_TETE.unpack_from(donnees, position)
+            position += EN_TETE.size
+            nom = os.fsdecode(donnees[position:position + longueur].rstrip(b'\0'))
+            position += longueur
+            if masque & IN_Q_OVERFLOW:
+                with self._verrou:
+                    chemins = list(self.descripteurs)
+                for chemin in chemins:
+                    self.signaler(chemin)
+                continue
+            chemin = self.chemins.get(wd)
+            if chemin is None or masque & IN_IGNORED:
+                continue
+            if masque & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self.signaler(chemin)
+            elif nom:
+                self.signaler(chemin, (nom,))
+
+
+class SurveillantPolling(Surveillant):
+    def __init__(self, *args, intervalle=1.0, entrees_par_seconde=100, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.intervalle = intervalle
+        self.entrees_par_seconde = entrees_par_seconde
+        self.instantanes = {}
+        self.prochains_complets = {}
+
+    def _instantane(self, chemin):
+        try:
+            signature = signature_dossier(chemin)
+            entrees = {}
+            with os.scandir(chemin) as it:
+                for entry in it:
+                    try:
+                        stat_info = entry.stat()
+                        entrees[entry.name] = (stat_info.st_mtime_ns, stat_info.st_size)
+                    except OSError:
+                        entrees[entry.name] = None
+        except OSError:
+            return None, {}
+        return signature, entrees
+
+    def _ajouter(self, chemin):
+        with self._verrou:
+            self.instantanes[chemin] = None
+
+    def _retirer(self, chemin):
+        with self._verrou:
+            self.instantanes.pop(chemin, None)
+            self.prochains_complets.pop(chemin, None)
+
+    def _delai_complet(self, entrees):
+        return self.intervalle * max(10, len(entrees) / self.entrees_par_seconde)
+
+    def _boucle(self):
+        prochain = time.monotonic()
+        while not self._arret.wait(self.delai / 2):
+            if time.monotonic() >= prochain:
+                self._sonder()
+                prochain = time.monotonic() + self.intervalle
+            self._vider_si_pret()
+
+    def _sonder(self):
+        with self._verrou:
+            chemins = list(self.instantanes)
+        for chemin in chemins:
+            if chemin not in self.instantanes:
+                continue
+            ancien = self.instantanes.get(chemin)
+            if ancien is not None and ancien[0] is not None and \
+                    time.monotonic() < self.prochains_complets.get(chemin, 0.0):
+                try:
+                    if signature_dossier(chemin) == ancien[0]:
+                        continue
+                except OSError:
+                    pass
+            nouveau = self._instantane(chemin)
+            if ancien is not None:
+                ancien_entrees, nouveau_entrees = ancien[1], nouveau[1]
+                if nouveau[0] is None:
+                    if ancien[0] is not None:
+                        self.signaler(chemin)
+                else:
+                    noms = {nom for nom in ancien_entrees.keys() | nouveau_entrees.keys()
+                            if ancien_entrees.get(nom) != nouveau_entrees.get(nom)}
+                    if noms:
+                        self.signaler(chemin, noms)
+            with self._verrou:
+                if chemin in self.instantanes:
+                    self.instantanes[chemin] = nouveau
+                    self.prochains_complets[chemin] = time.monotonic() + self._delai_complet(nouveau[1])
+
+
+def creer_surveillant(retour, sur_changements):
+    if platform.system() == 'Linux':
+        try:
+            return SurveillantInotify(retour, sur_changements).lancer()
+        except (OSError, AttributeError):
+            pass
+    return SurveillantPolling(retour, sur_changements).lancer()
@@ -0,0 +1,50 @@
+import queue
+import time
+import traceback
+
+
+class FileRetour:
+    def __init__(self, widget, intervalle=30, budget=0.02):
+        self.widget = widget
+        self.intervalle = intervalle
+        self.budget = budget
+        self.file = queue.Queue()
+        self.widget.after(self.intervalle, self._sonder)
+
+    def poster(self, fonction, *args):
+        self.file.put((fonction, args))
+
+    def _sonder(self):
+        debut = time.perf_counter()
+        while time.perf_counter() - debut < self.budget:
+            try:
+                fonction, args = self.file.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fonction(*args)
+            except Exception:
+                traceback.print_exc()
+        self.widget.after(self.intervalle, self._sonder)
+
+
+class RetourSynchrone:
+    def __init__(self):
+        self.file = queue.Queue()
+
+    def poster(self, fonction, *args):
+        self.file.put((fonction, args))
+
+    def traiter_jusqua(self, termine, delai=0.05):
+        while not termine():
+            try:
+                fonction, args = self.file.get(timeout=delai)
+            except queue.Empty:
+                continue
+            fonction(*args)
+        while True:
+            try:
+                fonction, args = self.file.get_nowait()
+            except queue.Empty:
+                return
+            fonction(*args)
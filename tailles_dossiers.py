@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import stat
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+_arret = None
+
+
+def _initialiser(arret):
+    global _arret
+    _arret = arret
+
+
+def mesurer_arbre(racine, cache):
+    vus = set()
+    nouveau = {}
+    taille_totale = 0
+    disque_total = 0
+    pile = [racine]
+    while pile:
+        if _arret is not None and _arret.is_set():
+            break
+        chemin = pile.pop()
+        try:
+            stat_dossier = os.lstat(chemin)
+        except OSError:
+            continue
+        entree = cache.get(chemin)
+        if entree is None or entree[0] != stat_dossier.st_mtime_ns or entree[1] != stat_dossier.st_ino:
+            entree = _mesurer_dossier(chemin, stat_dossier)
+        nouveau[chemin] = entree
+        _, _, taille, blocs, sous_dossiers, liens = entree
+        taille_totale += taille
+        disque_total += blocs
+        for dev, ino, taille_lien, blocs_lien in liens:
+            if (dev, ino) not in vus:
+                vus.add((dev, ino))
+                taille_totale += taille_lien
+                disque_total += blocs_lien
+        pile.extend(os.path.join(chemin, nom) for nom in sous_dossiers)
+    return taille_totale, disque_total * 512, nouveau
+
+
+def _mesurer_dossier(chemin, stat_dossier):
+    taille = 0
+    blocs = getattr(stat_dossier, 'st_blocks', 0)
+    sous_dossiers = []
+    liens = []
+    try:
+        with os.scandir(chemin) as it:
+            for entry in it:
+                try:
+                    stat_info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(stat_info.st_mode):
+                    sous_dossiers.append(entry.name)
+                elif stat_info.st_nlink > 1:
+                    liens.append((stat_info.st_dev, stat_info.st_ino, stat_info.st_size,
+                                  getattr(stat_info, 'st_blocks', 0)))
+                else:
+                    taille += stat_info.st_size
+                    blocs += getattr(stat_info, 'st_blocks', 0)
+    except OSError:
+        pass
+    return (stat_dossier.st_mtime_ns, stat_dossier.st_ino, taille, blocs, tuple(sous_dossiers), tuple(liens))
+
+
+class CalculTailles:
+    def __init__(self, retour, max_racines=256, nb_processus=None):
+        self.retour = retour
+        self.max_racines = max_racines
+        self.nb_processus = nb_processus or os.cpu_count() or 2
+        self.caches = OrderedDict()
+        self.generation = 0
+        self._futures = []
+        self._pool = None
+        self._arret = None
+
+    def pool(self):
+        if self._pool is None:
+            contexte = multiprocessing.get_context('spawn')
+            self._arret = contexte.Event()
+            self._pool = ProcessPoolExecutor(max_workers=self.nb_processus, mp_context=contexte,
+                                             initializer=_initialiser, initargs=(self._arret,))
+        return self._pool
+
+    def calculer(self, chemins, sur_resultat):
+        generation = self.generation
+        for chemin in chemins:
+            future = self.pool().submit(mesurer_arbre, chemin, self.cache_pour(chemin))
+            future.add_done_callback(lambda future, chemin=chemin: self.retour.poster(
+                self._terminer, generation, chemin, future, sur_resultat))
+            self._futures.append(future)
+
+    def annuler(self):
+        self.generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def arreter(self):
+        self.annuler()
+        if self._pool is not None:
+            self._arret.set()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def cache_pour(self, racine):
+        cache = self.caches.get(racine)
+        if cache is not None:
+            self.caches.move_to_end(racine)
+            return cache
+        ancetre = os.path.dirname(racine)
+        while ancetre and ancetre not in self.caches:
+            parent = os.path.dirname(ancetre)
+            if parent == ancetre:
+                return {}
+            ancetre = parent
+        if not ancetre:
+            return {}
+        prefixe = os.path.join(racine, '')
+        return {chemin: entree for chemin, entree in self.caches[ancetre].items()
+                if chemin == racine or chemin.startswith(prefixe)}
+
+    def _terminer(self, generation, chemin, future, sur_resultat):
+        if future.cancelled() or future.exception() is not None:
+            return
+        taille, disque, cache = future.result()
+        self.caches[chemin] = cache
+        self.caches.move_to_end(chemin)
+        while len(self.caches) > self.max_racines:
+            self.caches.popitem(last=False)
+        if generation == self.generation:
+            sur_resultat(chemin, taille, disque)
@@ -0,0 +1,68 @@
+import os
+from urllib.parse import unquote
+
+import pytest
+
+from corbeille import corbeille_disponible, mettre_a_la_corbeille
+
+pytestmark = pytest.mark.skipif(not corbeille_disponible(), reason="corbeille freedesktop indisponible")
+
+
+@pytest.fixture
+def corbeille(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path / 'share'))
+    return tmp_path / 'share' / 'Trash'
+
+
+def lire_info(corbeille, nom):
+    lignes = (corbeille / 'info' / f'{nom}.trashinfo').read_text(encoding='utf-8').splitlines()
+    return dict(ligne.split('=', 1) for ligne in lignes[1:])
+
+
+def test_fichier_mis_a_la_corbeille(tmp_path, corbeille):
+    fichier = tmp_path / 'été 2024.txt'
+    fichier.write_text('contenu')
+    destination = mettre_a_la_corbeille(str(fichier))
+    assert not fichier.exists()
+    assert destination == str(corbeille / 'files' / 'été 2024.txt')
+    assert open(destination).read() == 'contenu'
+    info = lire_info(corbeille, 'été 2024.txt')
+    assert unquote(info['Path']) == str(fichier)
+    assert 'T' in info['DeletionDate']
+
+
+def test_noms_en_collision_numerotes(tmp_path, corbeille):
+    for numero in range(3):
+        dossier = tmp_path / f'd{numero}'
+        dossier.mkdir()
+        (dossier / 'rapport.txt').write_text(str(numero))
+        mettre_a_la_corbeille(str(dossier / 'rapport.txt'))
+    assert sorted(os.listdir(corbeille / 'files')) == ['rapport.2.txt', 'rapport.3.txt', 'rapport.txt']
+    assert sorted(os.listdir(corbeille / 'info')) == ['rapport.2.txt.trashinfo', 'rapport.3.txt.trashinfo',
+                                                       'rapport.txt.trashinfo']
+
+
+def test_entree_orpheline_jamais_ecrasee(tmp_path, corbeille):
+    (corbeille / 'files').mkdir(parents=True)
+    (corbeille / 'files' / 'b').write_text('orphelin')
+    fichier = tmp_path / 'b'
+    fichier.write_text('nouveau')
+    destination = mettre_a_la_corbeille(str(fichier))
+    assert (corbeille / 'files' / 'b').read_text() == 'orphelin'
+    assert destination == str(corbeille / 'files' / 'b.2')
+    assert not (corbeille / 'info' / 'b.trashinfo').exists()
+
+
+def test_dossier_mis_a_la_corbeille(tmp_path, corbeille):
+    dossier = tmp_path / 'projet'
+    (dossier / 'src').mkdir(parents=True)
+    (dossier / 'src' / 'main.py').write_text('print()')
+    mettre_a_la_corbeille(str(dossier))
+    assert not dossier.exists()
+    assert (corbeille / 'files' / 'projet' / 'src' / 'main.py').read_text() == 'print()'
+
+
+def test_element_absent(tmp_path, corbeille):
+    with pytest.raises(OSError):
+        mettre_a_la_corbeille(str(tmp_path / 'absent'))
+    assert not os.path.exists(corbeille / 'info') or os.listdir(corbeille / 'info') == []
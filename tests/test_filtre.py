@@ -0,0 +1,53 @@
+from array import array
+
+from filtre import FiltreIncremental, affine, compiler_filtre, est_sous_sequence
+
+NOMS = ['rapport.pdf', 'photo_vacances.jpg', 'Rapport_final.docx', 'script.py', 'readme.md', 'archive.tar']
+
+
+def filtrer(requete, approche=False, taille_pas=2, candidats=None):
+    noms = [nom.casefold() for nom in NOMS]
+    candidats = array('l', range(len(NOMS))) if candidats is None else candidats
+    filtre = FiltreIncremental(requete, approche, noms, candidats, taille_pas=taille_pas)
+    while not filtre.avancer(budget=0.0):
+        pass
+    return filtre
+
+
+def test_sous_chaine_insensible_a_la_casse():
+    assert [NOMS[i] for i in filtrer('RAPP').resultat] == ['rapport.pdf', 'Rapport_final.docx']
+
+
+def test_recherche_approchee():
+    assert [NOMS[i] for i in filtrer('rpt', approche=True).resultat] == ['rapport.pdf', 'Rapport_final.docx', 'script.py']
+    assert compiler_filtre('sp', approche=True)('script.py')
+    assert not compiler_filtre('sp')('script.py')
+
+
+def test_avancement_par_pas_sans_perte():
+    filtre = filtrer('a', taille_pas=1)
+    assert filtre.termine
+    assert list(filtre.resultat) == [i for i, nom in enumerate(NOMS) if 'a' in nom.casefold()]
+
+
+def test_affinage_equivalent_a_un_filtrage_complet():
+    large = filtrer('r')
+    assert large.peut_affiner('ra', False)
+    affine_ = filtrer('ra', candidats=large.resultat)
+    assert list(affine_.resultat) == list(filtrer('ra').resultat)
+
+
+def test_affinage_refuse_si_la_requete_elargit():
+    filtre = filtrer('rap')
+    assert not filtre.peut_affiner('ra', False)
+    assert not filtre.peut_affiner('rapx', True)
+    assert affine('ab', 'axb', approche=True)
+    assert not affine('ab', 'axb')
+    assert est_sous_sequence('ace', 'abcde')
+    assert not est_sous_sequence('aec', 'abcde')
+
+
+def test_filtre_inacheve_ne_peut_pas_etre_affine():
+    noms = [nom.casefold() for nom in NOMS]
+    filtre = FiltreIncremental('r', False, noms, array('l', range(len(NOMS))), taille_pas=1)
+    assert not filtre.peut_affiner('ra', False)
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from listing import DirectoryListing
+import noyau
+
+COLONNES = ('name', 'size', 'type', 'modified')
+EXTENSIONS = ('.txt', '.py', '.png', '.tar', '')
+
+
+def listing_aleatoire(graine, nb=200):
+    aleatoire = random.Random(graine)
+    listing = DirectoryListing('/virtuel')
+    for i in range(nb):
+        is_dir = aleatoire.random() < 0.2
+        nom = f"{aleatoire.choice('abcXYZ')}{i:04d}{'' if is_dir else aleatoire.choice(EXTENSIONS)}"
+        listing.ajouter_valeurs(nom, is_dir, 0 if is_dir else aleatoire.randrange(5000),
+                                aleatoire.randrange(10**6), 0)
+    return listing
+
+
+def test_dossiers_avant_fichiers_tri_par_nom():
+    listing = DirectoryListing('/virtuel')
+    for nom, is_dir in (('b.txt', False), ('Zeta', True), ('A.txt', False), ('alpha', True)):
+        listing.ajouter_valeurs(nom, is_dir, 1, 0, 0)
+    noms = [listing.noms[i] for i in listing.ordre_trie('name')]
+    assert noms == ['alpha', 'Zeta', 'A.txt', 'b.txt']
+    noms = [listing.noms[i] for i in listing.ordre_trie('name', True)]
+    assert noms == ['Zeta', 'alpha', 'b.txt', 'A.txt']
+
+
+@pytest.mark.parametrize('colonne', COLONNES)
+@pytest.mark.parametrize('reverse', (False, True))
+def test_ordre_trie_coherent_avec_cle_tri(colonne, reverse):
+    listing = listing_aleatoire(1)
+    attendu = sorted((i for i in range(len(listing))), key=listing.cle_tri(colonne, reverse))
+    assert list(listing.ordre_trie(colonne, reverse)) == attendu
+
+
+@pytest.mark.parametrize('colonne', COLONNES)
+@pytest.mark.parametrize('reverse', (False, True))
+def test_position_insertion_coherente_avec_le_tri(colonne, reverse):
+    listing = listing_aleatoire(2)
+    tri = (colonne, reverse)
+    ordre = listing.ordre_trie(*tri)
+    aleatoire = random.Random(3)
+    for i in range(50):
+        is_dir = aleatoire.random() < 0.2
+        index = listing.ajouter_valeurs(f"nouveau{i:03d}{'' if is_dir else '.txt'}", is_dir,
+                                        aleatoire.randrange(5000), aleatoire.randrange(10**6), 0)
+        ordre.insert(noyau.position_insertion(listing, ordre, index, tri), index)
+    assert list(ordre) == list(listing.ordre_trie(*tri))
+
+
+def test_suppression_et_renommage_maintiennent_le_tri():
+    listing = listing_aleatoire(4)
+    listing.supprimer(0)
+    listing.renommer(1, 'zzz-renomme.txt')
+    ordre = listing.ordre_trie('name')
+    assert 0 not in ordre
+    assert list(ordre) == sorted((i for i in range(len(listing)) if i != 0), key=listing.cle_tri('name'))
+
+
+def test_ordre_affiche_masque_les_fichiers_caches():
+    listing = DirectoryListing('/virtuel')
+    for nom in ('.cache', 'b', 'a'):
+        listing.ajouter_valeurs(nom, False, 1, 0, 0)
+    assert [listing.noms[i] for i in noyau.ordre_affiche(listing, show_hidden=False)] == ['a', 'b']
+    assert len(noyau.ordre_affiche(listing, show_hidden=True)) == 3
+
+
+def test_instantane_aller_retour():
+    listing = listing_aleatoire(5)
+    listing.supprimer(3)
+    copie = DirectoryListing.depuis_instantane(listing.instantane())
+    assert copie.nb_entrees() == listing.nb_entrees()
+    assert [copie.noms[i] for i in copie.ordre_trie('type')] == \
+        [listing.noms[i] for i in listing.ordre_trie('type')]
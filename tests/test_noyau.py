@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+import noyau
+from listing import DirectoryListing
+from operations_lot import creer_fichier_vide, renommer_element
+
+
+def test_renommer_et_creer(tmp_path):
+    dossier = str(tmp_path)
+    creer_fichier_vide(dossier, 'a.txt')
+    with pytest.raises(FileExistsError):
+        creer_fichier_vide(dossier, 'a.txt')
+    creer_fichier_vide(dossier, 'b.txt')
+    with pytest.raises(FileExistsError):
+        renommer_element(dossier, 'a.txt', 'b.txt')
+    with pytest.raises(OSError):
+        renommer_element(dossier, 'a.txt', 'sous/dossier')
+    renommer_element(dossier, 'a.txt', 'c.txt')
+    assert sorted(os.listdir(dossier)) == ['b.txt', 'c.txt']
+
+
+def creer_dossier(racine):
+    os.makedirs(os.path.join(racine, 'sous', 'profond'))
+    for chemin in ('a.txt', '.cache', 'sous/b.txt', 'sous/profond/a.txt'):
+        with open(os.path.join(racine, chemin), 'w') as f:
+            f.write(chemin)
+
+
+def test_scanner_dossier(tmp_path):
+    creer_dossier(str(tmp_path))
+    listing = noyau.scanner_dossier(str(tmp_path))
+    assert sorted(listing.noms) == ['.cache', 'a.txt', 'sous']
+    assert listing.est_dossier(listing.index_de('sous'))
+    assert listing.tailles[listing.index_de('a.txt')] == len('a.txt')
+    assert [listing.noms[i] for i in noyau.ordre_affiche(listing, show_hidden=False)] == ['sous', 'a.txt']
+    with pytest.raises(OSError):
+        noyau.scanner_dossier(str(tmp_path / 'absent'))
+
+
+def test_chercher(tmp_path):
+    creer_dossier(str(tmp_path))
+    listing, stats = noyau.chercher(str(tmp_path), 'a.txt')
+    assert sorted(listing.noms) == ['a.txt', os.path.join('sous', 'profond', 'a.txt')]
+    assert stats['resultats'] == 2
+
+
+def test_ajouter_entrees_respecte_les_fichiers_caches(tmp_path):
+    creer_dossier(str(tmp_path))
+    stat_info = os.stat(tmp_path / 'a.txt')
+    listing = DirectoryListing(str(tmp_path))
+    ordre = []
+    noyau.ajouter_entrees(listing, ordre, [('.cache', False, stat_info), ('a.txt', False, stat_info)],
+                          show_hidden=False)
+    assert listing.noms == ['.cache', 'a.txt'] and ordre == [1]
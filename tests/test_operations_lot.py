@@ -0,0 +1,47 @@
+from operations_lot import TacheLot, plan_renommage
+from taches import RetourSynchrone
+
+
+def lancer(elements, action):
+    retour = RetourSynchrone()
+    fins = []
+    tache = TacheLot(elements, action, retour, None, fins.append).lancer()
+    retour.traiter_jusqua(lambda: bool(fins))
+    return tache
+
+
+def test_plan_renommage_compteur_et_conflits():
+    plan, erreurs = plan_renommage(['img1.jpg', 'img2.jpg', 'notes.txt'], r'^img\d+', 'photo_{n}')
+    assert plan == [('img1.jpg', 'photo_1.jpg'), ('img2.jpg', 'photo_2.jpg')]
+    assert erreurs == []
+    plan, erreurs = plan_renommage(['a1', 'a2', 'b'], r'\d', '')
+    assert plan == [('a1', 'a')]
+    assert [nom for nom, _ in erreurs] == ['a2']
+
+
+def test_plan_renommage_resultats_de_recherche():
+    plan, erreurs = plan_renommage(['sous/x.txt', 'autre/x.txt', '/abs/x.txt'], r'^x', 'y')
+    assert plan == [('sous/x.txt', 'y.txt'), ('autre/x.txt', 'y.txt'), ('/abs/x.txt', 'y.txt')]
+    assert erreurs == []
+    plan, erreurs = plan_renommage(['d/a1', 'd/a2'], r'\d', '')
+    assert plan == [('d/a1', 'a')]
+    assert erreurs[0][0] == 'd/a2'
+
+
+def test_plan_renommage_noms_invalides():
+    plan, erreurs = plan_renommage(['x'], 'x', '')
+    assert plan == [] and erreurs[0][0] == 'x'
+    plan, erreurs = plan_renommage(['x'], 'x', 'a/b')
+    assert plan == [] and 'invalide' in erreurs[0][1]
+
+
+def test_tache_lot_signale_la_fin_meme_sur_exception_inattendue():
+    def action(element, tache):
+        if element == 2:
+            raise AttributeError("boum")
+        tache.compter()
+
+    tache = lancer([1, 2, 3], action)
+    assert tache.etat()['faits'] == 3
+    assert tache.erreurs == [(2, 'boum')]
+    assert tache.unites == 2
@@ -0,0 +1,28 @@
+import json
+import pickle
+
+from listing import DirectoryListing
+from session import charger_instantane, enregistrer_instantane
+
+
+def test_instantane_aller_retour(tmp_path):
+    listing = DirectoryListing('/virtuel')
+    listing.ajouter_valeurs('été.txt', False, 12, 1.5, 2.5, 4096)
+    listing.ajouter_valeurs('dossier', True, 0, 3.0, 4.0)
+    chemin = str(tmp_path / 'instantane.json')
+    assert enregistrer_instantane(listing, (1, 2), chemin)
+    json.loads(open(chemin, encoding='utf-8').read())
+    copie, signature = charger_instantane('/virtuel', chemin)
+    assert signature == (1, 2)
+    assert copie.noms == listing.noms
+    assert list(copie.tailles) == [12, 0] and list(copie.mtimes) == [1.5, 3.0]
+    assert [copie.type(i) for i in range(2)] == [listing.type(i) for i in range(2)]
+    assert charger_instantane('/autre', chemin) == (None, None)
+
+
+def test_instantane_invalide_ignore(tmp_path):
+    chemin = tmp_path / 'instantane.json'
+    chemin.write_bytes(pickle.dumps({'version': 2}))
+    assert charger_instantane('/virtuel', str(chemin)) == (None, None)
+    chemin.write_text('{"version": 2, "ordre_octets": "little", "listing": {"chemin": "/virtuel"}}')
+    assert charger_instantane('/virtuel', str(chemin)) == (None, None)
@@ -0,0 +1,42 @@
+import os
+
+import operations_lot
+from operations_lot import TacheLot, supprimer_arbre, supprimer_element
+from taches import RetourSynchrone
+
+
+def creer_arbre(racine):
+    os.makedirs(os.path.join(racine, 'a', 'b'))
+    for chemin in ('f1', 'a/f2', 'a/b/f3'):
+        with open(os.path.join(racine, chemin), 'w') as f:
+            f.write(chemin)
+    os.symlink('/', os.path.join(racine, 'a', 'lien'))
+
+
+def test_supprimer_arbre(tmp_path):
+    racine = tmp_path / 'arbre'
+    creer_arbre(str(racine))
+    supprimes = []
+    assert supprimer_arbre(str(racine), sur_element=supprimes.append) == []
+    assert not racine.exists()
+    assert sum(supprimes) == 7
+    assert os.path.exists('/')
+
+
+def test_supprimer_arbre_fichier_simple(tmp_path):
+    fichier = tmp_path / 'seul'
+    fichier.write_text('x')
+    assert supprimer_arbre(str(fichier)) == []
+    assert not fichier.exists()
+
+
+def test_une_erreur_par_element_supprime(tmp_path, monkeypatch):
+    monkeypatch.setattr(operations_lot, 'supprimer_arbre',
+                        lambda chemin, annulee=None, sur_element=None, erreurs=None: [('a', 'x'), ('b', 'y')])
+    retour = RetourSynchrone()
+    fins = []
+    tache = TacheLot([str(tmp_path)], supprimer_element, retour, None, fins.append).lancer()
+    retour.traiter_jusqua(lambda: bool(fins))
+    etat = tache.etat()
+    assert (etat['faits'], etat['erreurs']) == (1, 1)
+    assert '2 élément(s)' in tache.erreurs[0][1]
@@ -0,0 +1,119 @@
+import os
+import socket
+import stat
+
+import pytest
+
+from taches import RetourSynchrone
+from transfert import Transfert
+
+
+def creer_arbre(racine):
+    os.makedirs(os.path.join(racine, 'sous'))
+    with open(os.path.join(racine, 'gros.bin'), 'wb') as f:
+        f.write(os.urandom(3 * 2**20 + 17))
+    with open(os.path.join(racine, 'sous', 'petit.txt'), 'w') as f:
+        f.write('bonjour')
+    os.symlink('petit.txt', os.path.join(racine, 'sous', 'lien'))
+
+
+def contenu(racine):
+    resultat = {}
+    for dossier, dossiers, fichiers in os.walk(racine):
+        for nom in fichiers:
+            chemin = os.path.join(dossier, nom)
+            relatif = os.path.relpath(chemin, racine)
+            if os.path.islink(chemin):
+                resultat[relatif] = ('lien', os.readlink(chemin))
+            else:
+                with open(chemin, 'rb') as f:
+                    resultat[relatif] = f.read()
+    return resultat
+
+
+def transferer(paires, deplacer=False):
+    retour = RetourSynchrone()
+    fins = []
+    transfert = Transfert(paires, deplacer, retour, None, fins.append, nb_workers=2).lancer()
+    retour.traiter_jusqua(lambda: bool(fins))
+    return transfert
+
+
+def test_copie_arbre(tmp_path):
+    source, cible = str(tmp_path / 'source'), str(tmp_path / 'cible')
+    creer_arbre(source)
+    attendu = contenu(source)
+    transfert = transferer([(source, cible)])
+    assert transfert.erreurs == []
+    assert contenu(cible) == attendu
+    assert contenu(source) == attendu
+    etat = transfert.etat()
+    assert etat['octets_faits'] == etat['octets_total']
+    assert etat['fichiers_faits'] == etat['fichiers_total'] == 3
+
+
+def test_copie_refuse_une_destination_existante(tmp_path):
+    source, cible = tmp_path / 'a.txt', tmp_path / 'b.txt'
+    source.write_text('source')
+    cible.write_text('cible')
+    transfert = transferer([(str(source), str(cible))])
+    assert len(transfert.erreurs) == 1
+    assert cible.read_text() == 'cible'
+
+
+@pytest.mark.parametrize('meme_peripherique', (True, False))
+def test_deplacement_arbre(tmp_path, monkeypatch, meme_peripherique):
+    monkeypatch.setattr(Transfert, '_meme_peripherique', lambda self, source, cible: meme_peripherique)
+    source, cible = str(tmp_path / 'source'), str(tmp_path / 'cible')
+    creer_arbre(source)
+    attendu = contenu(source)
+    transfert = transferer([(source, cible)], deplacer=True)
+    assert transfert.erreurs == []
+    assert contenu(cible) == attendu
+    assert not os.path.exists(source)
+
+
+def test_deplacement_recree_les_fifos(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transfert, '_meme_peripherique', lambda self, source, cible: False)
+    source, cible = tmp_path / 'source', tmp_path / 'cible'
+    source.mkdir()
+    os.mkfifo(source / 'tube')
+    (source / 'a.txt').write_text('a')
+    transfert = transferer([(str(source), str(cible))], deplacer=True)
+    assert transfert.erreurs == []
+    assert stat.S_ISFIFO(os.lstat(cible / 'tube').st_mode)
+    assert (cible / 'a.txt').read_text() == 'a'
+    assert not source.exists()
+
+
+def test_deplacement_conserve_la_source_si_un_element_est_ignore(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transfert, '_meme_peripherique', lambda self, source, cible: False)
+    source, cible = tmp_path / 'source', tmp_path / 'cible'
+    source.mkdir()
+    (source / 'a.txt').write_text('a')
+    with socket.socket(socket.AF_UNIX) as prise:
+        prise.bind(str(source / 'prise'))
+        transfert = transferer([(str(source), str(cible))], deplacer=True)
+    assert [os.path.basename(chemin) for chemin, _ in transfert.erreurs] == ['prise']
+    assert (source / 'a.txt').read_text() == 'a'
+    assert stat.S_ISSOCK(os.lstat(source / 'prise').st_mode)
+
+
+def test_deplacement_ne_supprime_pas_les_ajouts_pendant_la_copie(tmp_path, monkeypatch):
+    monkeypatch.setattr(Transfert, '_meme_peripherique', lambda self, source, cible: False)
+    planifier = Transfert._planifier
+
+    def planifier_puis_ajouter(self, source, cible):
+        plan = planifier(self, source, cible)
+        with open(os.path.join(source, 'tardif.txt'), 'w') as f:
+            f.write('tardif')
+        return plan
+
+    monkeypatch.setattr(Transfert, '_planifier', planifier_puis_ajouter)
+    source, cible = tmp_path / 'source', tmp_path / 'cible'
+    source.mkdir()
+    (source / 'a.txt').write_text('a')
+    transfert = transferer([(str(source), str(cible))], deplacer=True)
+    assert len(transfert.erreurs) == 1
+    assert (source / 'tardif.txt').read_text() == 'tardif'
+    assert (cible / 'a.txt').read_text() == 'a'
@@ -0,0 +1,267 @@
+import errno
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TAILLE_BLOC = 8 * 2**20
+TAILLE_TAMPON = 2**20
+ERREURS_REPLI = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM, errno.EBADF,
+                 errno.ENOTSUP}
+
+
+class TransfertAnnule(Exception):
+    pass
+
+
+def _verifier(annulee):
+    if annulee is not None and annulee.is_set():
+        raise TransfertAnnule()
+
+
+def _copier_noyau(fonction, annulee, sur_octets):
+    copies = 0
+    while True:
+        _verifier(annulee)
+        try:
+            n = fonction(copies)
+        except OSError as e:
+            if copies == 0 and e.errno in ERREURS_REPLI:
+                return False
+            raise
+        if n == 0:
+            return True
+        copies += n
+        if sur_octets is not None:
+            sur_octets(n)
+
+
+def copier_contenu(fd_source, fd_cible, annulee=None, sur_octets=None):
+    if hasattr(os, 'copy_file_range'):
+        if _copier_noyau(lambda copies: os.copy_file_range(fd_source, fd_cible, TAILLE_BLOC),
+                         annulee, sur_octets):
+            return
+    if hasattr(os, 'sendfile'):
+        if _copier_noyau(lambda copies: os.sendfile(fd_cible, fd_source, copies, TAILLE_BLOC),
+                         annulee, sur_octets):
+            return
+    tampon = bytearray(TAILLE_TAMPON)
+    vue = memoryview(tampon)
+    while True:
+        _verifier(annulee)
+        n = os.readv(fd_source, [tampon]) if hasattr(os, 'readv') else os.read(fd_source, TAILLE_TAMPON)
+        if isinstance(n, bytes):
+            donnees, n = n, len(n)
+        else:
+            donnees = vue[:n]
+        if not n:
+            return
+        ecrits = 0
+        while ecrits < n:
+            ecrits += os.write(fd_cible, donnees[ecrits:])
+        if sur_octets is not None:
+            sur_octets(n)
+
+
+def copier_fichier(source, cible, annulee=None, sur_octets=None):
+    with open(source, 'rb') as fichier_source, open(cible, 'xb') as fichier_cible:
+        try:
+            copier_contenu(fichier_source.fileno(), fichier_cible.fileno(), annulee, sur_octets)
+        except BaseException:
+            fichier_cible.close()
+            os.unlink(cible)
+            raise
+    shutil.copystat(source, cible)
+
+
+class Transfert:
+    def __init__(self, paires, deplacer=False, retour=None, sur_progres=None, sur_fin=None,
+                 nb_workers=4, intervalle=0.1):
+        self.paires = list(paires)
+        self.deplacer = deplacer
+        self.retour = retour
+        self.sur_progres = sur_progres
+        self.sur_fin = sur_fin
+        self.nb_workers = nb_workers
+        self.intervalle = intervalle
+        self.annulee = threading.Event()
+        self.erreurs = []
+        self.octets_total = 0
+        self.octets_faits = 0
+        self.fichiers_total = 0
+        self.fichiers_faits = 0
+        self.debut = None
+        self._verrou = threading.Lock()
+        self._dernier_rapport = 0.0
+        self.thread = threading.Thread(target=self.executer, daemon=True)
+
+    def lancer(self):
+        self.thread.start()
+        return self
+
+    def annuler(self):
+        self.annulee.set()
+
+    def etat(self):
+        duree = time.perf_counter() - self.debut if self.debut else 0.0
+        debit = self.octets_faits / duree if duree else 0.0
+        restant = self.octets_total - self.octets_faits
+        return {
+            'octets_faits': self.octets_faits,
+            'octets_total': self.octets_total,
+            'fichiers_faits': self.fichiers_faits,
+            'fichiers_total': self.fichiers_total,
+            'debit': debit,
+            'eta': restant / debit if debit else None,
+            'duree': duree,
+        }
+
+    def executer(self):
+        self.debut = time.perf_counter()
+        a_copier = []
+        for source, cible in self.paires:
+            try:
+                if os.path.lexists(cible):
+                    raise FileExistsError(errno.EEXIST, "La destination existe déjà", cible)
+                if self.deplacer and self._meme_peripherique(source, cible):
+                    os.rename(source, cible)
+                    continue
+                a_copier.append((source, cible))
+            except OSError as e:
+                self.erreurs.append((source, str(e)))
+        plans = []
+        for source, cible in a_copier:
+            try:
+                plans.append((source, cible, self._planifier(source, cible)))
+            except OSError as e:
+                self.erreurs.append((source, str(e)))
+        try:
+            with ThreadPoolExecutor(max_workers=self.nb_workers) as pool:
+                for source, cible, plan in plans:
+                    self._copier_arbre(pool, source, cible, *plan)
+        except TransfertAnnule:
+            pass
+        self._rapporter(force=True)
+        if self.retour is not None and self.sur_fin is not None:
+            self.retour.poster(self.sur_fin, self)
+
+    def _meme_peripherique(self, source, cible):
+        return os.lstat(source).st_dev == os.stat(os.path.dirname(os.path.abspath(cible))).st_dev
+
+    def _planifier(self, source, cible):
+        dossiers, fichiers, liens, speciaux = [], [], [], []
+        pile = [(source, cible)]
+        while pile:
+            _verifier(self.annulee)
+            chemin, chemin_cible = pile.pop()
+            stat_info = os.lstat(chemin)
+            if stat.S_ISLNK(stat_info.st_mode):
+                liens.append((chemin, chemin_cible))
+            elif stat.S_ISDIR(stat_info.st_mode):
+                dossiers.append((chemin, chemin_cible))
+                with os.scandir(chemin) as it:
+                    for entry in it:
+                        pile.append((entry.path, os.path.join(chemin_cible, entry.name)))
+            elif stat.S_ISREG(stat_info.st_mode):
+                fichiers.append((chemin, chemin_cible, stat_info.st_size, stat_info.st_mtime_ns))
+            else:
+                speciaux.append((chemin, chemin_cible, stat_info))
+        with self._verrou:
+            self.octets_total += sum(fichier[2] for fichier in fichiers)
+            self.fichiers_total += len(fichiers) + len(liens) + len(speciaux)
+        return dossiers, fichiers, liens, speciaux
+
+    def _creer_special(self, chemin_cible, stat_info):
+        mode = stat_info.st_mode
+        if stat.S_ISFIFO(mode):
+            os.mkfifo(chemin_cible, stat.S_IMODE(mode))
+        elif (stat.S_ISCHR(mode) or stat.S_ISBLK(mode)) and hasattr(os, 'mknod'):
+            os.mknod(chemin_cible, mode, stat_info.st_rdev)
+        else:
+            raise OSError(errno.EOPNOTSUPP, "Fichier spécial non copiable", chemin_cible)
+
+    def _copier_arbre(self, pool, source, cible, dossiers, fichiers, liens, speciaux):
+        erreurs_avant = len(self.erreurs)
+        for chemin, chemin_cible in dossiers:
+            _verifier(self.annulee)
+            try:
+                os.mkdir(chemin_cible)
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+        for chemin, chemin_cible in liens:
+            try:
+                os.symlink(os.readlink(chemin), chemin_cible)
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+            self._fichier_fini()
+        for chemin, chemin_cible, stat_info in speciaux:
+            try:
+                self._creer_special(chemin_cible, stat_info)
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+            self._fichier_fini()
+        futures = [pool.submit(self._copier_un, chemin, chemin_cible)
+                   for chemin, chemin_cible, _, _ in sorted(fichiers, key=lambda fichier: fichier[2])]
+        for future in futures:
+            future.result()
+        _verifier(self.annulee)
+        for chemin, chemin_cible in reversed(dossiers):
+            try:
+                shutil.copystat(chemin, chemin_cible)
+            except OSError:
+                pass
+        if not self.deplacer or len(self.erreurs) != erreurs_avant:
+            return
+        for chemin, chemin_cible, taille, mtime_ns in fichiers:
+            try:
+                stat_source = os.lstat(chemin)
+                if os.lstat(chemin_cible).st_size != taille or stat_source.st_size != taille or \
+                        stat_source.st_mtime_ns != mtime_ns:
+                    self.erreurs.append((chemin, "Source modifiée ou copie incomplète, source conservée"))
+                    return
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+                return
+        # seuls les éléments planifiés sont supprimés : un ajout pendant la copie fait échouer le rmdir
+        for chemin in [fichier[0] for fichier in fichiers] + [lien[0] for lien in liens] + \
+                [special[0] for special in speciaux]:
+            try:
+                os.unlink(chemin)
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+        for chemin, _ in reversed(dossiers):
+            try:
+                os.rmdir(chemin)
+            except OSError as e:
+                self.erreurs.append((chemin, str(e)))
+
+    def _copier_un(self, chemin, chemin_cible):
+        if self.annulee.is_set():
+            return
+        try:
+            copier_fichier(chemin, chemin_cible, self.annulee, self._octets)
+        except TransfertAnnule:
+            return
+        except OSError as e:
+            self.erreurs.append((chemin, str(e)))
+        self._fichier_fini()
+
+    def _octets(self, n):
+        with self._verrou:
+            self.octets_faits += n
+        self._rapporter()
+
+    def _fichier_fini(self):
+        with self._verrou:
+            self.fichiers_faits += 1
+        self._rapporter()
+
+    def _rapporter(self, force=False):
+        maintenant = time.perf_counter()
+        if not force and maintenant - self._dernier_rapport < self.intervalle:
+            return
+        self._dernier_rapport = maintenant
+        if self.retour is not None and self.sur_progres is not None:
+            self.retour.poster(self.sur_progres, self.etat())
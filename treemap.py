@@ -0,0 +1,217 @@
+import colorsys
+import os
+import threading
+import time
+
+
+class Noeud:
+    __slots__ = ('nom', 'chemin', 'taille', 'est_dossier', 'enfants')
+
+    def __init__(self, nom, chemin, taille, est_dossier, enfants=None):
+        self.nom = nom
+        self.chemin = chemin
+        self.taille = taille
+        self.est_dossier = est_dossier
+        self.enfants = enfants
+
+
+def totaux_cache(cache):
+    totaux = {}
+    for chemin in sorted(cache, key=lambda chemin: chemin.count(os.sep), reverse=True):
+        _, _, taille, _, sous_dossiers, liens = cache[chemin]
+        total = taille + sum(lien[2] for lien in liens)
+        for nom in sous_dossiers:
+            total += totaux.get(os.path.join(chemin, nom), 0)
+        totaux[chemin] = total
+    return totaux
+
+
+def enfants_depuis_cache(chemin, cache, totaux):
+    entree = cache.get(chemin)
+    if entree is None:
+        return []
+    _, _, taille, _, sous_dossiers, liens = entree
+    enfants = [Noeud(nom, os.path.join(chemin, nom), totaux.get(os.path.join(chemin, nom), 0), True)
+               for nom in sous_dossiers]
+    fichiers = taille + sum(lien[2] for lien in liens)
+    if fichiers:
+        enfants.append(Noeud('(fichiers)', chemin, fichiers, False))
+    return enfants
+
+
+def construire_arbre(racine, entrees, caches):
+    enfants = []
+    for nom, chemin, est_dossier, taille in entrees:
+        noeud = Noeud(nom, chemin, taille, est_dossier)
+        if est_dossier and chemin in caches:
+            noeud.enfants = caches[chemin]
+        enfants.append(noeud)
+    return Noeud(os.path.basename(racine) or racine, racine, sum(noeud.taille for noeud in enfants), True, enfants)
+
+
+def _enfants(noeud, totaux_par_cache):
+    if isinstance(noeud.enfants, dict):
+        cache = noeud.enfants
+        totaux = totaux_par_cache.get(id(cache))
+        if totaux is None:
+            totaux = totaux_par_cache[id(cache)] = totaux_cache(cache)
+        enfants = enfants_depuis_cache(noeud.chemin, cache, totaux)
+        for enfant in enfants:
+            if enfant.est_dossier:
+                enfant.enfants = cache
+        return enfants
+    return noeud.enfants or []
+
+
+def _pire_ratio(ligne, cote):
+    somme = sum(ligne)
+    return max(cote * cote * max(ligne) / (somme * somme), (somme * somme) / (cote * cote * min(ligne)))
+
+
+def squarify(valeurs, x, y, largeur, hauteur):
+    total = sum(valeurs)
+    if not total or largeur <= 0 or hauteur <= 0:
+        return []
+    echelle = largeur * hauteur / total
+    aires = [valeur * echelle for valeur in valeurs]
+    rectangles = []
+    i = 0
+    while i < len(aires):
+        cote = min(largeur, hauteur)
+        ligne = [aires[i]]
+        i += 1
+        while i < len(aires) and _pire_ratio(ligne + [aires[i]], cote) <= _pire_ratio(ligne, cote):
+            ligne.append(aires[i])
+            i += 1
+        somme = sum(ligne)
+        if largeur >= hauteur:
+            epaisseur = somme / hauteur if hauteur else 0
+            position = y
+            for aire in ligne:
+                cote_rect = aire / epaisseur if epaisseur else 0
+                rectangles.append((x, position, epaisseur, cote_rect))
+                position += cote_rect
+            x += epaisseur
+            largeur -= epaisseur
+        else:
+            epaisseur = somme / largeur if largeur else 0
+            position = x
+            for aire in ligne:
+                cote_rect = aire / epaisseur if epaisseur else 0
+                rectangles.append((position, y, cote_rect, epaisseur))
+                position += cote_rect
+            y += epaisseur
+            hauteur -= epaisseur
+    return rectangles
+
+
+def calculer_disposition(arbre, largeur, hauteur, seuil_px=4, max_tuiles=20000, annulee=None):
+    tuiles = []
+    totaux_par_cache = {}
+    pile = [(arbre, 0, 0, largeur, hauteur, 0)]
+    while pile and len(tuiles) < max_tuiles:
+        if annulee is not None and annulee.is_set():
+            return None
+        noeud, x, y, w, h, profondeur = pile.pop()
+        if w < 1 or h < 1:
+            continue
+        tuiles.append((x, y, w, h, profondeur, noeud.nom, noeud.chemin, noeud.est_dossier, noeud.taille))
+        if not noeud.est_dossier or w < 3 * seuil_px or h < 3 * seuil_px:
+            continue
+        entete = 14 if h > 40 and w > 40 else 2
+        interieur = (x + 2, y + entete, w - 4, h - entete - 2)
+        if interieur[2] <= seuil_px or interieur[3] <= seuil_px:
+            continue
+        enfants = sorted((enfant for enfant in _enfants(noeud, totaux_par_cache) if enfant.taille > 0),
+                         key=lambda enfant: enfant.taille, reverse=True)
+        if not enfants:
+            continue
+        aire_min = seuil_px * seuil_px * noeud.taille / (interieur[2] * interieur[3])
+        visibles = [enfant for enfant in enfants if enfant.taille >= aire_min]
+        reste = sum(enfant.taille for enfant in enfants[len(visibles):])
+        if reste:
+            visibles.append(Noeud(f'({len(enfants) - len(visibles)} autres)', noeud.chemin, reste, False))
+        for enfant, rectangle in zip(visibles, squarify([enfant.taille for enfant in visibles], *interieur)):
+            pile.append((enfant,) + rectangle + (profondeur + 1,))
+    return tuiles
+
+
+def couleur(profondeur, est_dossier):
+    if not est_dossier:
+        return '#b0b0b0'
+    r, g, b = colorsys.hls_to_rgb((profondeur * 0.13) % 1.0, 0.55 + min(profondeur, 6) * 0.04, 0.45)
+    return f'#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}'
+
+
+class VueCarte:
+    def __init__(self, canvas, retour, sur_clic):
+        self.canvas = canvas
+        self.retour = retour
+        self.sur_clic = sur_clic
+        self.fabrique = None
+        self.tuiles = []
+        self.annulee = None
+        self._prevu = None
+        self.canvas.bind('<Configure>', lambda event: self.planifier())
+        self.canvas.bind('<Button-1>', self._clic)
+
+    def afficher(self, fabrique):
+        self.fabrique = fabrique
+        self.planifier()
+
+    def planifier(self, delai=100):
+        if self._prevu is not None:
+            self.canvas.after_cancel(self._prevu)
+        self._prevu = self.canvas.after(delai, self._calculer)
+
+    def _calculer(self):
+        self._prevu = None
+        if self.fabrique is None:
+            return
+        if self.annulee is not None:
+            self.annulee.set()
+        annulee = self.annulee = threading.Event()
+        largeur, hauteur = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if largeur <= 1 or hauteur <= 1:
+            return
+        fabrique = self.fabrique
+
+        def executer():
+            tuiles = calculer_disposition(fabrique(), largeur, hauteur, annulee=annulee)
+            if tuiles is not None:
+                self.retour.poster(self._dessiner, annulee, tuiles)
+
+        threading.Thread(target=executer, daemon=True).start()
+
+    def _dessiner(self, annulee, tuiles):
+        if annulee.is_set():
+            return
+        self.tuiles = tuiles
+        self.canvas.delete('all')
+        self._dessiner_tranche(annulee, tuiles, 0)
+
+    def _dessiner_tranche(self, annulee, tuiles, debut, budget=0.008):
+        if annulee.is_set():
+            return
+        limite = time.perf_counter() + budget
+        numero = debut
+        while numero < len(tuiles):
+            x, y, w, h, profondeur, nom, chemin, est_dossier, taille = tuiles[numero]
+            self.canvas.create_rectangle(x, y, x + w, y + h, fill=couleur(profondeur, est_dossier),
+                                         outline='#404040', tags=(f't{numero}',))
+            if w > 40 and h > 14:
+                self.canvas.create_text(x + 3, y + 1, text=nom, anchor='nw', width=max(1, w - 6),
+                                        font=('TkDefaultFont', 8), tags=(f't{numero}',))
+            numero += 1
+            if numero % 64 == 0 and time.perf_counter() >= limite:
+                self.canvas.after(1, self._dessiner_tranche, annulee, tuiles, numero)
+                return
+
+    def _clic(self, event):
+        for item in reversed(self.canvas.find_overlapping(event.x, event.y, event.x, event.y)):
+            for tag in self.canvas.gettags(item):
+                if tag.startswith('t'):
+                    x, y, w, h, profondeur, nom, chemin, est_dossier, taille = self.tuiles[int(tag[1:])]
+                    if profondeur > 0:
+                        self.sur_clic(chemin)
+                    return
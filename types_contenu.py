@@ -0,0 +1,144 @@
+import os
+import stat
+import threading
+from collections import OrderedDict, deque
+
+TYPES_EXTENSIONS = {
+    '.txt': 'Texte', '.md': 'Texte Markdown', '.rst': 'Texte reStructuredText', '.log': 'Journal',
+    '.csv': 'Tableau CSV', '.json': 'Données JSON', '.xml': 'Document XML', '.yaml': 'Données YAML',
+    '.yml': 'Données YAML', '.toml': 'Configuration TOML', '.ini': 'Configuration', '.cfg': 'Configuration',
+    '.html': 'Page HTML', '.htm': 'Page HTML', '.css': 'Feuille de style CSS',
+    '.py': 'Script Python', '.js': 'Script JavaScript', '.sh': 'Script shell', '.c': 'Source C',
+    '.h': 'En-tête C', '.cpp': 'Source C++', '.rs': 'Source Rust', '.go': 'Source Go', '.java': 'Source Java',
+    '.png': 'Image PNG', '.jpg': 'Image JPEG', '.jpeg': 'Image JPEG', '.gif': 'Image GIF',
+    '.bmp': 'Image BMP', '.tif': 'Image TIFF', '.tiff': 'Image TIFF', '.webp': 'Image WebP',
+    '.svg': 'Image SVG', '.ico': 'Icône',
+    '.mp3': 'Audio MP3', '.wav': 'Audio WAV', '.flac': 'Audio FLAC', '.ogg': 'Audio Ogg',
+    '.mp4': 'Vidéo MP4', '.mkv': 'Vidéo Matroska', '.avi': 'Vidéo AVI', '.mov': 'Vidéo QuickTime',
+    '.pdf': 'Document PDF', '.doc': 'Document Word', '.docx': 'Document Word', '.odt': 'Document texte ODF',
+    '.xls': 'Classeur Excel', '.xlsx': 'Classeur Excel', '.ods': 'Classeur ODF',
+    '.zip': 'Archive ZIP', '.gz': 'Archive gzip', '.tgz': 'Archive gzip', '.bz2': 'Archive bzip2',
+    '.xz': 'Archive xz', '.7z': 'Archive 7-Zip', '.tar': 'Archive tar', '.rar': 'Archive RAR',
+    '.exe': 'Exécutable Windows', '.dll': 'Bibliothèque Windows', '.so': 'Bibliothèque partagée',
+    '.o': 'Fichier objet', '.pyc': 'Bytecode Python', '.sqlite': 'Base SQLite', '.db': 'Base de données',
+    '.iso': 'Image disque',
+}
+
+SIGNATURES = [
+    (0, b'\x89PNG\r\n\x1a\n', 'Image PNG'),
+    (0, b'\xff\xd8\xff', 'Image JPEG'),
+    (0, b'GIF87a', 'Image GIF'),
+    (0, b'GIF89a', 'Image GIF'),
+    (0, b'BM', 'Image BMP'),
+    (0, b'II*\x00', 'Image TIFF'),
+    (0, b'MM\x00*', 'Image TIFF'),
+    (0, b'\x00\x00\x01\x00', 'Icône'),
+    (0, b'%PDF-', 'Document PDF'),
+    (0, b'PK\x03\x04', 'Archive ZIP'),
+    (0, b'PK\x05\x06', 'Archive ZIP'),
+    (0, b'\x1f\x8b', 'Archive gzip'),
+    (0, b'BZh', 'Archive bzip2'),
+    (0, b'\xfd7zXZ\x00', 'Archive xz'),
+    (0, b"7z\xbc\xaf'\x1c", 'Archive 7-Zip'),
+    (0, b'Rar!\x1a\x07', 'Archive RAR'),
+    (257, b'ustar', 'Archive tar'),
+    (0, b'\x7fELF', 'Exécutable ELF'),
+    (0, b'MZ', 'Exécutable Windows'),
+    (0, b'\xca\xfe\xba\xbe', 'Classe Java'),
+    (0, b'SQLite format 3\x00', 'Base SQLite'),
+    (0, b'ID3', 'Audio MP3'),
+    (0, b'fLaC', 'Audio FLAC'),
+    (0, b'OggS', 'Audio Ogg'),
+    (0, b'\x1aE\xdf\xa3', 'Vidéo Matroska'),
+    (4, b'ftyp', 'Vidéo MP4'),
+    (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'Document Office'),
+    (0, b'#!', 'Script'),
+    (0, b'<?xml', 'Document XML'),
+]
+
+SOUS_TYPES_RIFF = {b'WEBP': 'Image WebP', b'WAVE': 'Audio WAV', b'AVI ': 'Vidéo AVI'}
+
+TAILLE_ENTETE = 512
+LIBELLE_SPECIAL = "Fichier spécial"
+
+
+def type_extension(nom):
+    extension = os.path.splitext(nom)[1]
+    libelle = TYPES_EXTENSIONS.get(extension.lower())
+    if libelle is not None:
+        return libelle
+    return f"{extension} Fichier" if extension else "Fichier"
+
+
+def detecter_type(entete, nom):
+    if not entete:
+        return "Fichier vide"
+    if entete[:4] == b'RIFF':
+        return SOUS_TYPES_RIFF.get(entete[8:12], "Données RIFF")
+    for decalage, signature, libelle in SIGNATURES:
+        if entete[decalage:decalage + len(signature)] == signature:
+            if libelle == 'Archive ZIP' or libelle == 'Script':
+                return TYPES_EXTENSIONS.get(os.path.splitext(nom)[1].lower(), libelle)
+            return libelle
+    if b'\0' in entete:
+        return "Données binaires"
+    try:
+        entete.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(entete) - 4:
+            return "Données binaires"
+    libelle = TYPES_EXTENSIONS.get(os.path.splitext(nom)[1].lower())
+    return libelle if libelle is not None else "Texte"
+
+
+class ClassifieurTypes:
+    def __init__(self, retour, nb_workers=2, max_entrees=200000):
+        self.retour = retour
+        self.nb_workers = nb_workers
+        self.max_entrees = max_entrees
+        self.cache = OrderedDict()
+        self.condition = threading.Condition()
+        self.file = deque()
+        self.sur_resultat = None
+        self.threads = []
+
+    def classer(self, demandes, sur_resultat):
+        with self.condition:
+            self.file = deque(demandes)
+            self.sur_resultat = sur_resultat
+            while len(self.threads) < min(self.nb_workers, len(self.file)):
+                thread = threading.Thread(target=self._travailler, daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify_all()
+
+    def classer_fichier(self, chemin):
+        stat_info = os.stat(chemin)
+        if not stat.S_ISREG(stat_info.st_mode):
+            return LIBELLE_SPECIAL
+        cle = (stat_info.st_dev, stat_info.st_ino, stat_info.st_mtime_ns)
+        with self.condition:
+            libelle = self.cache.get(cle)
+            if libelle is not None:
+                self.cache.move_to_end(cle)
+                return libelle
+        with open(chemin, 'rb') as f:
+            libelle = detecter_type(f.read(TAILLE_ENTETE), os.path.basename(chemin))
+        with self.condition:
+            self.cache[cle] = libelle
+            if len(self.cache) > self.max_entrees:
+                self.cache.popitem(last=False)
+        return libelle
+
+    def _travailler(self):
+        while True:
+            with self.condition:
+                while not self.file:
+                    self.condition.wait()
+                reference, chemin = self.file.popleft()
+                sur_resultat = self.sur_resultat
+            try:
+                libelle = self.classer_fichier(chemin)
+            except OSError:
+                continue
+            self.retour.poster(sur_resultat, reference, libelle)